@@ -0,0 +1,102 @@
+# benchmarks/bench_arranque.py
+"""
+Arranque en frío de streamlit_app, en procesos nuevos:
+1) perfil de importación (-X importtime) de los imports de nivel superior del app:
+   tiempo total, los módulos más caros y qué dependencias pesadas quedaron cargadas;
+2) primer run completo del script (AppTest) con un histórico vacío.
+
+Uso: python -m benchmarks.bench_arranque [repeticiones]
+"""
+import ast
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(RAIZ, "streamlit_app.py")
+PESADAS = ("pdfplumber", "altair", "plotly", "gspread", "pydrive2", "oauth2client")
+_RE_IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def imports_del_app(ruta: str = APP) -> str:
+    """Las sentencias import/from de nivel superior del script, tal cual."""
+    with open(ruta, encoding="utf-8") as f:
+        fuente = f.read()
+    arbol = ast.parse(fuente)
+    return "\n".join(
+        ast.get_source_segment(fuente, nodo) for nodo in arbol.body if isinstance(nodo, (ast.Import, ast.ImportFrom))
+    )
+
+
+def _entorno(tmp: str) -> Dict[str, str]:
+    # cwd vacío (sin historico/), HOME aislado y un secrets.toml mínimo como el de un despliegue
+    os.makedirs(os.path.join(tmp, ".streamlit"), exist_ok=True)
+    with open(os.path.join(tmp, ".streamlit", "secrets.toml"), "w", encoding="utf-8") as f:
+        f.write('GOOGLE_SHEETS_SPREADSHEET_ID = "sin-usar"\n')
+    return {**os.environ, "PYTHONPATH": RAIZ, "HOME": tmp}
+
+
+def perfil_importacion(codigo: str) -> Dict:
+    """
+    Corre `codigo` con -X importtime en un proceso nuevo. Retorna el total (ms), los módulos de
+    primer nivel por tiempo acumulado y las dependencias pesadas cargadas.
+    """
+    sonda = f"{codigo}\nimport sys, json\nprint(json.dumps(sorted(m for m in sys.modules)))"
+    with tempfile.TemporaryDirectory() as tmp:
+        proceso = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", sonda], cwd=tmp, env=_entorno(tmp),
+            capture_output=True, text=True, check=True,
+        )
+    modulos = set(json.loads(proceso.stdout.strip().splitlines()[-1]))
+    raiz = []  # (acumulado_us, módulo) de los imports de primer nivel
+    for linea in proceso.stderr.splitlines():
+        m = _RE_IMPORTTIME.match(linea)
+        if m and len(m.group(3)) == 1:
+            raiz.append((int(m.group(2)), m.group(4)))
+    return {
+        "total_ms": sum(us for us, _ in raiz) / 1000,
+        "top": [(mod, us / 1000) for us, mod in sorted(raiz, reverse=True)[:10]],
+        "pesadas": [p for p in PESADAS if p in modulos],
+    }
+
+
+def primer_run() -> Dict:
+    """Primer run del app con AppTest en un proceso nuevo: segundos y dependencias pesadas cargadas."""
+    sonda = (
+        "import json, logging, sys, time\n"
+        "logging.disable(logging.WARNING)\n"
+        "t0 = time.perf_counter()\n"
+        "from streamlit.testing.v1 import AppTest\n"
+        f"at = AppTest.from_file({APP!r}, default_timeout=120).run()\n"
+        "dt = time.perf_counter() - t0\n"
+        "print(json.dumps({'s': dt, 'error': [e.message for e in at.exception], 'modulos': sorted(sys.modules)}))"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        proceso = subprocess.run([sys.executable, "-c", sonda], cwd=tmp, env=_entorno(tmp), capture_output=True, text=True, check=True)
+    salida = json.loads(proceso.stdout.strip().splitlines()[-1])
+    return {"s": salida["s"], "error": salida["error"], "pesadas": [p for p in PESADAS if p in set(salida["modulos"])]}
+
+
+def main(repeticiones: int = 3) -> None:
+    codigo = imports_del_app()
+    perfiles: List[Dict] = [perfil_importacion(codigo) for _ in range(repeticiones)]
+    mejor = min(perfiles, key=lambda p: p["total_ms"])
+    print(f"imports de streamlit_app: {mejor['total_ms']:,.0f} ms (mejor de {repeticiones})")
+    for modulo, ms in mejor["top"]:
+        print(f"  {ms:>8,.1f} ms  {modulo}")
+    print(f"  dependencias pesadas cargadas: {', '.join(mejor['pesadas']) or 'ninguna'}")
+
+    runs = [primer_run() for _ in range(repeticiones)]
+    run = min(runs, key=lambda r: r["s"])
+    print(f"primer run (histórico vacío): {run['s']:.2f} s")
+    print(f"  dependencias pesadas cargadas: {', '.join(run['pesadas']) or 'ninguna'}")
+    if run["error"]:
+        print(f"  ❌ excepción en el app: {run['error'][0][:200]}")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
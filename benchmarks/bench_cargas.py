@@ -0,0 +1,87 @@
+# benchmarks/bench_cargas.py
+"""
+Servicio de cargas (utils.cargas) vs. procesar las cartolas dentro del rerun, sobre PDFs
+sintéticos cifrados: cuánto queda bloqueada la sesión por cartola (en el rerun: todo el
+procesamiento; con el servicio: encolar) y el tiempo total hasta tener todo guardado.
+Verifica que ambos caminos guarden los mismos movimientos.
+
+Corre en una carpeta temporal (historico/ y cache/ relativos, también para los workers).
+Uso: python -m benchmarks.bench_cargas [cartolas] [movimientos] [workers]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.sintetico import generar_pdf
+from utils import cache_cartola, cargas, comercios, historico, huellas, pdf_tabla
+from utils.cartola import periodo_desde_nombre_pdf
+
+
+def _carpeta_nueva(base: str, nombre: str) -> None:
+    os.makedirs(os.path.join(base, nombre))
+    os.chdir(os.path.join(base, nombre))
+    huellas.recargar()
+    comercios.recargar()
+    pdf_tabla.recargar()
+    cache_cartola._memo.clear()
+
+
+def _guardados() -> int:
+    return len(historico.cargar_historico(columnas=["Monto"]))
+
+
+def main(n_cartolas: int = 8, movimientos: int = 3_000, workers: int = 0) -> None:
+    cargas.WORKERS = workers or cargas.WORKERS
+    pdfs = [
+        (f"80_{i}_0350262800063301494_2025{i % 12 + 1:02d}22.pdf",
+         generar_pdf(movimientos, password="1234", columnas=True, semilla=i, desde=f"2025-{i % 12 + 1:02d}-01"))
+        for i in range(n_cartolas)
+    ]
+    periodos = [periodo_desde_nombre_pdf(nombre) for nombre, _ in pdfs]
+    print(f"{n_cartolas} cartolas × {movimientos:,} movimientos, {cargas.WORKERS} worker(s)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        inicial = os.getcwd()
+        try:
+            _carpeta_nueva(tmp, "rerun")
+            t0 = time.perf_counter()
+            bloqueos = []
+            for (nombre, pdf), periodo in zip(pdfs, periodos):
+                t = time.perf_counter()
+                cargas._almacenar({"periodo": periodo}, cargas.procesar_carga(pdf, "1234"))
+                bloqueos.append(time.perf_counter() - t)
+            total_rerun = time.perf_counter() - t0
+            filas_rerun = _guardados()
+            print(f"{'en el rerun: sesión bloqueada por cartola':<46} {max(bloqueos) * 1000:10.1f} ms (máx)")
+            print(f"{'en el rerun: total':<46} {total_rerun:10.2f} s")
+
+            _carpeta_nueva(tmp, "servicio")
+            cargas.iniciar()
+            t0 = time.perf_counter()
+            ids, bloqueos = [], []
+            for (nombre, pdf), periodo in zip(pdfs, periodos):
+                t = time.perf_counter()
+                ids.append(cargas.encolar(pdf, "1234", nombre, periodo))
+                bloqueos.append(time.perf_counter() - t)
+            assert cargas.esperar(ids, timeout=600)
+            total_servicio = time.perf_counter() - t0
+            trabajos = [cargas.estado(i) for i in ids]
+            assert all(t["estado"] == "listo" for t in trabajos), [t["error"] for t in trabajos]
+            print(f"{'servicio: sesión bloqueada por cartola':<46} {max(bloqueos) * 1000:10.1f} ms (máx, encolar)")
+            print(f"{'servicio: total (incluye arrancar los workers)':<46} {total_servicio:10.2f} s")
+            print(f"  espera en cola: {max(t['espera_s'] for t in trabajos):.2f} s máx · "
+                  f"duración: {sum(t['duracion_s'] for t in trabajos) / len(trabajos):.2f} s promedio")
+
+            assert _guardados() == filas_rerun, (_guardados(), filas_rerun)
+            repetido = cargas.encolar(pdfs[0][1], "1234", pdfs[0][0], periodos[0])
+            assert cargas.esperar([repetido], timeout=120) and cargas.estado(repetido)["insertados"] == 0
+            mala = cargas.encolar(pdfs[0][1], "otra", pdfs[0][0], periodos[0])
+            assert cargas.esperar([mala], timeout=120) and cargas.estado(mala)["estado"] == "fallido"
+            print(f"✅ mismos {filas_rerun:,} movimientos guardados; re-subir no duplica y una clave mala falla sin botar el servicio")
+        finally:
+            os.chdir(inicial)
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
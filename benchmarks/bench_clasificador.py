@@ -0,0 +1,40 @@
+# benchmarks/bench_clasificador.py
+"""
+Benchmark del clasificador: cadena if/elif original (copia en tests/test_clasificador.py)
+vs. clasificar_categoria (regex compiladas) vs. classify_series (vectorizado).
+La paridad se prueba en tests/test_clasificador.py; aquí solo se revisa al pasar.
+
+Uso: python -m benchmarks.bench_clasificador [n_filas]
+"""
+import sys
+
+from benchmarks.medicion import medir
+from benchmarks.sintetico import generar_descripciones
+from tests.test_clasificador import clasificar_categoria_original
+from utils.clasificador import clasificar_categoria, classify_series
+
+# Un comercio por regla (y algunos sin regla), con el mismo peso
+COMERCIOS = dict.fromkeys([
+    "LIDER EXPRESS", "JUMBO LA DEHESA", "COPEC AUTOPISTA", "UBER TRIP", "DIDI RIDE", "MERCADOLIBRE*VENTA",
+    "STARBUCKS COSTANERA", "FARMACIA CRUZ VERDE", "ENEL DISTRIBUCION", "NOTA DE CREDITO FALABELLA",
+    "ENTEL PCS", "METROGAS", "MOVISTARHOGAR", "PETROBRAS", "PET HAPPY", "ZAPATERIA XYZ LTDA", "SEGURO AUTO",
+    "RESTAURANTE EL PARRON", "KAKOBUY", "VESPUCIO SUR", "HAIRTREK", "TIENDA SIN CATEGORIA",
+], 1.0)
+
+
+def main(n: int = 200_000) -> None:
+    serie = generar_descripciones(n, COMERCIOS).astype(object)
+    serie[::1000] = None  # algunos nulos
+    print(f"{n:,} filas, {serie.nunique():,} descripciones distintas")
+
+    ref = medir("original (if/elif)", lambda: [clasificar_categoria_original(d) for d in serie], n, ancho=24)
+    escalar = medir("clasificar_categoria", lambda: [clasificar_categoria(d) for d in serie], n, ancho=24)
+    vectorizado = medir("classify_series", lambda: classify_series(serie), n, ancho=24)
+
+    assert escalar == ref, "clasificar_categoria difiere del original"
+    assert vectorizado.tolist() == ref, "classify_series difiere del original"
+    print("✅ Paridad OK")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
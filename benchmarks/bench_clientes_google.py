@@ -0,0 +1,66 @@
+# benchmarks/bench_clientes_google.py
+"""
+Exportaciones repetidas a Sheets (write_dataframe en modo append) con un cliente falso:
+sin caché (autenticar + abrir Spreadsheet + buscar worksheet en cada clic) vs. con
+utils.clientes_google. Cada llamada de metadatos simula LATENCIA_S de red.
+
+Uso: python -m benchmarks.bench_clientes_google [exportaciones]
+"""
+import sys
+import time
+from collections import Counter
+
+from benchmarks.bench_sheets_sync import generar
+from utils import clientes_google, sheets_io
+from utils.sheets_fake import FakeClient
+
+LATENCIA_S = 0.05  # handshake de auth / fetch de metadatos
+
+
+def _con_latencia(fn):
+    def envoltura(*args, **kwargs):
+        time.sleep(LATENCIA_S)
+        return fn(*args, **kwargs)
+    return envoltura
+
+
+def _correr(exportaciones: int, con_cache: bool) -> Counter:
+    llamadas: Counter = Counter()
+    cliente = FakeClient(llamadas)
+    cliente.open_by_key = _con_latencia(cliente.open_by_key)
+
+    @_con_latencia
+    def crear_cliente():
+        llamadas["auth"] += 1
+        return cliente
+
+    sheets_io._crear_cliente = crear_cliente
+    clientes_google.invalidar()
+    clientes_google.ESTADISTICAS.clear()
+    ttl_previo = clientes_google.TTL_CLIENTE, clientes_google.TTL_METADATOS
+    if not con_cache:
+        clientes_google.TTL_CLIENTE = clientes_google.TTL_METADATOS = 0.0
+    try:
+        for i in range(exportaciones):
+            if i == exportaciones // 2:
+                cliente.http_client.auth.valid = False  # el token expira a mitad de la sesión
+            sheets_io.write_dataframe(generar(50, i), mode="append", spreadsheet_id="libro", worksheet_title="cartola")
+    finally:
+        clientes_google.TTL_CLIENTE, clientes_google.TTL_METADATOS = ttl_previo
+    return llamadas
+
+
+def main(exportaciones: int = 20) -> None:
+    print(f"{exportaciones} exportaciones · latencia simulada {LATENCIA_S * 1000:.0f} ms por viaje de metadatos")
+    print(f"{'modo':<10} {'auth':>5} {'open_by_key':>12} {'worksheet':>10} {'tiempo':>8}")
+    for con_cache in (False, True):
+        t0 = time.perf_counter()
+        llamadas = _correr(exportaciones, con_cache)
+        dt = time.perf_counter() - t0
+        print(f"{'caché' if con_cache else 'sin caché':<10} {llamadas['auth']:>5} {llamadas['open_by_key']:>12} "
+              f"{llamadas['worksheet'] + llamadas['add_worksheet']:>10} {dt:>7.2f}s")
+    print(f"Resumen clientes_google (con caché): {clientes_google.resumen()}")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,75 @@
+# benchmarks/bench_comercios.py
+"""
+Índice de comercios (utils.comercios) vs. classify_series (REGLAS en cada carga):
+clasificación repetida de una cartola, variantes no vistas (búsqueda por trigramas),
+y tamaño/tiempo de carga del índice persistido con miles de comercios.
+
+Uso: python -m benchmarks.bench_comercios [filas] [comercios]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.medicion import medir
+from benchmarks.sintetico import MEZCLA_COMERCIOS, generar_descripciones
+from utils import comercios
+from utils.clasificador import CATEGORIA_DEFAULT, classify_series
+
+
+def _mezcla(n_comercios: int, semilla: int = 3) -> dict:
+    """Los comercios de sintetico más n_comercios inventados (sin palabra clave en REGLAS)."""
+    rnd = random.Random(semilla)
+    silabas = ["MA", "RU", "TO", "KEN", "LO", "BRI", "SA", "VEN", "DOR", "QUI", "PE", "ZU"]
+    mezcla = dict(MEZCLA_COMERCIOS)
+    for _ in range(n_comercios):
+        nombre = " ".join("".join(rnd.choices(silabas, k=rnd.randint(2, 4))) for _ in range(rnd.randint(1, 3)))
+        mezcla[f"{nombre} SPA"] = rnd.random()
+    return mezcla
+
+
+def _variante(descripcion: str, rnd: random.Random) -> str:
+    """Variante no vista: una letra cambiada y otro sufijo de tarjeta."""
+    i = rnd.randrange(len(descripcion))
+    return f"{descripcion[:i]}{rnd.choice('AEIOU')}{descripcion[i + 1:]} *{rnd.randint(1000, 9999)}"
+
+
+def main(filas: int = 200_000, n_comercios: int = 5_000) -> None:
+    comercios.INDICE_PATH = os.path.join(tempfile.mkdtemp(), "comercios.json")
+    comercios.recargar()
+    mezcla = _mezcla(n_comercios)
+    serie = generar_descripciones(filas, mezcla)
+    print(f"{filas:,} filas, {serie.nunique():,} descripciones distintas, {len(mezcla):,} comercios")
+
+    reglas = medir("classify_series (cada carga)", lambda: classify_series(serie), filas)
+    primera = medir("índice, primera carga (aprende)", lambda: comercios.clasificar_series(serie, reglas), filas)
+    repetida = medir("índice, carga repetida (dict lookup)", lambda: comercios.clasificar_series(serie), filas)
+    assert primera.tolist() == repetida.tolist()
+    cambios = (reglas != primera).sum()
+    print(f"  {cambios:,} filas cambiaron de categoría respecto de REGLAS (parecidos)")
+
+    # Usuario corrige 50 comercios inventados; luego llegan variantes no vistas de ellos
+    rnd = random.Random(1)
+    inventados = [c for c in mezcla if c.endswith(" SPA")]
+    for nombre in inventados[:50]:
+        comercios.asignar(nombre, "🏠 Hogar")
+    variantes = pd.Series([_variante(rnd.choice(inventados[:50]), rnd) for _ in range(2_000)])
+    resultado = medir("variantes no vistas (trigramas)", lambda: comercios.clasificar_series(variantes), len(variantes))
+    aciertos = (resultado == "🏠 Hogar").mean()
+    otros = (resultado == CATEGORIA_DEFAULT).mean()
+    print(f"  {aciertos:.0%} heredaron la corrección del usuario, {otros:.0%} quedaron en {CATEGORIA_DEFAULT}")
+
+    comercios.guardar()
+    tamano = os.path.getsize(comercios.INDICE_PATH)
+    comercios.recargar()
+    t0 = time.perf_counter()
+    info = comercios.resumen()  # fuerza la carga desde disco
+    carga = time.perf_counter() - t0
+    print(f"índice en disco: {info['comercios']:,} comercios, {tamano / 1024:,.0f} KiB, carga {carga * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,69 @@
+# benchmarks/bench_consultas.py
+"""
+Filtrado de la vista histórica por interacción: copia + máscaras + sort_values completo
+(como antes) vs. utils.consultas (tabla preordenada, rangos por periodo, bitmaps por categoría
+y paginación). Verifica que ambos entreguen las mismas filas.
+
+Uso: python -m benchmarks.bench_consultas [filas]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_movimientos import generar
+from utils.consultas import TAMANO_PAGINA, consultar, construir_indice, pagina
+from utils.movimientos import compactar, para_mostrar
+
+
+def _antes(df: pd.DataFrame, clave, categorias) -> pd.DataFrame:
+    vista = df.copy()
+    if clave is not None:
+        vista = vista[vista["Clave_periodo"] == clave]
+    vista = vista[vista["Categoría"].isin(categorias)]
+    vista = vista.sort_values("Fecha", ascending=False)
+    return para_mostrar(vista.head(TAMANO_PAGINA)), len(vista)
+
+
+def _ahora(indice, clave, categorias):
+    resultado = consultar(indice, clave, categorias)
+    return para_mostrar(pagina(indice, resultado, 0)), resultado["total"]
+
+
+def _tiempo(fn, repeticiones: int = 3) -> float:
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        fn()
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor
+
+
+def main(filas: int = 5_000_000) -> None:
+    df = compactar(generar(filas))
+    t0 = time.perf_counter()
+    indice = construir_indice(df)
+    print(f"{filas:,} movimientos · índice construido en {time.perf_counter() - t0:.2f}s (una vez por cambio del histórico)")
+
+    todas = list(df["Categoría"].cat.categories)
+    claves = sorted(indice["rangos_periodo"])
+    escenarios = [
+        ("todo", None, todas),
+        ("un periodo", claves[len(claves) // 2], todas),
+        ("3 categorías", None, todas[:3]),
+        ("periodo + 3 categorías", claves[-1], todas[:3]),
+    ]
+    print(f"{'filtro':<24} {'filas':>10} {'antes':>9} {'índice':>9} {'×':>7}")
+    for nombre, clave, categorias in escenarios:
+        (pag_antes, total_antes), (pag_ahora, total_ahora) = _antes(df, clave, categorias), _ahora(indice, clave, categorias)
+        assert total_antes == total_ahora, nombre
+        assert np.array_equal(pag_antes["Fecha"].to_numpy(), pag_ahora["Fecha"].to_numpy()), nombre
+        t_antes = _tiempo(lambda: _antes(df, clave, categorias))
+        t_ahora = _tiempo(lambda: _ahora(indice, clave, categorias))
+        print(f"{nombre:<24} {total_ahora:>10,} {t_antes * 1000:>7.0f}ms {t_ahora * 1000:>7.1f}ms {t_antes / t_ahora:>6.0f}×")
+    print("✅ Mismos totales y mismas fechas en la primera página")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
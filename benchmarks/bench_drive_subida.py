@@ -0,0 +1,73 @@
+# benchmarks/bench_drive_subida.py
+"""
+Subida reanudable a Drive (drive_io.subir_a_drive) contra un endpoint falso que inyecta fallas
+(drive_fake.FakeSesionSubida): sin fallas, con cortes de red y 503 a mitad de la subida,
+comprimida con gzip, y con el proceso muerto a mitad y retomado desde el checkpoint.
+Verifica que el contenido final sea idéntico y reporta bytes reenviados.
+
+Uso: python -m benchmarks.bench_drive_subida [filas]
+"""
+import gzip
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_sheets_sync import generar
+from utils import clientes_google, drive_io
+from utils.drive_fake import CorteProceso, FakeDrive, FakeSesionSubida
+
+CHUNK = 256 * 1024
+
+
+def _preparar():
+    drive = FakeDrive()
+    carpeta = drive.crear(drive_io.DRIVE_FOLDER_NAME, carpeta=True)
+    file_id = drive.crear("historico.csv", padre=carpeta)
+    drive_io._crear_drive = lambda: drive
+    clientes_google.invalidar()
+    return drive, file_id
+
+
+def main(filas: int = 200_000) -> None:
+    df = generar(filas, 0)
+    esperado = df.to_csv(index=False).encode("utf-8")
+    drive_io.SUBIDA_ESPERA_INICIAL = 0.001
+    drive_io.CHECKPOINT_DIR = tempfile.mkdtemp()
+    print(f"{filas:,} filas → CSV de {len(esperado) / 2**20:.1f} MiB, trozos de {CHUNK // 1024} KiB")
+    print(f"{'escenario':<28} {'enviados':>10} {'reenviados':>10} {'PUTs':>5} {'tiempo':>7}")
+
+    escenarios = [
+        ("sin fallas", {}, False),
+        ("3 cortes de red + 2×503", {"cortes_red": [300_000, len(esperado) // 2, len(esperado) - 10], "errores_503": 2}, False),
+        ("gzip", {}, True),
+        ("gzip + corte de red", {"cortes_red": [100_000]}, True),
+    ]
+    for nombre, fallas, comprimir in escenarios:
+        drive, file_id = _preparar()
+        sesion = FakeSesionSubida(drive, **fallas)
+        t0 = time.perf_counter()
+        drive_io.subir_a_drive(drive_io.csv_en_trozos(df), "historico.csv", comprimir=comprimir, chunk_bytes=CHUNK, sesion=sesion)
+        dt = time.perf_counter() - t0
+        contenido = drive.archivos[file_id]["contenido"]
+        assert (gzip.decompress(contenido) if comprimir else contenido) == esperado, nombre
+        reenviados = sesion.bytes_recibidos - len(contenido)
+        print(f"{nombre:<28} {len(contenido):>10,} {reenviados:>10,} {drive.llamadas['subida_PUT']:>5} {dt:>6.2f}s")
+
+    # Proceso muerto a mitad: la segunda llamada (mismo id_subida) retoma desde el checkpoint
+    drive, file_id = _preparar()
+    sesion = FakeSesionSubida(drive, cortes_proceso=[len(esperado) * 2 // 3])
+    try:
+        drive_io.subir_a_drive(drive_io.csv_en_trozos(df), "historico.csv", chunk_bytes=CHUNK, id_subida="bench", sesion=sesion)
+        raise AssertionError("se esperaba CorteProceso")
+    except CorteProceso:
+        pass
+    recibidos_antes = sesion.bytes_recibidos
+    drive_io.subir_a_drive(drive_io.csv_en_trozos(df), "historico.csv", chunk_bytes=CHUNK, id_subida="bench", sesion=sesion)
+    assert drive.archivos[file_id]["contenido"] == esperado
+    print(f"{'proceso muerto y retomado':<28} {len(esperado):>10,} {sesion.bytes_recibidos - len(esperado):>10,} "
+          f"{drive.llamadas['subida_PUT']:>5}   (segunda llamada: {sesion.bytes_recibidos - recibidos_antes:,} bytes)")
+    print("✅ Contenido idéntico en todos los escenarios")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,62 @@
+# benchmarks/bench_exportacion.py
+"""
+Exportación a Sheets + Drive contra endpoints falsos con latencia (sheets_fake, drive_fake):
+secuencial (como el botón anterior) vs. utils.exportacion (en segundo plano, destinos en paralelo).
+Mide cuánto queda bloqueado el llamador y el tiempo total hasta terminar.
+
+Uso: python -m benchmarks.bench_exportacion [filas] [latencia_ms]
+"""
+import sys
+import time
+
+from benchmarks.bench_sheets_sync import generar
+from utils import clientes_google, drive_io, exportacion, sheets_io
+from utils.drive_fake import FakeDrive, FakeSesionSubida
+from utils.sheets_fake import FakeClient, FakeWorksheet
+
+
+def _preparar(latencia_s: float) -> FakeDrive:
+    FakeWorksheet.latencia_s = latencia_s
+    cliente = FakeClient()
+    drive = FakeDrive(latencia_s)
+    carpeta = drive.crear(drive_io.DRIVE_FOLDER_NAME, carpeta=True)
+    drive.crear("cartola.csv", padre=carpeta)
+    sheets_io._crear_cliente = lambda: cliente
+    drive_io._crear_drive = lambda: drive
+    drive_io._sesion_autenticada = lambda _drive: FakeSesionSubida(drive)
+    clientes_google.invalidar()
+    return drive
+
+
+def main(filas: int = 5_000, latencia_ms: float = 300) -> None:
+    df = generar(filas, 0)
+    print(f"{filas:,} filas · latencia simulada {latencia_ms:.0f} ms por llamada")
+
+    _preparar(latencia_ms / 1000)
+    t0 = time.perf_counter()
+    exportacion.exportar_sheet(df, "libro", "cartola", "delta")
+    exportacion.exportar_drive(df, "cartola.csv")
+    secuencial = time.perf_counter() - t0
+    print(f"secuencial: UI bloqueada {secuencial:.2f}s · total {secuencial:.2f}s")
+
+    drive = _preparar(latencia_ms / 1000)
+    t0 = time.perf_counter()
+    ids = exportacion.encolar_exportacion(df, "libro", "cartola", "delta", drive_title="cartola.csv")
+    bloqueo = time.perf_counter() - t0
+    assert exportacion.esperar(ids, timeout=60)
+    total = time.perf_counter() - t0
+    print(f"en cola:    UI bloqueada {bloqueo:.3f}s · total {total:.2f}s")
+
+    # Dos exportaciones seguidas: se serializan por destino, Sheets y Drive siguen en paralelo
+    ids = exportacion.encolar_exportacion(df, "libro", "cartola", "delta", drive_title="cartola.csv")
+    ids += exportacion.encolar_exportacion(generar(filas, 1), "libro", "cartola", "reescribir", drive_title="cartola.csv")
+    assert exportacion.esperar(ids, timeout=60)
+    for t in reversed(exportacion.listar_trabajos()):
+        print(f"  {t['destino']:<6} {t['descripcion']:<22} {t['estado']:<8} en cola {t['espera_s']:.2f}s · {t['duracion_s']:.2f}s")
+    assert all(t["estado"] == "listo" for t in exportacion.listar_trabajos())
+    assert drive.archivos["id1"]["contenido"].count(b"\n") == filas + 1
+    print("✅ Todos los trabajos terminaron en estado 'listo'")
+
+
+if __name__ == "__main__":
+    main(*[float(a) if i else int(a) for i, a in enumerate(sys.argv[1:])])
@@ -0,0 +1,58 @@
+# benchmarks/bench_graficos.py
+"""
+Datos de los gráficos (utils.datos_graficos) sobre un histórico sintético de varios años:
+tamaño de la especificación que viaja al navegador y tiempo de construirla, con las tablas
+reducidas (top de categorías + "Otras", rollups con tope de puntos) vs. sin reducir.
+
+Uso: python -m benchmarks.bench_graficos [filas] [cartolas]
+"""
+import json
+import os
+import sys
+import tempfile
+
+from benchmarks.medicion import cronometrar
+from benchmarks.sintetico import generar_historico
+from utils import agregados, datos_graficos, graficos, historico
+
+
+def _medir_spec(nombre: str, fn):
+    """Como medicion.medir, más el tamaño del spec que viaja al navegador."""
+    spec, segundos = cronometrar(fn)
+    ms = segundos * 1000
+    kib = len(json.dumps(spec, default=str)) / 1024
+    print(f"{nombre:<48} {ms:9.1f} ms {kib:10.1f} KiB")
+    return spec
+
+
+def main(filas: int = 1_000_000, cartolas: int = 120) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        historico.DATASET_DIR = os.path.join(tmp, "movimientos")
+        agregados.AGREGADOS_DIR = os.path.join(tmp, "agregados")
+        df = generar_historico(filas, cartolas)
+        for periodo, parte in df.groupby("Periodo", observed=True):
+            historico.guardar_periodo(parte, str(periodo))
+        agregado = agregados.cargar_agregados()
+        print(f"{filas:,} movimientos en {cartolas} cartolas → agregado de {len(agregado):,} filas")
+
+        por_categoria = agregados.gasto_por_categoria(agregado)
+        graficos.torta_por_categoria(por_categoria)  # importa plotly y altair antes de medir
+        graficos.lineas_temporales(agregado.head(0), "")
+        top = datos_graficos.top_categorias(por_categoria, n=5)
+        _medir_spec("torta, todas las categorías", lambda: graficos.torta_por_categoria(por_categoria))
+        _medir_spec(f"torta, top 5 + {datos_graficos.OTRAS}", lambda: graficos.torta_por_categoria(top))
+        assert top["Monto"].sum() == round(por_categoria["Monto"].sum())
+
+        diario = agregados.gasto_diario(agregado)
+        sin_rollup = diario.rename(columns={"Dia": "Fecha"}).assign(**{"Gasto Neto": diario["Gastos"] + diario["Abonos"]})
+        _medir_spec(f"serie sin rollup ({len(sin_rollup):,} días)", lambda: graficos.lineas_temporales(sin_rollup, "Diaria"))
+        for granularidad in datos_graficos.GRANULARIDADES:
+            serie, usada = datos_graficos.serie_temporal(diario, granularidad)
+            assert serie["Gastos"].sum() == round(diario["Gastos"].sum())
+            _medir_spec(f"serie {granularidad.lower()} → {usada.lower()} ({len(serie)} puntos)",
+                   lambda: graficos.lineas_temporales(*datos_graficos.serie_temporal(diario, granularidad)))
+        print("✅ los totales de las tablas reducidas calzan con el agregado")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
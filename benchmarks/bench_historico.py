@@ -0,0 +1,67 @@
+# benchmarks/bench_historico.py
+"""
+Benchmark de carga del histórico: CSV por periodo (read_csv + concat + to_datetime, como antes)
+vs. dataset Parquet particionado (utils.historico), a medida que crece el número de cartolas.
+
+Uso: python -m benchmarks.bench_historico [filas_por_cartola]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils import historico
+from utils.clasificador import REGLAS
+
+
+def generar_cartola(periodo: str, n: int, rnd: np.random.Generator) -> pd.DataFrame:
+    fin = pd.Timestamp(periodo)
+    return pd.DataFrame({
+        "Fecha": fin - pd.to_timedelta(rnd.integers(0, 30, n), unit="D"),
+        "Descripción": rnd.choice(["COMPRA LIDER", "UBER TRIP", "COPEC", "STARBUCKS", "ENEL"], n),
+        "Monto": rnd.integers(-50_000, 500_000, n).astype(float),
+        "Categoría": rnd.choice([cat for _, cat, _ in REGLAS], n),
+        "Periodo": periodo,
+    })
+
+
+def _cargar_csv(carpeta: str) -> pd.DataFrame:
+    archivos = [f for f in os.listdir(carpeta) if f.endswith(".csv")]
+    df = pd.concat([pd.read_csv(os.path.join(carpeta, f)) for f in archivos], ignore_index=True)
+    df["Fecha"] = pd.to_datetime(df["Fecha"], errors="coerce")
+    return df
+
+
+def main(filas_por_cartola: int = 300) -> None:
+    rnd = np.random.default_rng(3)
+    with tempfile.TemporaryDirectory() as tmp:
+        carpeta_csv = os.path.join(tmp, "csv")
+        os.makedirs(carpeta_csv)
+        historico.DATASET_DIR = os.path.join(tmp, "movimientos")
+
+        periodos = [p.strftime("%Y-%m-%d") for p in pd.date_range("2015-01-25", periods=120, freq="MS") + pd.Timedelta(days=24)]
+        print(f"{'cartolas':>8} {'filas':>9} {'CSV':>9} {'Parquet':>9} {'Parquet 1 periodo':>18}")
+        for i, periodo in enumerate(periodos, start=1):
+            df = generar_cartola(periodo, filas_por_cartola, rnd)
+            df.to_csv(os.path.join(carpeta_csv, f"cartola_{periodo}.csv"), index=False)
+            historico.guardar_periodo(df, periodo)
+            if i not in (1, 12, 30, 60, 120):
+                continue
+
+            t0 = time.perf_counter()
+            n = len(_cargar_csv(carpeta_csv))
+            t_csv = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            historico.cargar_historico(columnas=["Fecha", "Descripción", "Monto", "Categoría"])
+            t_pq = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            historico.cargar_historico(periodos=[periodo])
+            t_pq1 = time.perf_counter() - t0
+            print(f"{i:>8} {n:>9,} {t_csv:>8.3f}s {t_pq:>8.3f}s {t_pq1:>17.3f}s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
@@ -0,0 +1,65 @@
+# benchmarks/bench_huellas.py
+"""
+Índice de huellas (utils.huellas) sobre un histórico sintético grande: reconstrucción desde el
+histórico, apertura (memmap) en un proceso "nuevo", consulta de una cartola, fusión de una cartola
+que se traslapa con la anterior y re-fusión idempotente; vs. deduplicar cargando el histórico.
+
+Uso: python -m benchmarks.bench_huellas [filas] [cartolas]
+"""
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.medicion import medir
+from benchmarks.sintetico import generar_historico
+from utils import historico, huellas
+
+
+def _sin_indice(df: pd.DataFrame) -> int:
+    """Lo que haría falta sin índice: leer todo el histórico y cruzar por columnas."""
+    guardado = historico.cargar_historico(columnas=["Fecha", "Descripción", "Monto"])
+    cruce = df[["Fecha", "Descripción", "Monto"]].merge(guardado.drop_duplicates(), how="left", indicator=True)
+    return int((cruce["_merge"] == "left_only").sum())
+
+
+def main(filas: int = 1_000_000, cartolas: int = 36) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        historico.DATASET_DIR = os.path.join(tmp, "movimientos")
+        huellas.HUELLAS_PATH = os.path.join(tmp, "huellas.npy")
+        huellas.recargar()
+        df = generar_historico(filas, cartolas)
+        for periodo, parte in df.groupby("Periodo", observed=True):
+            historico.guardar_periodo(parte, str(periodo))
+        print(f"{filas:,} movimientos en {cartolas} cartolas")
+
+        n = medir("reconstruir (desde el histórico)", huellas.reconstruir, ancho=46)
+        print(f"  {n:,} huellas, {os.path.getsize(huellas.HUELLAS_PATH) / 2**20:,.1f} MiB en disco")
+
+        # cartola nueva que repite la mitad de la última (traslape 25 a 25) y trae otra mitad nueva
+        ultimo = str(df["Periodo"].cat.categories[-1])
+        repetidos = df[df["Periodo"] == ultimo].head(2_500)
+        nuevos = repetidos.assign(Monto=repetidos["Monto"] + 1, Fecha=repetidos["Fecha"] + pd.Timedelta(days=30))
+        cartola = pd.concat([repetidos, nuevos], ignore_index=True)
+
+        huellas.recargar()  # como un proceso recién iniciado: abre el .npy con memmap
+        medir("abrir (memmap) + consultar 5.000 movimientos", lambda: huellas.contiene(cartola), ancho=46)
+        medir("consultar 5.000 movimientos (abierto)", lambda: huellas.contiene(cartola), ancho=46)
+        esperados = medir("sin índice: cargar histórico + merge", lambda: _sin_indice(cartola), ancho=46)
+        insertados = medir("fusionar cartola traslapada", lambda: huellas.fusionar(cartola, "nueva"), ancho=46)
+        assert insertados == esperados == len(nuevos), (insertados, esperados)
+        otra_vez = medir("fusionar la misma cartola otra vez", lambda: huellas.fusionar(cartola, "nueva"), ancho=46)
+        assert otra_vez == 0
+
+        huellas.recargar()
+        historico.borrar_periodos(["nueva"])
+        medir("borrar una cartola → reconstrucción al consultar", lambda: huellas.contiene(cartola), ancho=46)
+        assert not huellas.contiene(nuevos).any()
+        print(f"  {huellas.resumen()}")
+        print(f"✅ {insertados:,} insertados, {len(repetidos):,} repetidos descartados; re-fusión idempotente")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
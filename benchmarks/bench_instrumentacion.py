@@ -0,0 +1,79 @@
+# benchmarks/bench_instrumentacion.py
+"""
+Costo de la instrumentación (utils.instrumentacion):
+- por llamada: función vacía sin decorar vs. @cronometrado desactivado/activado, y medir();
+- de punta a punta: parseo + normalización + compactación de una cartola sintética (muchas
+  etapas cortas, el peor caso relativo) con la instrumentación desactivada y activada.
+
+Uso: python -m benchmarks.bench_instrumentacion [n_lineas]
+"""
+import sys
+import time
+
+from benchmarks.sintetico import generar_texto
+from utils import instrumentacion
+from utils.cartola import extraer_movimientos_vectorizado, normalizar_movimientos
+from utils.instrumentacion import cronometrado, medir
+from utils.movimientos import compactar
+
+
+def _vacia():
+    return None
+
+
+_vacia_cronometrada = cronometrado("bench.vacia")(_vacia)
+
+
+def _ns_por_llamada(fn, n: int = 200_000) -> float:
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n * 1e9
+
+
+def _bloque_medido():
+    with medir("bench.bloque"):
+        pass
+
+
+def _pipeline(texto: str) -> None:
+    df = normalizar_movimientos(extraer_movimientos_vectorizado(texto))
+    compactar(df)
+
+
+def _mejor_de(fn, *args, repeticiones: int = 7) -> float:
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        fn(*args)
+        tiempos.append(time.perf_counter() - t0)
+    return min(tiempos)
+
+
+def main(n_lineas: int = 2_000) -> None:
+    instrumentacion.iniciar_traza("bench", activa=False)
+    base = _ns_por_llamada(_vacia)
+    print(f"{'por llamada':<34} {'ns':>8}")
+    print(f"{'  función sin decorar':<34} {base:>8.0f}")
+    print(f"{'  @cronometrado desactivado':<34} {_ns_por_llamada(_vacia_cronometrada):>8.0f}")
+    print(f"{'  medir() desactivado':<34} {_ns_por_llamada(_bloque_medido):>8.0f}")
+    instrumentacion.iniciar_traza("bench", activa=True)
+    print(f"{'  @cronometrado activado':<34} {_ns_por_llamada(_vacia_cronometrada, 20_000):>8.0f}")
+    print(f"{'  medir() activado':<34} {_ns_por_llamada(_bloque_medido, 20_000):>8.0f}")
+
+    texto = generar_texto(n_lineas)
+    instrumentacion.reiniciar()
+    instrumentacion.iniciar_traza("bench", activa=False)
+    _pipeline(texto)  # calentamiento
+    desactivada = _mejor_de(_pipeline, texto)
+    instrumentacion.iniciar_traza("bench", activa=True)
+    activada = _mejor_de(_pipeline, texto)
+    traza = instrumentacion.terminar_traza()
+    etapas = len(traza["registros"]) // 7
+    print(f"\npipeline de {n_lineas:,} líneas ({etapas} etapas por corrida)")
+    print(f"  desactivada {desactivada * 1000:8.2f} ms")
+    print(f"  activada    {activada * 1000:8.2f} ms  ({(activada / desactivada - 1) * 100:+.1f}%)")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,90 @@
+# benchmarks/bench_movimientos.py
+"""
+Memoria por fila del histórico en la vista: representación con strings de Python
+(Fecha object, Descripción/Categoría object, Monto float64 + Monto_formateado + Periodo por fila)
+vs. la anterior a la tabla compacta (cargar_historico + Monto_formateado + Periodo) vs.
+utils.movimientos (tabla compacta). Historial sintético con miles de comercios distintos.
+
+Uso: python -m benchmarks.bench_movimientos [filas]
+"""
+import gc
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.medicion import cronometrar
+from utils.clasificador import REGLAS
+from utils import consultas
+from utils.movimientos import bytes_por_fila, compactar, para_mostrar
+from utils.periodos import asignar_periodo, etiquetar_periodos
+
+N_COMERCIOS = 3_000
+
+
+def generar(n: int, semilla: int = 0) -> pd.DataFrame:
+    """Historial tipado como lo entrega cargar_historico (Descripción str de pandas)."""
+    rnd = np.random.default_rng(semilla)
+    comercios = np.array([f"COMPRA {i:04d} COMERCIO {rnd.integers(1e6)}" for i in range(N_COMERCIOS)], dtype=object)
+    pesos = 1 / np.arange(1, N_COMERCIOS + 1)  # pocos comercios concentran la mayoría (Zipf)
+    return pd.DataFrame({
+        "Fecha": pd.Timestamp("2015-01-01") + pd.to_timedelta(rnd.integers(0, 3650, n), unit="D"),
+        "Descripción": pd.Series(comercios[rnd.choice(N_COMERCIOS, n, p=pesos / pesos.sum())], dtype=str),
+        "Monto": rnd.integers(-50_000, 500_000, n),
+        "Categoría": pd.Categorical(rnd.choice([cat for _, cat, _ in REGLAS], n)),
+    })
+
+
+def _formatear(df: pd.DataFrame) -> pd.DataFrame:
+    """Columnas por fila que agregaba la vista: Monto_formateado y Periodo (string)."""
+    df["Monto_formateado"] = df["Monto"].apply(lambda x: f"$ {x:,.0f}".replace(",", "."))
+    df["Periodo"] = etiquetar_periodos(asignar_periodo(df["Fecha"])).astype(str)
+    return df
+
+
+def _con_objetos(base: pd.DataFrame) -> pd.DataFrame:
+    """Como quedaba el DataFrame leído de CSV: un objeto str de Python por celda de texto."""
+    df = pd.DataFrame({
+        "Fecha": base["Fecha"].dt.strftime("%Y-%m-%d").astype(object),
+        "Descripción": base["Descripción"].astype(object),
+        "Monto": base["Monto"].astype("float64"),
+        "Categoría": base["Categoría"].astype(str).astype(object),
+    })
+    df = _formatear(df)
+    df["Periodo"] = df["Periodo"].astype(object)
+    df["Monto_formateado"] = df["Monto_formateado"].astype(object)
+    return df
+
+
+def _medir_memoria(nombre: str, construir) -> float:
+    """Arma la tabla, imprime bytes por fila, MiB y tiempo, y retorna los bytes por fila."""
+    gc.collect()
+    df, dt = cronometrar(construir)
+    bpf = bytes_por_fila(df)
+    print(f"{nombre:<34} {bpf:>9.1f} {bpf * len(df) / 2**20:>10,.0f} {dt:>8.2f}s")
+    del df
+    return bpf
+
+
+def main(filas: int = 5_000_000) -> None:
+    base = generar(filas)
+    print(f"{filas:,} movimientos · {base['Descripción'].nunique():,} descripciones distintas")
+    print(f"{'representación':<34} {'bytes/fila':>9} {'MiB':>10} {'armado':>9}")
+    antes = _medir_memoria("objetos Python (CSV)", lambda: _con_objetos(base))
+    _medir_memoria("cargar_historico + formateo", lambda: _formatear(base.copy()))
+    despues = _medir_memoria("tabla compacta (movimientos)", lambda: compactar(base))
+    print(f"→ {antes / despues:.1f}× menos memoria por fila")
+
+    compacta = compactar(base)
+    indice = consultas.construir_indice(compacta)
+    resultado = consultas.consultar(indice)
+    t0 = time.perf_counter()
+    tabla = para_mostrar(consultas.pagina(indice, resultado, 0))  # lo que hace la vista en cada rerun
+    print(f"página visible: {len(tabla):,} filas formateadas en {(time.perf_counter() - t0) * 1000:.1f} ms")
+    assert (compacta["Monto"].to_numpy() == base["Monto"].to_numpy()).all()
+    assert (compacta["Descripción"].astype(str).to_numpy() == base["Descripción"].to_numpy()).all()
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
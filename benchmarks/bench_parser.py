@@ -0,0 +1,33 @@
+# benchmarks/bench_parser.py
+"""
+Benchmark del parser: extraer_movimientos (bucle por línea) vs.
+extraer_movimientos_vectorizado (str.extract + clasificación por columna),
+sobre una cartola sintética. Verifica que ambos DataFrames sean idénticos.
+
+Uso: python -m benchmarks.bench_parser [n_movimientos]
+"""
+import sys
+
+import pandas as pd
+
+from benchmarks.medicion import cronometrar, linea
+from benchmarks.sintetico import generar_texto
+from utils.cartola import extraer_movimientos, extraer_movimientos_vectorizado
+
+
+def main(n_movimientos: int = 1_000_000) -> None:
+    texto = generar_texto(n_movimientos)
+    n_lineas = texto.count("\n") + 1  # cabecera y ruido incluidos
+    print(f"{n_lineas:,} líneas ({len(texto) / 1e6:.1f} MB de texto)")
+
+    df_bucle, t_bucle = cronometrar(lambda: extraer_movimientos(texto))
+    print(linea("extraer_movimientos", t_bucle, n_lineas, "líneas", 34))
+    df_vec, t_vec = cronometrar(lambda: extraer_movimientos_vectorizado(texto))
+    print(linea("extraer_movimientos_vectorizado", t_vec, n_lineas, "líneas", 34))
+
+    pd.testing.assert_frame_equal(df_vec, df_bucle)
+    print(f"✅ Paridad OK ({len(df_vec):,} movimientos) — speedup x{t_bucle / t_vec:.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
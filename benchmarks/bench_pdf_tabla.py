@@ -0,0 +1,48 @@
+# benchmarks/bench_pdf_tabla.py
+"""
+Modo tabla (utils.pdf_tabla) vs. modo texto (extraer_texto_pdf + extraer_movimientos_vectorizado)
+sobre cartolas sintéticas cifradas con columnas alineadas: primera cartola (detecta la plantilla),
+siguientes (la reutilizan) y una cartola sin columnas (respaldo en modo texto).
+Verifica que ambos modos entreguen los mismos movimientos.
+
+Uso: python -m benchmarks.bench_pdf_tabla [movimientos]
+"""
+import os
+import sys
+import tempfile
+
+from benchmarks.medicion import medir
+from benchmarks.sintetico import generar_pdf
+from utils import pdf_tabla
+from utils.cartola import extraer_movimientos_vectorizado
+from utils.pdf_texto import extraer_texto_pdf
+
+
+def _texto(pdf: bytes):
+    return extraer_movimientos_vectorizado(extraer_texto_pdf(pdf, "1234", workers=1))
+
+
+def main(n: int = 3_000) -> None:
+    pdf_tabla.PLANTILLAS_PATH = os.path.join(tempfile.mkdtemp(), "plantillas_pdf.json")
+    pdf_tabla.recargar()
+    primera = generar_pdf(n, password="1234", columnas=True)
+    siguiente = generar_pdf(n, password="1234", columnas=True, semilla=12, desde="2025-05-26")
+
+    ref = medir("modo texto", lambda: _texto(primera), n, "movimientos", 44)
+    df = medir("modo tabla, primera cartola (detecta)", lambda: pdf_tabla.extraer_movimientos_tabla(primera, "1234"), n, "movimientos", 44)
+    assert df is not None and df.equals(ref), "el modo tabla no coincide con el modo texto"
+
+    pdf_tabla.recargar()  # otra sesión: la plantilla se lee de disco
+    ref = _texto(siguiente)
+    df = medir("modo tabla, cartola siguiente (plantilla)", lambda: pdf_tabla.extraer_movimientos_tabla(siguiente, "1234"), n, "movimientos", 44)
+    assert df is not None and df.equals(ref), "el modo tabla no coincide con el modo texto"
+
+    sin_columnas = generar_pdf(n, password="1234")
+    df = medir("modo tabla, sin columnas (→ None)", lambda: pdf_tabla.extraer_movimientos_tabla(sin_columnas, "1234"), n, "movimientos", 44)
+    assert df is None
+    print(f"  {pdf_tabla.ESTADISTICAS}")
+    print(f"✅ Mismos {len(ref):,} movimientos en ambos modos")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,46 @@
+# benchmarks/bench_pdf_texto.py
+"""
+Benchmark de extracción de texto: join original (extract_text() dos veces por página, en serie)
+vs. extraer_texto_pdf en serie y con ProcessPoolExecutor, sobre las cartolas 80_*_*.pdf del repo.
+Verifica que el texto resultante sea idéntico.
+
+Uso: CARTOLA_PDF_PASSWORD=... python -m benchmarks.bench_pdf_texto [workers] [pdf ...]
+"""
+import glob
+import os
+import sys
+
+import pdfplumber
+
+from benchmarks.medicion import cronometrar
+from utils.pdf_texto import extraer_texto_pdf
+
+
+def _original(ruta: str, password: str) -> str:
+    with pdfplumber.open(ruta, password=password) as pdf:
+        return "\n".join([p.extract_text() for p in pdf.pages if p.extract_text()])
+
+
+def main(workers: int, rutas) -> None:
+    password = os.getenv("CARTOLA_PDF_PASSWORD")
+    if not password:
+        sys.exit("Define CARTOLA_PDF_PASSWORD con la clave de las cartolas.")
+
+    print(f"{'archivo':<46} {'páginas':>7} {'original':>9} {'serie':>9} {'paralelo':>9}")
+    for ruta in rutas:
+        with pdfplumber.open(ruta, password=password) as pdf:
+            n_paginas = len(pdf.pages)
+        ref, t_ref = cronometrar(lambda: _original(ruta, password))
+        serie, t_serie = cronometrar(lambda: extraer_texto_pdf(ruta, password, workers=1))
+        paralelo, t_par = cronometrar(
+            lambda: extraer_texto_pdf(ruta, password, workers=workers, min_paginas_paralelo=1)
+        )
+        assert serie == ref and paralelo == ref, f"El texto extraído difiere en {ruta}"
+        print(f"{os.path.basename(ruta):<46} {n_paginas:>7} {t_ref:>8.2f}s {t_serie:>8.2f}s {t_par:>8.2f}s")
+    print("✅ Texto idéntico en todas las rutas")
+
+
+if __name__ == "__main__":
+    n_workers = int(sys.argv[1]) if len(sys.argv) > 1 else (os.cpu_count() or 1)
+    archivos = sys.argv[2:] or sorted(glob.glob("80_*_*.pdf"))
+    main(n_workers, archivos)
@@ -0,0 +1,52 @@
+# benchmarks/bench_periodos.py
+"""
+Benchmark de asignación de periodo: .apply fila a fila (implementación anterior, día 25 fijo)
+vs. asignar_periodo vectorizado (+ etiquetas solo por periodo distinto).
+Verifica asignar_periodo contra una referencia escalar con calendar, incluyendo cortes 28-31.
+
+Uso: python -m benchmarks.bench_periodos [n_filas]
+"""
+import calendar
+import sys
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.medicion import medir
+from utils.periodos import asignar_periodo, etiquetar_periodos
+
+
+def _apply_anterior(fecha) -> str:
+    fecha = pd.to_datetime(fecha)
+    periodo = pd.Timestamp(year=fecha.year, month=fecha.month, day=25)
+    return periodo.strftime("%Y-%m-%d")
+
+
+def _referencia(fecha: pd.Timestamp, corte: int) -> int:
+    corte_mes = min(corte, calendar.monthrange(fecha.year, fecha.month)[1])
+    anio, mes = fecha.year, fecha.month
+    if fecha.day > corte_mes:
+        anio, mes = (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+    return anio * 100 + mes
+
+
+def main(n: int = 1_000_000) -> None:
+    rnd = np.random.default_rng(5)
+    fechas = pd.Series(pd.Timestamp("2015-01-01") + pd.to_timedelta(rnd.integers(0, 3650, n), unit="D"))
+
+    medir(".apply(obtener_periodo_facturacion)", lambda: fechas.apply(_apply_anterior), n)
+    medir("asignar_periodo", lambda: asignar_periodo(fechas), n)
+    medir("asignar_periodo + etiquetar_periodos", lambda: etiquetar_periodos(asignar_periodo(fechas)), n)
+
+    muestra = fechas.sample(20_000, random_state=1)
+    for corte in (1, 15, 25, 28, 29, 30, 31):
+        esperado = [_referencia(f, corte) for f in muestra]
+        assert asignar_periodo(muestra, corte).tolist() == esperado, f"Difiere con corte {corte}"
+    cortes = rnd.integers(1, 32, len(muestra))
+    esperado = [_referencia(f, int(c)) for f, c in zip(muestra, cortes)]
+    assert asignar_periodo(muestra, cortes).tolist() == esperado, "Difiere con corte por fila"
+    print("✅ asignar_periodo coincide con la referencia escalar")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
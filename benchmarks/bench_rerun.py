@@ -0,0 +1,84 @@
+# benchmarks/bench_rerun.py
+"""
+Latencia de un rerun del dashboard (AppTest) con y sin la caché de utils.cache_app,
+sobre un histórico sintético: rerun sin cambios, cambio de filtro, guardar y borrar una cartola.
+
+Uso: python -m benchmarks.bench_rerun [cartolas] [filas_por_cartola]
+"""
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.bench_historico import generar_cartola
+from utils import agregados, cache_app, historico
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "streamlit_app.py")
+
+
+def _sin_cache() -> None:
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    agregados._memo["firma"] = None
+
+
+def _rerun(at: AppTest, con_cache: bool, accion=None) -> float:
+    if not con_cache:
+        _sin_cache()
+    t0 = time.perf_counter()
+    (accion(at) if accion else at).run()
+    assert not at.exception, at.exception
+    return time.perf_counter() - t0
+
+
+def main(cartolas: int = 48, filas_por_cartola: int = 5_000) -> None:
+    logging.disable(logging.WARNING)
+    rnd = np.random.default_rng(0)
+    periodos = [p.strftime("%Y-%m-%d") for p in pd.date_range("2021-01-25", periods=cartolas, freq="MS") + pd.Timedelta(days=24)]
+    with tempfile.TemporaryDirectory() as tmp:
+        historico.DATASET_DIR = os.path.join(tmp, "movimientos")
+        agregados.AGREGADOS_DIR = os.path.join(tmp, "agregados")
+        for periodo in periodos[:-1]:
+            historico.guardar_periodo(generar_cartola(periodo, filas_por_cartola, rnd), periodo)
+        nueva = generar_cartola(periodos[-1], filas_por_cartola, rnd)
+        print(f"{cartolas - 1} cartolas × {filas_por_cartola:,} filas")
+        print(f"{'rerun':<26} {'sin caché':>10} {'con caché':>10}")
+
+        def filtro(at):
+            selector = at.selectbox[0]
+            return selector.select(selector.options[1 if selector.value == "Todos" else 0])
+
+        def guardar(at):
+            historico.guardar_periodo(nueva, periodos[-1])
+            agregados.sincronizar_agregados()
+            cache_app.invalidar_cartolas([periodos[-1]])
+            return at
+
+        def borrar(at):
+            historico.borrar_periodos([periodos[-1]])
+            agregados.sincronizar_agregados()
+            cache_app.invalidar_cartolas([periodos[-1]])
+            return at
+
+        resultados = {}
+        for con_cache in (False, True):
+            _sin_cache()
+            at = AppTest.from_file(APP, default_timeout=300).run()
+            resultados[con_cache] = [
+                ("sin cambios", min(_rerun(at, con_cache) for _ in range(3))),
+                ("cambio de filtro", min(_rerun(at, con_cache, filtro) for _ in range(3))),
+                ("guardar una cartola", _rerun(at, con_cache, guardar)),
+                ("borrar una cartola", _rerun(at, con_cache, borrar)),
+            ]
+        for (nombre, sin), (_, con) in zip(resultados[False], resultados[True]):
+            print(f"{nombre:<26} {sin * 1000:>8.0f}ms {con * 1000:>8.0f}ms")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
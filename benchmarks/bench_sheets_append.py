@@ -0,0 +1,55 @@
+# benchmarks/bench_sheets_append.py
+"""
+Append a una worksheet falsa con 100k filas existentes:
+método anterior (get_all_values + iterrows + update) vs. append_worksheet
+(fila 1 + append nativo por lotes, con reintentos ante errores de cuota inyectados).
+
+Uso: python -m benchmarks.bench_sheets_append [filas_existentes] [filas_nuevas]
+"""
+import sys
+import time
+
+import pandas as pd
+
+from benchmarks.bench_sheets_sync import generar
+from utils import sheets_io
+from utils.sheets_fake import FakeWorksheet
+from utils.sheets_io import _df_a_valores, append_worksheet
+
+
+def _append_anterior(ws: FakeWorksheet, df: pd.DataFrame) -> None:
+    last_row = len(ws.get_all_values())
+    values = [list(map(lambda x: "" if pd.isna(x) else x, row)) for _, row in df.iterrows()]
+    ws.resize(rows=max(ws.row_count, last_row + len(values)))  # la API no agranda la hoja en update
+    ws.update(f"A{last_row + 1}", values)
+
+
+def _hoja(existentes: pd.DataFrame) -> FakeWorksheet:
+    ws = FakeWorksheet()
+    ws.cargar([list(existentes.columns)] + _df_a_valores(existentes))
+    return ws
+
+
+def main(filas_existentes: int = 100_000, filas_nuevas: int = 20_000) -> None:
+    existentes = generar(filas_existentes, 0)
+    nuevas = generar(filas_nuevas, 1)
+    nuevas["Fecha"] = nuevas["Fecha"].dt.strftime("%Y-%m-%d")  # el método anterior no serializa Timestamps
+    sheets_io.REINTENTO_ESPERA_INICIAL = 0.01
+
+    print(f"{filas_existentes:,} filas existentes, {filas_nuevas:,} nuevas")
+    print(f"{'método':<22} {'llamadas':>8} {'celdas leídas':>14} {'tiempo':>9}")
+    for nombre, fn, fallas in (("anterior", _append_anterior, 0), ("append_worksheet", append_worksheet, 2)):
+        ws = _hoja(existentes)
+        ws.fallas["append_rows"] = fallas  # errores 429 inyectados
+        t0 = time.perf_counter()
+        fn(ws, nuevas)
+        dt = time.perf_counter() - t0
+        llamadas, leidas = ws.total_llamadas, ws.celdas_leidas
+        assert len(ws.get_all_values()) == 1 + filas_existentes + filas_nuevas
+        print(f"{nombre:<22} {llamadas:>8} {leidas:>14,} {dt:>8.3f}s")
+    print("✅ Ambas rutas dejan la hoja con todas las filas (append con 2 errores 429 reintentados)")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(*args)
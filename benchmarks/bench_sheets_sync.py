@@ -0,0 +1,57 @@
+# benchmarks/bench_sheets_sync.py
+"""
+Exportación a Sheets contra un worksheet falso (utils.sheets_fake): reescritura completa
+(overwrite_worksheet, como update_sheet_with_dataframe) vs. sync_worksheet (delta).
+Reporta llamadas a la API, celdas escritas y tiempo, para un histórico que crece mes a mes.
+
+Uso: python -m benchmarks.bench_sheets_sync [filas_iniciales]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.sheets_fake import FakeWorksheet
+from utils.sheets_io import overwrite_worksheet, sync_worksheet
+
+
+def generar(n: int, semilla: int) -> pd.DataFrame:
+    rnd = np.random.default_rng(semilla)
+    return pd.DataFrame({
+        "Fecha": pd.Timestamp("2020-01-01") + pd.to_timedelta(rnd.integers(0, 2000, n), unit="D"),
+        "Descripción": rnd.choice(["COMPRA LIDER", "UBER TRIP", "COPEC", "STARBUCKS", "ENEL"], n),
+        "Monto": rnd.integers(1_000, 500_000, n),
+        "Categoría": rnd.choice(["🛒 Supermercado", "🚗 Transporte", "⛽ Gasolina", "🍽️ Comida", "💡 Luz"], n),
+    })
+
+
+def main(filas_iniciales: int = 20_000) -> None:
+    df = generar(filas_iniciales, 0)
+    ws_full, ws_delta = FakeWorksheet(), FakeWorksheet()
+    overwrite_worksheet(ws_full, df)
+    sync_worksheet(ws_delta, df)
+
+    print(f"{'paso':<28} {'modo':<12} {'llamadas':>8} {'celdas':>10} {'tiempo':>9}")
+    pasos = [
+        ("+300 movimientos (1 mes)", lambda d: pd.concat([d, generar(300, 1)], ignore_index=True)),
+        ("recategoriza 50 filas", lambda d: d.assign(Categoría=d["Categoría"].where(d.index % 400 != 0, "📦 Otro gasto"))),
+        ("borra 1 cartola (300 filas)", lambda d: d.iloc[:-300]),
+        ("sin cambios", lambda d: d),
+    ]
+    for nombre, paso in pasos:
+        df = paso(df)
+        for modo, ws, fn in (("completo", ws_full, overwrite_worksheet), ("delta", ws_delta, sync_worksheet)):
+            ws.llamadas.clear()
+            ws.celdas_escritas = 0
+            t0 = time.perf_counter()
+            fn(ws, df)
+            dt = time.perf_counter() - t0
+            print(f"{nombre:<28} {modo:<12} {ws.total_llamadas:>8} {ws.celdas_escritas:>10,} {dt:>8.3f}s")
+
+    assert len(ws_delta.get_all_values()) - 1 == len(df)
+    print("✅ La hoja delta quedó con el mismo número de filas que el DataFrame")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
@@ -0,0 +1,103 @@
+# benchmarks/bench_sql.py
+"""
+Backend SQLite (utils.historico_sql) vs. backend pandas (índice en memoria + agregados) sobre
+un histórico sintético grande: preparación en frío, cada interacción del dashboard (filtros,
+KPIs + gasto por categoría, conteo + primera página, gasto neto por periodo, gasto diario) y memoria.
+Verifica que ambos backends entreguen lo mismo.
+
+Uso: python -m benchmarks.bench_sql [filas] [cartolas]     (p. ej. 1000000 36, 10000000 120)
+"""
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+from benchmarks.medicion import medir
+from benchmarks.sintetico import generar_historico
+from utils import agregados, consultas, historico, historico_sql
+from utils.movimientos import compactar
+from utils.periodos import clave_desde_etiqueta
+
+
+def _pandas(indice, agregado, periodo, categorias):
+    vista = agregados.filtrar_agregado(agregado, periodo, categorias)
+    clave = None if periodo == "Todos" else clave_desde_etiqueta(periodo)
+    resultado = consultas.consultar(indice, clave, categorias)
+    return (
+        agregados.kpis(vista), agregados.gasto_por_categoria(vista),
+        resultado["total"], consultas.pagina(indice, resultado, 0),
+    )
+
+
+def _sql(periodo, categorias):
+    clave = None if periodo == "Todos" else clave_desde_etiqueta(periodo)
+    resumen = historico_sql.resumen_por_categoria(clave, categorias)
+    resultado = historico_sql.consultar(clave, categorias)
+    return (
+        historico_sql.kpis(resumen), historico_sql.gasto_por_categoria(resumen),
+        resultado["total"], historico_sql.pagina(resultado, 0),
+    )
+
+
+def _iguales(a, b) -> None:
+    (kpis_a, cat_a, total_a, pag_a), (kpis_b, cat_b, total_b, pag_b) = a, b
+    assert {k: float(v) for k, v in kpis_a.items()} == {k: float(v) for k, v in kpis_b.items()}, (kpis_a, kpis_b)
+    assert cat_a["Categoría"].tolist() == cat_b["Categoría"].tolist()
+    assert np.array_equal(cat_a["Monto"].to_numpy(dtype=float), cat_b["Monto"].to_numpy(dtype=float))
+    assert total_a == total_b, (total_a, total_b)
+    # el orden entre movimientos del mismo instante es libre: se compara la secuencia de fechas
+    assert np.array_equal(pag_a["Fecha"].to_numpy(), pag_b["Fecha"].to_numpy())
+
+
+def main(filas: int = 1_000_000, cartolas: int = 36) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        historico.DATASET_DIR = os.path.join(tmp, "movimientos")
+        agregados.AGREGADOS_DIR = os.path.join(tmp, "agregados")
+        historico_sql.RUTA_DB = os.path.join(tmp, "movimientos.sqlite")
+        df = generar_historico(filas, cartolas)
+        for periodo, parte in df.groupby("Periodo", observed=True):
+            historico.guardar_periodo(parte, str(periodo))
+        del df, parte
+        print(f"{filas:,} movimientos en {cartolas} cartolas")
+
+        print("— preparación en frío —")
+        indice = medir("pandas: cargar + compactar + indexar", lambda: consultas.construir_indice(
+            compactar(historico.cargar_historico(columnas=["Fecha", "Descripción", "Monto", "Categoría"], diccionario=True))
+        ), ancho=52)
+        agregado = medir("pandas: agregados por cartola", agregados.cargar_agregados, ancho=52)
+        medir("sqlite: sincronizar (carga inicial)", historico_sql.sincronizar, ancho=52)
+        medir("sqlite: sincronizar (sin cambios)", historico_sql.sincronizar, ancho=52)
+        ultima = historico.listar_periodos()[-1]
+        historico.guardar_periodo(historico.cargar_historico(periodos=[ultima]), ultima)  # p. ej. reclasificación
+        medir("sqlite: sincronizar (1 cartola reescrita)", historico_sql.sincronizar, ancho=52)
+
+        print("— interacciones —")
+        periodos, categorias = medir("sqlite: opciones de filtro", historico_sql.opciones_filtros, ancho=52, repeticiones=5)
+        assert periodos == sorted(agregado["Periodo"].unique(), reverse=True)
+        assert categorias == sorted(agregado["Categoría"].unique())
+        casos = {"Todos / todas": ("Todos", categorias), "1 periodo / 3 categorías": (periodos[len(periodos) // 2], categorias[:3])}
+        for nombre, (periodo, cats) in casos.items():
+            esperado = medir(f"pandas: {nombre}", lambda: _pandas(indice, agregado, periodo, cats), ancho=52, repeticiones=5)
+            obtenido = medir(f"sqlite: {nombre}", lambda: _sql(periodo, cats), ancho=52, repeticiones=5)
+            _iguales(esperado, obtenido)
+
+        neto_pandas = medir("pandas: gasto neto por periodo", lambda: agregados.gasto_neto_por_periodo(agregado), ancho=52, repeticiones=5)
+        neto_sql = medir("sqlite: gasto neto por periodo", historico_sql.gasto_neto_por_periodo, ancho=52, repeticiones=5)
+        assert neto_pandas["Periodo"].tolist() == neto_sql["Periodo"].tolist()
+        assert np.array_equal(neto_pandas["Gasto Neto"].to_numpy(dtype=float), neto_sql["Gasto Neto"].to_numpy(dtype=float))
+
+        diario_pandas = medir("pandas: gasto diario", lambda: agregados.gasto_diario(agregado), ancho=52, repeticiones=5)
+        diario_sql = medir("sqlite: gasto diario", lambda: historico_sql.gasto_diario(None, categorias), ancho=52, repeticiones=5)
+        assert np.array_equal(diario_pandas["Dia"].to_numpy(), diario_sql["Dia"].to_numpy())
+        assert np.array_equal(diario_pandas["Gastos"].to_numpy(dtype=float), diario_sql["Gastos"].to_numpy(dtype=float))
+
+        print("— memoria —")
+        en_memoria = indice["tabla"].memory_usage(deep=True).sum() + sum(b.nbytes for b in indice["bitmaps_categoria"].values())
+        print(f"pandas: índice residente en el proceso              {en_memoria / 2**20:10.1f} MiB")
+        print(f"sqlite: archivo en disco (residente: solo páginas)  {os.path.getsize(historico_sql.RUTA_DB) / 2**20:10.1f} MiB")
+        print("✅ mismos KPIs, categorías, conteos, páginas, gasto neto y gasto diario en ambos backends")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,27 @@
+# benchmarks/medicion.py
+"""Cronómetro y formato de salida compartidos por los benchmarks."""
+import time
+from typing import Any, Callable, Optional, Tuple
+
+
+def cronometrar(fn: Callable[[], Any], repeticiones: int = 1) -> Tuple[Any, float]:
+    """Corre fn `repeticiones` veces. Retorna (último resultado, segundos por corrida)."""
+    t0 = time.perf_counter()
+    for _ in range(repeticiones):
+        resultado = fn()
+    return resultado, (time.perf_counter() - t0) / repeticiones
+
+
+def linea(nombre: str, segundos: float, n: Optional[int] = None, unidad: str = "filas", ancho: int = 40) -> str:
+    """Con n: segundos y rendimiento (unidades/s); sin n: milisegundos."""
+    if n is None:
+        return f"{nombre:<{ancho}} {segundos * 1000:10.1f} ms"
+    return f"{nombre:<{ancho}} {segundos:8.3f} s  {n / segundos:>14,.0f} {unidad}/s"
+
+
+def medir(nombre: str, fn: Callable[[], Any], n: Optional[int] = None, unidad: str = "filas",
+          ancho: int = 40, repeticiones: int = 1) -> Any:
+    """Cronometra fn, imprime su línea (ver linea) y retorna el resultado."""
+    resultado, segundos = cronometrar(fn, repeticiones)
+    print(linea(nombre, segundos, n, unidad, ancho))
+    return resultado
@@ -0,0 +1,282 @@
+# benchmarks/sintetico.py
+"""
+Cartolas sintéticas estilo Santander para benchmarks (sin datos reales):
+
+- generar_lineas / generar_texto: líneas como las entrega extract_text() — cabecera de 8 líneas,
+  movimientos "CIUDAD dd/mm/aaaa COMERCIO [*1234] $ 12.345", notas de crédito, líneas sin
+  descripción y ruido de pie de página.
+- generar_pdf: el mismo texto como PDF (Helvetica, varias páginas), opcionalmente cifrado con
+  la clave del PDF (RC4 128 bits, el cifrado estándar que pdfplumber abre con password=).
+  Con columnas=True cada campo va en su columna (como la tabla de una cartola real); el texto
+  que entrega extract_text() es el mismo.
+- generar_historico: movimientos ya tipados (como cargar_historico) repartidos en cartolas.
+
+La mezcla de comercios es configurable: {comercio: peso}. Todo es determinista por semilla.
+"""
+import hashlib
+import random
+import struct
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from utils.cartola import LINEAS_CABECERA
+from utils.clasificador import classify_series
+from utils.periodos import asignar_periodo, etiquetar_periodos
+
+# Comercio → peso relativo (pocos comercios concentran la mayoría de los movimientos)
+MEZCLA_COMERCIOS: Dict[str, float] = {
+    "COMPRA LIDER EXPRESS": 12, "JUMBO LA DEHESA": 8, "STA ISABEL": 6, "TOTTUS": 4,
+    "COPEC AUTOPISTA": 6, "SHELL": 3, "UBER TRIP": 10, "DIDI RIDE": 4, "BIPQR METRO": 3,
+    "MERCADOLIBRE*VENTA": 6, "STARBUCKS COSTANERA": 5, "MCDONALD S": 3, "RESTAURANTE EL PARRON": 2,
+    "FARMACIA CRUZ VERDE": 4, "SALCO BRAND": 2, "ENEL DISTRIBUCION": 1, "ENTEL PCS": 1,
+    "AGUAS CORDILLERA": 1, "METROGAS": 1, "MOVISTARHOGAR": 1, "CHATGPT SUBSCRIPTION": 1,
+    "FALABELLA": 3, "PARIS": 2, "H&M": 1, "VESPUCIONORTE": 2, "COSTANERA NORTE": 2,
+    "ESTACIONAMIENTO SABA": 2, "PET HAPPY": 1, "BARBERIA CENTRAL": 1, "SEGURO AUTO": 1,
+    "TIENDA SIN CATEGORIA": 3, "ZAPATERIA XYZ LTDA": 2,
+}
+CIUDADES = ["SANTIAGO", "PROVIDENCIA", "LAS CONDES", "VINA DEL MAR", "NUNOA", "STGO"]
+CABECERA = [
+    "BANCO SANTANDER CHILE",
+    "ESTADO DE CUENTA EN MONEDA NACIONAL DE TARJETA DE CREDITO",
+    "NOMBRE DEL TITULAR: CLIENTE SINTETICO",
+    "NUMERO DE TARJETA: XXXX XXXX XXXX 1234",
+    "FECHA ESTADO DE CUENTA: 25/05/2025",
+    "PERIODO FACTURADO: 26/04/2025 AL 25/05/2025",
+    "LUGAR DE OPERACION FECHA DESCRIPCION MONTO",
+    "2. PERIODO ACTUAL",
+]
+assert len(CABECERA) == LINEAS_CABECERA
+
+
+def _monto(rnd: random.Random) -> str:
+    return f"{int(rnd.lognormvariate(9.5, 1.2)) + 100:,}".replace(",", ".")
+
+
+def _filas(
+    n_movimientos: int,
+    comercios: Optional[Dict[str, float]] = None,
+    desde: str = "2025-04-26",
+    dias: int = 30,
+    semilla: int = 11,
+) -> List[Union[str, Tuple[str, str, str, str]]]:
+    """Cabecera y ruido como texto; movimientos como (lugar, fecha, descripción, "$ monto")."""
+    rnd = random.Random(semilla)
+    mezcla = comercios or MEZCLA_COMERCIOS
+    nombres, pesos = list(mezcla), list(mezcla.values())
+    inicio = pd.Timestamp(desde)
+    filas: List[Union[str, Tuple[str, str, str, str]]] = list(CABECERA)
+    for i, comercio in enumerate(rnd.choices(nombres, pesos, k=n_movimientos)):
+        fecha = (inicio + pd.Timedelta(days=rnd.randrange(dias))).strftime("%d/%m/%Y")
+        r = rnd.random()
+        if r < 0.15:
+            comercio = f"{comercio} *{rnd.randint(1000, 9999)}"
+        elif r < 0.20:
+            comercio = f"{comercio} CUOTA {rnd.randint(1, 6):02d}/06"
+        elif r < 0.23:
+            comercio = f"NOTA DE CREDITO {comercio}"
+        if r > 0.99:
+            filas.append(("", fecha, "", f"$ {_monto(rnd)}"))  # sin descripción → "Revisar"
+        elif r > 0.98:
+            filas.append(("", fecha, f"{fecha} {comercio}", f"$ -{_monto(rnd)}"))  # fecha repetida
+        else:
+            filas.append((rnd.choice(CIUDADES), fecha, comercio, f"$ {_monto(rnd)}"))
+        if rnd.random() < 0.05:
+            filas.append(f"TOTAL OPERACIONES PAGINA {i // 40 + 1}")
+    return filas
+
+
+def _unir(fila: Union[str, Tuple[str, ...]]) -> str:
+    return fila if isinstance(fila, str) else " ".join(campo for campo in fila if campo)
+
+
+def generar_lineas(n_movimientos: int, **kwargs) -> List[str]:
+    """
+    Líneas de una cartola: cabecera + n_movimientos (más ~5% de ruido sin "$").
+    Variantes por movimiento: sufijo de tarjeta (*1234), cuotas, nota de crédito,
+    fecha repetida y sin descripción. kwargs: comercios, desde, dias, semilla.
+    """
+    return [_unir(fila) for fila in _filas(n_movimientos, **kwargs)]
+
+
+def generar_descripciones(n: int, comercios: Optional[Dict[str, float]] = None, semilla: int = 7) -> pd.Series:
+    """Descripciones como las deja el parser (comercio con sufijo de tarjeta o cuota en ~20%)."""
+    rnd = random.Random(semilla)
+    mezcla = comercios or MEZCLA_COMERCIOS
+    descripciones = []
+    for comercio in rnd.choices(list(mezcla), list(mezcla.values()), k=n):
+        r = rnd.random()
+        if r < 0.15:
+            comercio = f"{comercio} *{rnd.randint(1000, 9999)}"
+        elif r < 0.20:
+            comercio = f"{comercio} CUOTA {rnd.randint(1, 6):02d}/06"
+        descripciones.append(comercio)
+    return pd.Series(descripciones)
+
+
+def generar_texto(n_movimientos: int, **kwargs) -> str:
+    """Como generar_lineas, unido con saltos de línea (lo que recibe extraer_movimientos)."""
+    return "\n".join(generar_lineas(n_movimientos, **kwargs))
+
+
+# --- PDF mínimo (texto en Helvetica), opcionalmente cifrado ---
+_RELLENO = bytes.fromhex("28BF4E5E4E758A4164004E56FFFA01082E2E00B6D0683E802F0CA9FE6453697A")
+_PERMISOS = -44  # imprimir + copiar (bits 3 y 5), resto según la especificación
+
+
+def _rc4(clave: bytes, datos: bytes) -> bytes:
+    s = list(range(256))
+    j = 0
+    for i in range(256):
+        j = (j + s[i] + clave[i % len(clave)]) % 256
+        s[i], s[j] = s[j], s[i]
+    out = bytearray(len(datos))
+    i = j = 0
+    for n, byte in enumerate(datos):
+        i = (i + 1) % 256
+        j = (j + s[i]) % 256
+        s[i], s[j] = s[j], s[i]
+        out[n] = byte ^ s[(s[i] + s[j]) % 256]
+    return bytes(out)
+
+
+def _rc4_19(clave: bytes, datos: bytes) -> bytes:
+    """Cifra con la clave y luego 19 veces más con clave XOR i (revisión 3)."""
+    for i in range(20):
+        datos = _rc4(bytes(b ^ i for b in clave), datos)
+    return datos
+
+
+def _md5_50(datos: bytes) -> bytes:
+    digest = hashlib.md5(datos).digest()
+    for _ in range(50):
+        digest = hashlib.md5(digest).digest()
+    return digest
+
+
+def _cifrado_estandar(password: str, id_doc: bytes):
+    """Diccionario /Encrypt (V2 R3, 128 bits) y clave del documento (algoritmos 2, 3 y 5 de PDF 1.7)."""
+    usuario = (password.encode("latin-1") + _RELLENO)[:32]
+    valor_o = _rc4_19(_md5_50(usuario), usuario)  # clave de propietario = clave de usuario
+    clave = _md5_50(usuario + valor_o + struct.pack("<i", _PERMISOS) + id_doc)
+    valor_u = _rc4_19(clave, hashlib.md5(_RELLENO + id_doc).digest()) + bytes(16)
+    encrypt = (
+        f"<< /Filter /Standard /V 2 /R 3 /Length 128 /P {_PERMISOS} "
+        f"/O <{valor_o.hex()}> /U <{valor_u.hex()}> >>"
+    ).encode()
+    return encrypt, clave
+
+
+def _escapar(linea: str) -> bytes:
+    return linea.encode("cp1252", "replace").replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def _contenido_pagina(lineas: Sequence[str]) -> bytes:
+    partes = [b"BT /F1 9 Tf 12 TL 36 800 Td"]
+    partes += [b"(" + _escapar(linea) + b") Tj T*" for linea in lineas]
+    partes.append(b"ET")
+    return b"\n".join(partes)
+
+
+# x de cada columna (lugar, fecha, descripción, monto) en el modo columnas
+_X_COLUMNAS = (36, 130, 190, 470)
+
+
+def _contenido_pagina_columnas(filas: Sequence[Union[str, Tuple[str, ...]]]) -> bytes:
+    partes = [b"BT /F1 9 Tf"]
+    for i, fila in enumerate(filas):
+        y = 800 - 12 * i
+        campos = [(36, fila)] if isinstance(fila, str) else zip(_X_COLUMNAS, fila)
+        partes += [f"1 0 0 1 {x} {y} Tm (".encode() + _escapar(campo) + b") Tj" for x, campo in campos if campo]
+    partes.append(b"ET")
+    return b"\n".join(partes)
+
+
+def generar_pdf(
+    n_movimientos: int,
+    password: Optional[str] = None,
+    lineas_por_pagina: int = 60,
+    columnas: bool = False,
+    **kwargs,
+) -> bytes:
+    """
+    PDF de una cartola sintética (ver generar_lineas para kwargs), lineas_por_pagina por página.
+    Con password se cifra (RC4 128 bits): se abre con pdfplumber.open(..., password=password).
+    Con columnas=True los campos de cada movimiento quedan alineados en columnas.
+    """
+    filas = _filas(n_movimientos, **kwargs)
+    if not columnas:
+        filas = [_unir(fila) for fila in filas]
+    contenido_pagina = _contenido_pagina_columnas if columnas else _contenido_pagina
+    paginas = [filas[i:i + lineas_por_pagina] for i in range(0, len(filas), lineas_por_pagina)]
+    id_doc = hashlib.md5(f"{n_movimientos}-{kwargs}{'-columnas' if columnas else ''}".encode()).digest()
+    encrypt, clave = _cifrado_estandar(password, id_doc) if password else (None, None)
+
+    # 1 catálogo, 2 árbol de páginas, 3 fuente; luego (página, contenido) por página
+    n_paginas = len(paginas)
+    hijos = " ".join(f"{4 + 2 * i} 0 R" for i in range(n_paginas))
+    objetos: List[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{hijos}] /Count {n_paginas} >>".encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    for i, pagina in enumerate(paginas):
+        num_contenido = 5 + 2 * i
+        contenido = contenido_pagina(pagina)
+        if clave:
+            clave_obj = hashlib.md5(clave + struct.pack("<i", num_contenido)[:3] + b"\0\0").digest()
+            contenido = _rc4(clave_obj, contenido)
+        objetos.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {num_contenido} 0 R >>".encode()
+        )
+        objetos.append(f"<< /Length {len(contenido)} >>\nstream\n".encode() + contenido + b"\nendstream")
+    if encrypt:
+        objetos.append(encrypt)
+
+    salida = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for n, objeto in enumerate(objetos, start=1):
+        offsets.append(len(salida))
+        salida += f"{n} 0 obj\n".encode() + objeto + b"\nendobj\n"
+    inicio_xref = len(salida)
+    salida += f"xref\n0 {len(objetos) + 1}\n0000000000 65535 f \n".encode()
+    salida += b"".join(f"{o:010d} 00000 n \n".encode() for o in offsets)
+    trailer = f"<< /Size {len(objetos) + 1} /Root 1 0 R /ID [<{id_doc.hex()}> <{id_doc.hex()}>]"
+    if encrypt:
+        trailer += f" /Encrypt {len(objetos)} 0 R"
+    salida += f"trailer\n{trailer} >>\nstartxref\n{inicio_xref}\n%%EOF\n".encode()
+    return bytes(salida)
+
+
+# --- Histórico tipado ---
+def generar_historico(
+    n: int,
+    cartolas: int = 24,
+    comercios: Optional[Dict[str, float]] = None,
+    semilla: int = 0,
+) -> pd.DataFrame:
+    """
+    n movimientos tipados (Fecha datetime64, Monto int64, Categoría categórica) repartidos en
+    `cartolas` periodos consecutivos; la columna Periodo es la etiqueta de su cartola (25 a 25).
+    La Categoría sale de REGLAS vía classify_series sobre los comercios distintos.
+    """
+    rnd = np.random.default_rng(semilla)
+    mezcla = comercios or MEZCLA_COMERCIOS
+    nombres = np.array(list(mezcla), dtype=object)
+    pesos = np.array(list(mezcla.values()), dtype=float)
+    categorias = classify_series(pd.Series(nombres)).to_numpy()
+    elegidos = rnd.choice(len(nombres), n, p=pesos / pesos.sum())
+
+    fin = pd.Timestamp("2025-05-25")
+    fechas = fin - pd.to_timedelta(rnd.integers(0, 30 * cartolas, n), unit="D")
+    montos = rnd.lognormal(9.5, 1.2, n).astype("int64") + 100
+    montos = np.where(rnd.random(n) < 0.03, -montos, montos)
+    return pd.DataFrame({
+        "Fecha": fechas,
+        "Descripción": pd.Series(nombres[elegidos], dtype=str),
+        "Monto": montos,
+        "Categoría": pd.Categorical(categorias[elegidos]),
+        "Periodo": etiquetar_periodos(asignar_periodo(fechas)),
+    })
@@ -0,0 +1,284 @@
+# benchmarks/suite.py
+"""
+Suite de benchmarks sobre datos sintéticos (benchmarks.sintetico), con resultados en JSON
+para comparar entre commits.
+
+Suites: parser (extraer_movimientos*), clasificador, periodos, pdf (PDF cifrado: texto y modo tabla),
+historico (guardar/cargar/compactar/agregar en un directorio temporal) y exportacion
+(serialización a Sheets y Drive contra sheets_fake/drive_fake, sin red).
+
+Cada caso se repite y se guarda el mínimo y la mediana. El JSON incluye el commit (git),
+las versiones de Python/pandas/pyarrow y la escala usada.
+
+Uso:
+    python -m benchmarks.suite                                  # todas, escala "media"
+    python -m benchmarks.suite parser historico --escala chica
+    python -m benchmarks.suite --salida antes.json
+    python -m benchmarks.suite --comparar antes.json            # falla si algo empeora > --tolerancia
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from benchmarks import sintetico
+from utils import agregados, clientes_google, drive_io, historico, pdf_tabla, sheets_io
+from utils.cartola import extraer_movimientos, extraer_movimientos_vectorizado, normalizar_movimientos
+from utils.clasificador import _clasificar_texto, clasificar_categoria, classify_series
+from utils.drive_fake import FakeDrive, FakeSesionSubida
+from utils.movimientos import compactar
+from utils.pdf_tabla import extraer_movimientos_tabla
+from utils.pdf_texto import extraer_texto_pdf
+from utils.periodos import asignar_periodo, etiquetar_periodos
+from utils.sheets_fake import FakeWorksheet
+
+RESULTADOS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resultados")
+FORMATO_VERSION = 1
+
+# Tamaños por escala: movimientos del parser/clasificador/periodos, movimientos del PDF,
+# filas del histórico (y cartolas), filas exportadas.
+ESCALAS: Dict[str, Dict[str, int]] = {
+    "chica": {"lineas": 20_000, "pdf": 600, "historico": 100_000, "cartolas": 12, "export": 5_000, "repeticiones": 3},
+    "media": {"lineas": 200_000, "pdf": 3_000, "historico": 1_000_000, "cartolas": 36, "export": 50_000, "repeticiones": 5},
+    "grande": {"lineas": 1_000_000, "pdf": 12_000, "historico": 5_000_000, "cartolas": 120, "export": 200_000, "repeticiones": 5},
+}
+
+Caso = Dict  # {"suite", "caso", "n", "unidad", "fn", "repeticiones"?}
+
+
+# --- Suites: cada una prepara sus datos y retorna los casos a medir ---
+def suite_parser(e: Dict[str, int]) -> List[Caso]:
+    texto = sintetico.generar_texto(e["lineas"])
+    movimientos = extraer_movimientos_vectorizado(texto)
+    n = e["lineas"]
+    return [
+        {"caso": "extraer_movimientos", "n": n, "unidad": "lineas", "fn": lambda: extraer_movimientos(texto), "repeticiones": 1},
+        {"caso": "extraer_movimientos_vectorizado", "n": n, "unidad": "lineas", "fn": lambda: extraer_movimientos_vectorizado(texto)},
+        {"caso": "normalizar_movimientos", "n": len(movimientos), "unidad": "filas", "fn": lambda: normalizar_movimientos(movimientos)},
+    ]
+
+
+def suite_clasificador(e: Dict[str, int]) -> List[Caso]:
+    descripciones = sintetico.generar_descripciones(e["lineas"])
+
+    def escalar_en_frio():
+        _clasificar_texto.cache_clear()
+        return [clasificar_categoria(d) for d in descripciones]
+
+    n = len(descripciones)
+    return [
+        {"caso": "clasificar_categoria (frío)", "n": n, "unidad": "filas", "fn": escalar_en_frio},
+        {"caso": "clasificar_categoria (memo)", "n": n, "unidad": "filas", "fn": lambda: [clasificar_categoria(d) for d in descripciones]},
+        {"caso": "classify_series", "n": n, "unidad": "filas", "fn": lambda: classify_series(descripciones)},
+    ]
+
+
+def suite_periodos(e: Dict[str, int]) -> List[Caso]:
+    fechas = sintetico.generar_historico(e["lineas"], e["cartolas"])["Fecha"]
+    n = len(fechas)
+    return [
+        {"caso": "asignar_periodo", "n": n, "unidad": "filas", "fn": lambda: asignar_periodo(fechas)},
+        {"caso": "asignar_periodo + etiquetar", "n": n, "unidad": "filas", "fn": lambda: etiquetar_periodos(asignar_periodo(fechas))},
+    ]
+
+
+def suite_pdf(e: Dict[str, int]) -> List[Caso]:
+    pdf = sintetico.generar_pdf(e["pdf"], password="1234")
+    tabla = sintetico.generar_pdf(e["pdf"], password="1234", columnas=True)
+    pdf_tabla.PLANTILLAS_PATH = os.path.join(tempfile.mkdtemp(), "plantillas_pdf.json")
+    pdf_tabla.recargar()  # el calentamiento detecta la plantilla; las repeticiones la reutilizan
+    n = e["pdf"]
+    return [
+        {"caso": "extraer_texto_pdf (1 proceso)", "n": n, "unidad": "lineas", "fn": lambda: extraer_texto_pdf(pdf, "1234", workers=1), "repeticiones": 2},
+        {"caso": "extraer_texto_pdf (paralelo)", "n": n, "unidad": "lineas", "fn": lambda: extraer_texto_pdf(pdf, "1234", min_paginas_paralelo=2), "repeticiones": 2},
+        {"caso": "texto + vectorizado (columnas)", "n": n, "unidad": "lineas", "fn": lambda: extraer_movimientos_vectorizado(extraer_texto_pdf(tabla, "1234", workers=1)), "repeticiones": 2},
+        {"caso": "extraer_movimientos_tabla (columnas)", "n": n, "unidad": "lineas", "fn": lambda: extraer_movimientos_tabla(tabla, "1234"), "repeticiones": 2},
+    ]
+
+
+def suite_historico(e: Dict[str, int]) -> List[Caso]:
+    df = sintetico.generar_historico(e["historico"], e["cartolas"])
+    por_periodo = {str(p): g for p, g in df.groupby("Periodo", observed=True)}
+    tmp = tempfile.mkdtemp(prefix="bench_historico_")
+    historico.DATASET_DIR = os.path.join(tmp, "movimientos")
+    agregados.AGREGADOS_DIR = os.path.join(tmp, "agregados")
+
+    def guardar():
+        for periodo, parte in por_periodo.items():
+            historico.guardar_periodo(parte, periodo)
+
+    def agregar_desde_cero():
+        for archivo in os.listdir(agregados.AGREGADOS_DIR) if os.path.isdir(agregados.AGREGADOS_DIR) else []:
+            os.remove(os.path.join(agregados.AGREGADOS_DIR, archivo))
+        agregados._memo["firma"] = None
+        return agregados.cargar_agregados()
+
+    guardar()
+    cargado = historico.cargar_historico(columnas=["Fecha", "Descripción", "Monto", "Categoría"], diccionario=True)
+    n = len(df)
+    un_periodo = [next(iter(por_periodo))]
+    return [
+        {"caso": "guardar_periodo (todas)", "n": n, "unidad": "filas", "fn": guardar},
+        {"caso": "cargar_historico", "n": n, "unidad": "filas", "fn": lambda: historico.cargar_historico(columnas=["Fecha", "Descripción", "Monto", "Categoría"])},
+        {"caso": "cargar_historico (1 periodo)", "n": len(por_periodo[un_periodo[0]]), "unidad": "filas", "fn": lambda: historico.cargar_historico(periodos=un_periodo)},
+        {"caso": "compactar", "n": n, "unidad": "filas", "fn": lambda: compactar(cargado)},
+        {"caso": "calcular_agregado", "n": n, "unidad": "filas", "fn": lambda: agregados.calcular_agregado(cargado)},
+        {"caso": "sincronizar + cargar_agregados (frío)", "n": n, "unidad": "filas", "fn": agregar_desde_cero},
+    ]
+
+
+def suite_exportacion(e: Dict[str, int]) -> List[Caso]:
+    df = sintetico.generar_historico(e["export"])[["Fecha", "Descripción", "Monto", "Categoría"]]
+    drive = FakeDrive()
+    drive.crear("cartola.csv", padre=drive.crear(drive_io.DRIVE_FOLDER_NAME, carpeta=True))
+    drive_io._crear_drive = lambda: drive
+    drive_io.SUBIDA_ESPERA_INICIAL = 0.001
+    clientes_google.invalidar()
+
+    def sync_inicial():
+        return sheets_io.sync_worksheet(FakeWorksheet(), df)
+
+    hoja = FakeWorksheet()
+    sheets_io.sync_worksheet(hoja, df)
+    n = len(df)
+    return [
+        {"caso": "_df_a_valores", "n": n, "unidad": "filas", "fn": lambda: sheets_io._df_a_valores(df)},
+        {"caso": "claves_movimientos", "n": n, "unidad": "filas", "fn": lambda: sheets_io.claves_movimientos(df)},
+        {"caso": "sync_worksheet (hoja vacía)", "n": n, "unidad": "filas", "fn": sync_inicial},
+        {"caso": "sync_worksheet (sin cambios)", "n": n, "unidad": "filas", "fn": lambda: sheets_io.sync_worksheet(hoja, df)},
+        {"caso": "append_worksheet", "n": n, "unidad": "filas", "fn": lambda: sheets_io.append_worksheet(FakeWorksheet(), df)},
+        {"caso": "csv_en_trozos", "n": n, "unidad": "filas", "fn": lambda: sum(len(t) for t in drive_io.csv_en_trozos(df))},
+        {"caso": "subir_a_drive", "n": n, "unidad": "filas", "fn": lambda: drive_io.subir_a_drive(
+            drive_io.csv_en_trozos(df), "cartola.csv", sesion=FakeSesionSubida(drive))},
+    ]
+
+
+SUITES: Dict[str, Callable[[Dict[str, int]], List[Caso]]] = {
+    "parser": suite_parser,
+    "clasificador": suite_clasificador,
+    "periodos": suite_periodos,
+    "pdf": suite_pdf,
+    "historico": suite_historico,
+    "exportacion": suite_exportacion,
+}
+
+
+# --- Medición ---
+def medir_caso(fn: Callable, repeticiones: int) -> List[float]:
+    """Una corrida de calentamiento y luego `repeticiones` tiempos (s)."""
+    fn()
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        fn()
+        tiempos.append(time.perf_counter() - t0)
+    return tiempos
+
+
+def _commit() -> Optional[str]:
+    try:
+        salida = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        sucio = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True).stdout
+        return salida.stdout.strip() + ("-dirty" if sucio.strip() else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _metadatos(escala: str) -> Dict:
+    return {
+        "formato": FORMATO_VERSION,
+        "commit": _commit(),
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "escala": escala,
+        "tamanos": ESCALAS[escala],
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "pyarrow": pa.__version__,
+        "maquina": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def correr(suites: List[str], escala: str = "media") -> Dict:
+    """Corre las suites indicadas y retorna {"meta": ..., "resultados": [...]}."""
+    tamanos = ESCALAS[escala]
+    resultados = []
+    print(f"{'suite':<13} {'caso':<40} {'n':>10} {'mín':>9} {'mediana':>9} {'por segundo':>14}")
+    for nombre in suites:
+        for caso in SUITES[nombre](tamanos):
+            tiempos = medir_caso(caso["fn"], caso.get("repeticiones", tamanos["repeticiones"]))
+            fila = {
+                "suite": nombre,
+                "caso": caso["caso"],
+                "n": caso["n"],
+                "unidad": caso["unidad"],
+                "repeticiones": len(tiempos),
+                "min_s": min(tiempos),
+                "mediana_s": statistics.median(tiempos),
+                "por_s": caso["n"] / min(tiempos) if min(tiempos) else None,
+            }
+            resultados.append(fila)
+            print(f"{nombre:<13} {fila['caso']:<40} {fila['n']:>10,} {fila['min_s']:>8.3f}s "
+                  f"{fila['mediana_s']:>8.3f}s {fila['por_s'] or 0:>10,.0f} {fila['unidad']}/s")
+    return {"meta": _metadatos(escala), "resultados": resultados}
+
+
+def comparar(base: Dict, actual: Dict, tolerancia: float = 0.15) -> List[Dict]:
+    """
+    Compara mínimos caso a caso (mismo suite/caso). Retorna las regresiones:
+    casos cuyo tiempo mínimo creció más que `tolerancia` (0.15 = 15%).
+    """
+    previos = {(r["suite"], r["caso"]): r for r in base["resultados"]}
+    regresiones = []
+    print(f"\nvs. {base['meta'].get('commit')} ({base['meta'].get('escala')}):")
+    for r in actual["resultados"]:
+        previo = previos.get((r["suite"], r["caso"]))
+        if previo is None or not previo["min_s"]:
+            continue
+        razon = r["min_s"] / previo["min_s"]
+        marca = "❌" if razon > 1 + tolerancia else ("✅" if razon < 1 - tolerancia else "  ")
+        print(f"{marca} {r['suite']:<13} {r['caso']:<40} {previo['min_s']:>8.3f}s → {r['min_s']:>8.3f}s  x{razon:.2f}")
+        if razon > 1 + tolerancia:
+            regresiones.append({**r, "min_s_base": previo["min_s"], "razon": razon})
+    return regresiones
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks sobre cartolas sintéticas (resultados en JSON).")
+    parser.add_argument("suites", nargs="*", help=f"Suites a correr: {', '.join(SUITES)} (default: todas)")
+    parser.add_argument("--escala", choices=list(ESCALAS), default="media")
+    parser.add_argument("--salida", help="Archivo JSON de resultados (default: benchmarks/resultados/{commit}-{escala}.json)")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior contra el que comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.15, help="Aumento relativo tolerado antes de marcar regresión")
+    args = parser.parse_args(argv)
+    desconocidas = set(args.suites) - set(SUITES)
+    if desconocidas:
+        parser.error(f"suites desconocidas: {', '.join(sorted(desconocidas))}")
+
+    resultado = correr(args.suites or list(SUITES), args.escala)
+    salida = args.salida or os.path.join(RESULTADOS_DIR, f"{resultado['meta']['commit'] or 'sin-git'}-{args.escala}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f"\n📄 Resultados en {salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            regresiones = comparar(json.load(f), resultado, args.tolerancia)
+        if regresiones:
+            sys.exit(f"{len(regresiones)} caso(s) más lentos que la base (> {args.tolerancia:.0%}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,118 +1,51 @@
 import os
-import re
-import pdfplumber
+import time
+import uuid
 import pandas as pd
 import streamlit as st
-import altair as alt
-from datetime import datetime
-import plotly.express as px
 from dotenv import load_dotenv
-from utils.drive_io import upload_csv_to_drive
-from utils.sheets_io import update_sheet_with_dataframe, write_dataframe
+from utils.agregados import sincronizar_agregados
+from utils.cartola import normalizar_movimientos, periodo_desde_nombre_pdf
+from utils.clasificador import CATEGORIA_DEFAULT, CATEGORIAS
+from utils import cargas, clientes_google, comercios, historico, instrumentacion
+from utils.cache_cartola import ESTADISTICAS as CACHE_STATS, hash_pdf, movimientos_cacheados
+from utils.exportacion import encolar_exportacion, hay_trabajos_activos, listar_trabajos
+from utils.historico import HIST_DIR, borrar_periodos, listar_periodos, migrar_csv
+from utils.cache_app import (
+    consultar_movimientos, descripciones_historico, grafico_gasto_neto, grafico_temporal, invalidar_cartolas,
+    opciones_filtros, pagina_movimientos, version_historico, vista_graficos,
+)
+from utils.consultas import n_paginas
+from utils.datos_graficos import GRANULARIDADES
+from utils.instrumentacion import medir
+from utils.movimientos import para_mostrar
 
 # ---------- Config ----------
 load_dotenv()
+# Tiempos por etapa de este rerun, solo en esta sesión (panel "⏱️ Rendimiento" al final;
+# CARTOLA_INSTRUMENTACION=1 la activa por defecto)
+SESION = st.session_state.setdefault("sesion_id", uuid.uuid4().hex[:8])
+instrumentacion.iniciar_traza("rerun", st.session_state.get("instrumentacion"), SESION)
 st.set_page_config(page_title="Cartola Santander", layout="wide")
 st.title("🧾 Clasificador de Gastos Cartola Santander")
 
-HIST_DIR = "historico"
 os.makedirs(HIST_DIR, exist_ok=True)  # Asegura carpeta histórica
-
-# ---------- Utilidades ----------
-def clasificar_categoria(descripcion: str) -> str:
-    descripcion = str(descripcion).upper()
-    if "ENEL" in descripcion:
-        return "💡 Luz"
-    if "NOTA DE CREDITO" in descripcion:
-        return "🍱 Devoluciones"
-    elif "BARBER" in descripcion:
-        return "✂️ Barbería"
-    elif "ENTELPCS" in descripcion or "ENTEL PCS" in descripcion:
-        return "📱 Plan Celular"
-    elif "AGUASCORDILLERA" in descripcion or "AGUAS CORDILLERA" in descripcion:
-        return "🚿 Agua"
-    elif any(x in descripcion for x in ["ARAMCO", "COPEC", "PETROBRAS", "SHELL"]):
-        return "⛽ Gasolina"
-    elif any(x in descripcion for x in ["GUESS", "PARIS", "FALABELLA", "HM", "H&M", "EASTON", "CK", "KAKOBUY"]):
-        return "👖 Ropa"
-    elif any(x in descripcion for x in ["SABA", "ESTACIONAMIENTO", "PARKING", "ALTO"]):
-        return "🚩 Estacionamiento"
-    elif any(x in descripcion for x in ["VESPUCIONORTE", "COSTANERA", "AUTOPASE", "VESPUCIOSUR", "CONCESIO", "AUTOPISTA"]):
-        return "🚧 Peaje / Autopista"
-    elif any(x in descripcion for x in ["KRYTERION"]):
-        return "🎓 Educacion"
-    elif any(x in descripcion for x in ["UBER", "DIDI", "BIPQR"]):
-        return "🚗 Transporte"
-    elif any(x in descripcion for x in ["BRANDO", "CASAIDEAS"]):
-        return "🏠 Hogar"
-    elif any(x in descripcion for x in ["FARMACIA", "CRUZ VERDE", "SALCO", "PROCEDIMIENTOS", "CONTINGENCIA CPA", "CLINICA", "CONSALUD", "MEGASALUD"]):
-        return "💊 Salud"
-    elif any(x in descripcion for x in ["PRODUCTOS", "MERCADOLIBRE", "TECNOPRO", "VISUALHEX"]):
-        return "🛍️ Compra Online"
-    elif any(x in descripcion for x in ["CHILEDRINK", "ANTICIPA", "CHEERS", "BARBANEGRA"]):
-        return "🍺 Alcohol"
-    elif any(x in descripcion for x in ["TUU","BDK", "GASTRONOMICA", "RESTAURANTE", "CAFE", "MCDONALD", "STARBUCKS", "MELT", "ICE", "BOAS"]):
-        return "🍽️ Comida"
-    elif any(x in descripcion for x in ["VETERINARIA", "PET", "VETIVERY"]):
-        return "🐾 Veterinaria"
-    elif any(x in descripcion for x in ["HAIRTREK"]):
-        return "🚫 Estafa"
-    elif "SEGURO" in descripcion or "SANTANDER COMPRAS P.A.T" in descripcion:
-        return "🛡️ Seguro Auto"
-    elif "CHATGPT" in descripcion:
-        return "🤖 Chat GPT"
-    elif "METROGAS" in descripcion:
-        return "💨 Gas"
-    elif "MOVISTARHOGAR" in descripcion:
-        return "📺 Internet + TV"
-    elif any(x in descripcion for x in ["STA ISABEL","PIWEN", "LIDER", "JUMBO", "TOTTUS"]):
-        return "🛒 Supermercado"
-    else:
-        return "📦 Otro gasto"
-
-def extraer_movimientos(texto: str) -> pd.DataFrame:
-    movimientos = []
-    lineas = texto.splitlines()[8:]  # saltar cabecera del PDF
-    for linea in lineas:
-        if "$" not in linea:
-            continue
-        match = re.search(r"(\d{2}/\d{2}/\d{4}).*?\$[\s-]*([\d.]+)", linea)
-        if not match:
-            continue
-        fecha = match.group(1)
-        monto = float(match.group(2).replace(".", ""))
-        if "NOTA DE CREDITO" in linea.upper():
-            monto *= -1
-
-        # Descripción robusta
-        partes = linea.split(fecha)
-        desc_bruta = partes[1].split("$")[0].strip() if len(partes) > 1 else "Revisar"
-        if not desc_bruta or desc_bruta.upper() in ["", "NONE"]:
-            desc_bruta = "Revisar"
-
-        categoria = clasificar_categoria(desc_bruta)
-        movimientos.append({
-            "Fecha": fecha,
-            "Descripción": desc_bruta,
-            "Monto": monto,
-            "Categoría": categoria
-        })
-    return pd.DataFrame(movimientos)
-
-def obtener_periodo_facturacion_custom(fecha) -> str:
-    """Devuelve la fecha de corte (día 25) del mes de la fecha dada, formateada YYYY-MM-DD."""
-    fecha = pd.to_datetime(fecha)
-    periodo = pd.Timestamp(year=fecha.year, month=fecha.month, day=25)
-    return periodo.strftime("%Y-%m-%d")
+migrar_csv()  # migra (una sola vez) los cartola_*.csv antiguos al dataset Parquet
 
 # ---------- Limpieza / mantenimiento ----------
 with st.expander("🧹 Eliminar cartolas anteriores"):
-    archivos_existentes = [f for f in os.listdir(HIST_DIR) if f.endswith(".csv")]
-    if archivos_existentes:
-        cartolas_a_borrar = st.multiselect("Selecciona las cartolas que quieres borrar:", archivos_existentes)
+    periodos_existentes = listar_periodos()
+    if periodos_existentes:
+        cartolas_a_borrar = st.multiselect(
+            "Selecciona las cartolas que quieres borrar:",
+            periodos_existentes,
+            format_func=lambda p: f"cartola_{p}",
+        )
         if st.button("🗑️ Borrar seleccionadas"):
-            for archivo in cartolas_a_borrar:
-                os.remove(os.path.join(HIST_DIR, archivo))
+            with historico.escritura:
+                borrar_periodos(cartolas_a_borrar)
+                sincronizar_agregados()
+            invalidar_cartolas(cartolas_a_borrar)
             st.success(f"✅ {len(cartolas_a_borrar)} cartola(s) eliminada(s). Recarga la página para ver los cambios.")
     else:
         st.info("No hay cartolas guardadas aún.")
@@ -123,155 +56,276 @@ password = st.text_input("Ingresa la clave del PDF", type="password")
 
 if uploaded_file and password:
     try:
-        with pdfplumber.open(uploaded_file, password=password) as pdf:
-            texto = "\n".join([p.extract_text() for p in pdf.pages if p.extract_text()])
-
-        df = extraer_movimientos(texto)
-        # normalizaciones y filtros
-        df["Fecha"] = pd.to_datetime(df["Fecha"], format="%d/%m/%Y", errors="coerce")
-        df = df.dropna(subset=["Fecha"])
-        df = df[~df["Descripción"].str.contains("(?i)banco|monto cancelado", na=False)]
-        df = df[~df["Descripción"].str.contains("Revisar", case=False, na=False)]  # ⛔️ excluir "Revisar"
-
         # periodo desde el nombre del PDF (…_YYYYMMDD.pdf)
-        nombre_pdf = uploaded_file.name
-        m = re.search(r"_(\d{8})\.pdf$", nombre_pdf)
-        if not m:
+        periodo_referencia = periodo_desde_nombre_pdf(uploaded_file.name)
+        if not periodo_referencia:
             st.error("❌ No se pudo extraer la fecha del nombre del PDF.")
             st.stop()
-        fecha_pdf = datetime.strptime(m.group(1), "%Y%m%d")
-        periodo_referencia = obtener_periodo_facturacion_custom(fecha_pdf)
-        df["Periodo"] = periodo_referencia
 
-        # guardar si no existe
-        nombre_archivo = os.path.join(HIST_DIR, f"cartola_{periodo_referencia}.csv")
-        if not os.path.exists(nombre_archivo):
-            df.to_csv(nombre_archivo, index=False)
-            st.success(f"✅ Cartola guardada como {nombre_archivo}")
+        # El servicio de cargas (utils.cargas) procesa y guarda la cartola fuera de este rerun;
+        # se encola una vez por archivo y clave, y el panel de cargas avisa cuando termina
+        datos = uploaded_file.getvalue()
+        subida = (hash_pdf(datos), uploaded_file.name, password)
+        if st.session_state.get("subida") != subida:
+            st.session_state["subida"] = subida
+            st.session_state["carga_id"] = cargas.encolar(datos, password, uploaded_file.name, periodo_referencia)
+            st.session_state.setdefault("cargas", []).append(st.session_state["carga_id"])  # el panel muestra solo las de esta sesión
+        trabajo = cargas.estado(st.session_state["carga_id"])
+
+        if trabajo is None:  # se depuró de la cola (MAX_TRABAJOS_GUARDADOS): no volverá a aparecer
+            st.warning(f"⌛ La carga de {uploaded_file.name} ya no está en la cola de trabajos.")
+            if st.button("🔁 Volver a procesar"):
+                st.session_state.pop("subida", None)
+                st.rerun()
+        elif trabajo["estado"] not in cargas.ESTADOS_TERMINALES:
+            st.info(f"⏳ Procesando {uploaded_file.name} en segundo plano: puedes seguir usando el dashboard.")
+        elif trabajo["estado"] == "fallido":
+            st.error(f"❌ Error procesando la cartola: {trabajo['error']}")
         else:
-            st.info(f"ℹ️ Cartola ya existe para el periodo {periodo_referencia}. No se guardó nuevamente.")
+            if trabajo["insertados"]:
+                st.success(
+                    f"✅ {trabajo['insertados']} movimiento(s) nuevo(s) guardado(s) en la cartola {periodo_referencia}"
+                    f" ({trabajo['movimientos'] - trabajo['insertados']} ya estaban en el histórico)."
+                )
+            else:
+                st.info(f"ℹ️ Los {trabajo['movimientos']} movimientos de esta cartola ya estaban en el histórico. No se guardó nada.")
 
-        with st.expander("🗂️ Exportar a Google Sheets"):
-            # Lee defaults de Secrets si existen
-            default_sheet_id = st.secrets.get("GOOGLE_SHEETS_SPREADSHEET_ID", "").strip()
-            spreadsheet_id = st.text_input(
-                "Spreadsheet ID (de tu Google Sheet ya creado y compartido con la SA):",
-                value=default_sheet_id,
-                help="Pega el ID de la URL del Sheet. Ej: https://docs.google.com/spreadsheets/d/ID/edit"
-            )
-            worksheet_title = st.text_input(
-                "Nombre de la hoja (worksheet) a actualizar:",
-                value="cartola",
-                help="Si no existe, la creamos dentro del mismo Spreadsheet."
-            )
+            # Para exportar: el worker dejó los movimientos en la caché de cartolas (no se vuelve a abrir el PDF)
+            with medir("app.leer_cartola"):
+                df = comercios.clasificar_movimientos(normalizar_movimientos(movimientos_cacheados(datos, password)))
+            df["Periodo"] = periodo_referencia
+
+            with st.expander("🗂️ Exportar a Google Sheets"):
+                # Lee defaults de Secrets si existen
+                default_sheet_id = clientes_google.secreto("GOOGLE_SHEETS_SPREADSHEET_ID")
+                spreadsheet_id = st.text_input(
+                    "Spreadsheet ID (de tu Google Sheet ya creado y compartido con la SA):",
+                    value=default_sheet_id,
+                    help="Pega el ID de la URL del Sheet. Ej: https://docs.google.com/spreadsheets/d/ID/edit"
+                )
+                worksheet_title = st.text_input(
+                    "Nombre de la hoja (worksheet) a actualizar:",
+                    value="cartola",
+                    help="Si no existe, la creamos dentro del mismo Spreadsheet."
+                )
+                modo_sync = st.radio(
+                    "Modo de actualización:",
+                    ["Solo cambios (delta)", "Reescribir todo"],
+                    horizontal=True,
+                    help="Delta envía solo filas nuevas, modificadas o borradas (agrega columnas _id y _hash).",
+                )
 
-            if st.button("Actualizar Google Sheet"):
-                try:
-                    sheet_url = update_sheet_with_dataframe(
-                        df=df,
-                        spreadsheet_id=spreadsheet_id or None,  # usa Secrets si el input viene vacío
-                        worksheet_title=worksheet_title,
-                        include_index=False
-                    )
-                    st.success("✅ Google Sheet actualizado.")
-                    st.caption(f"Hoja: **{worksheet_title}**")
-                    st.write(f"[Abrir Google Sheet]({sheet_url})")
-                    st.info("En Looker Studio conecta **Google Sheets** a este Spreadsheet (worksheet = la pestaña que elegiste).")
-                except Exception as e:
-                    st.error(f"❌ Error actualizando Google Sheets: {e}")
-                    st.info(
-                        "Check: 1) Habilitaste Google Sheets API y Drive API. "
-                        "2) El Spreadsheet ID es correcto. "
-                        "3) Compartiste el Sheet con la Service Account (Editor)."
-                    )
+                subir_drive = st.checkbox(
+                    "Subir también el CSV a Google Drive",
+                    help="El archivo debe existir en la carpeta compartida con la Service Account.",
+                )
+                drive_title = st.text_input("Nombre del archivo en Drive:", value="cartola.csv", disabled=not subir_drive)
+
+                if st.button("Exportar"):
+                    try:
+                        ids = encolar_exportacion(
+                            df,
+                            spreadsheet_id=spreadsheet_id or None,  # usa Secrets si el input viene vacío
+                            worksheet_title=worksheet_title,
+                            modo="delta" if modo_sync == "Solo cambios (delta)" else "reescribir",
+                            drive_title=drive_title if subir_drive else None,
+                        )
+                        st.session_state.setdefault("exportaciones", []).extend(ids)  # el panel muestra solo los de esta sesión
+                        st.success("✅ Exportación encolada: puedes seguir usando el dashboard.")
+                        st.info("En Looker Studio conecta **Google Sheets** a este Spreadsheet (worksheet = la pestaña que elegiste).")
+                    except Exception as e:
+                        st.error(f"❌ Error encolando la exportación: {e}")
+                conexiones = clientes_google.resumen()
+                st.caption(
+                    f"🔌 Clientes Google reutilizados: {conexiones['hits']} hits · {conexiones['misses']} misses · "
+                    f"{conexiones['viajes_ahorrados']} viajes a la API ahorrados"
+                )
     except Exception as e:
         st.error(f"❌ Error procesando la cartola: {e}")
+    st.caption(
+        f"⚡ Caché de cartolas: {CACHE_STATS['memo_hits']} hits en memoria · "
+        f"{CACHE_STATS['disco_hits']} hits en disco · {CACHE_STATS['misses']} misses"
+    )
+
+# ---------- Estado de exportaciones ----------
+@st.fragment(run_every=2 if hay_trabajos_activos(st.session_state.get("exportaciones", [])) else None)
+def panel_exportaciones():
+    with instrumentacion.traza_fragmento("fragmento.panel_exportaciones", st.session_state.get("instrumentacion"), SESION):
+        trabajos = listar_trabajos(st.session_state.get("exportaciones", []))
+        if not trabajos:
+            return
+        st.subheader("📤 Exportaciones")
+        tabla = pd.DataFrame(trabajos)
+        tabla["creado"] = tabla["creado"].map(lambda t: time.strftime("%H:%M:%S", time.localtime(t)))
+        st.dataframe(
+            tabla[["creado", "destino", "descripcion", "estado", "espera_s", "duracion_s", "resultado", "error"]],
+            hide_index=True,
+            column_config={
+                "espera_s": st.column_config.NumberColumn("En cola (s)", format="%.1f"),
+                "duracion_s": st.column_config.NumberColumn("Duración (s)", format="%.1f"),
+            },
+        )
+        if any(t["estado"] == "fallido" for t in trabajos):
+            st.caption(
+                "Si falló: 1) Habilitaste Google Sheets API y Drive API. 2) El Spreadsheet ID es correcto. "
+                "3) Compartiste el Sheet/archivo con la Service Account (Editor)."
+            )
+
+
+panel_exportaciones()
+
+
+# ---------- Estado de cargas ----------
+@st.fragment(run_every=1 if cargas.hay_trabajos_activos(st.session_state.get("cargas", [])) else None)
+def panel_cargas():
+    with instrumentacion.traza_fragmento("fragmento.panel_cargas", st.session_state.get("instrumentacion"), SESION):
+        trabajos = cargas.listar_trabajos(st.session_state.get("cargas", []))
+        if not trabajos:
+            return
+        # cartolas guardadas desde el último vistazo: se descarta su caché y se redibuja el dashboard
+        vistos = st.session_state.setdefault("cargas_vistas", set())
+        nuevos = [t for t in trabajos if t["estado"] in cargas.ESTADOS_TERMINALES and t["id"] not in vistos]
+        if nuevos:
+            vistos.update(t["id"] for t in nuevos)
+            guardados = [t["periodo"] for t in nuevos if t["insertados"]]
+            if guardados:
+                invalidar_cartolas(guardados)
+            st.rerun()
+        st.subheader("📥 Cargas")
+        tabla = pd.DataFrame(trabajos)
+        tabla["creado"] = tabla["creado"].map(lambda t: time.strftime("%H:%M:%S", time.localtime(t)))
+        st.dataframe(
+            tabla[["creado", "nombre", "estado", "espera_s", "duracion_s", "movimientos", "insertados", "error"]],
+            hide_index=True,
+            column_config={
+                "espera_s": st.column_config.NumberColumn("En cola (s)", format="%.1f"),
+                "duracion_s": st.column_config.NumberColumn("Duración (s)", format="%.1f"),
+            },
+        )
+
+
+panel_cargas()
 
 # ---------- Visualización histórica ----------
-archivos = [f for f in os.listdir(HIST_DIR) if f.endswith(".csv")]
-if not archivos:
+# Todo lo derivado del histórico se cachea con su versión (mtime de cada partición):
+# la tabla compacta indexada, el agregado Periodo × Categoría, los filtros y los gráficos
+with medir("app.version_historico"):
+    version = version_historico()
+if not version:
     st.warning("⚠️ No hay cartolas cargadas.")
 else:
-    dfs = [pd.read_csv(os.path.join(HIST_DIR, f)) for f in archivos]
-    df_historico = pd.concat(dfs, ignore_index=True)
-
-    # normalización y filtros globales
-    df_historico["Fecha"] = pd.to_datetime(df_historico["Fecha"], errors="coerce")
-    df_historico = df_historico.dropna(subset=["Fecha"])
-    df_historico = df_historico[~df_historico["Descripción"].str.contains("Revisar", case=False, na=False)]
-    df_historico["Monto_formateado"] = df_historico["Monto"].apply(lambda x: f"$ {x:,.0f}".replace(",", "."))
-    df_historico["Periodo"] = df_historico["Fecha"].apply(obtener_periodo_facturacion_custom)
-
-    periodos = sorted(df_historico["Periodo"].unique(), reverse=True)
-    categorias = sorted(df_historico["Categoría"].unique())
+    with medir("app.indice_y_filtros"):
+        periodos, categorias = opciones_filtros(version)
 
     col1, col2 = st.columns(2)
     filtro_periodo = col1.selectbox("🗓️ Filtrar por cartola (25 a 25):", ["Todos"] + periodos)
     filtro_cat = col2.multiselect("🔍 Categorías:", categorias, default=categorias)
 
-    df_vista = df_historico.copy()
-    if filtro_periodo != "Todos":
-        df_vista = df_vista[df_vista["Periodo"] == filtro_periodo]
-    df_vista = df_vista[df_vista["Categoría"].isin(filtro_cat)]
-    df_vista = df_vista.sort_values("Fecha", ascending=False)
+    resultado = consultar_movimientos(version, filtro_periodo, filtro_cat)
 
-    st.dataframe(df_vista[["Fecha", "Descripción", "Monto_formateado", "Categoría"]], use_container_width=True)
+    # Solo se materializa (y formatea) la página visible
+    total_paginas = n_paginas(resultado)
+    col_pag, col_info = st.columns([1, 3])
+    numero_pagina = col_pag.number_input("Página", min_value=1, max_value=total_paginas, value=1, step=1)
+    col_info.caption(
+        f"{resultado['total']:,} movimientos · página {numero_pagina} de {total_paginas}".replace(",", ".")
+    )
+    with medir("app.tabla"):
+        st.dataframe(para_mostrar(pagina_movimientos(version, resultado, numero_pagina - 1)), use_container_width=True)
 
-    # KPIs
-    gastos = df_vista.loc[df_vista["Monto"] > 0, "Monto"].sum()
-    abonos = df_vista.loc[df_vista["Monto"] < 0, "Monto"].sum()
-    gasto_neto = gastos + abonos
+    with st.expander("🏷️ Corregir la categoría de un comercio"):
+        solo_otros = st.checkbox(f"Solo comercios en {CATEGORIA_DEFAULT}", value=True)
+        descripciones = descripciones_historico(version, CATEGORIA_DEFAULT if solo_otros else None)
+        claves = sorted({c for c in map(comercios.clave_comercio, descripciones) if c})
+        if not claves:
+            st.caption("No hay comercios para corregir.")
+        else:
+            col_com, col_cat = st.columns(2)
+            clave = col_com.selectbox("Comercio:", claves)
+            actual = comercios.consultar(clave)
+            nueva = col_cat.selectbox(
+                "Categoría:", CATEGORIAS,
+                index=CATEGORIAS.index(actual[0]) if actual and actual[0] in CATEGORIAS else len(CATEGORIAS) - 1,
+            )
+            if st.button("💾 Guardar categoría"):
+                with historico.escritura:  # el servicio de cargas escribe en paralelo
+                    comercios.asignar(clave, nueva)
+                    tocados = comercios.reclasificar_historico([clave])
+                    sincronizar_agregados()
+                invalidar_cartolas(tocados)
+                st.success(f"✅ {clave} → {nueva} ({len(tocados)} cartola(s) actualizada(s)).")
+        conocidos = comercios.resumen()
+        st.caption(
+            f"🗂️ {conocidos['comercios']:,} comercios memorizados · {conocidos['usuario']} corregidos por ti · "
+            f"{conocidos['parecidos']} asignados por parecido".replace(",", ".")
+        )
+
+    # KPIs y gráficos (desde el agregado incremental por cartola)
+    with medir("app.vista_graficos"):
+        vista = vista_graficos(version, filtro_periodo, tuple(filtro_cat))
+    resumen = vista["kpis"]
     colA, colB, colC, colD = st.columns(4)
-    colA.metric("💸 Gastos", f"$ {gastos:,.0f}")
-    colB.metric("💰 Abonos", f"$ {abonos:,.0f}")
-    colC.metric("📊 Gasto neto (real)", f"$ {gasto_neto:,.0f}")
-    colD.metric("📄 Movimientos", len(df_vista))
+    colA.metric("💸 Gastos", f"$ {resumen['gastos']:,.0f}")
+    colB.metric("💰 Abonos", f"$ {resumen['abonos']:,.0f}")
+    colC.metric("📊 Gasto neto (real)", f"$ {resumen['gasto_neto']:,.0f}")
+    colD.metric("📄 Movimientos", resumen["movimientos"])
 
     # Barras por categoría
     st.subheader("📊 Distribución de gasto por categoría")
-    df_agrupado = df_vista[df_vista["Monto"] > 0].groupby("Categoría", as_index=False)["Monto"].sum()
-    if not df_agrupado.empty:
-        chart = alt.Chart(df_agrupado).mark_bar().encode(
-            x=alt.X("Categoría:N", sort='-y'),
-            y=alt.Y("Monto:Q", scale=alt.Scale(domain=[0, df_agrupado["Monto"].max() * 1.1])),
-            color="Categoría:N",
-            tooltip=[alt.Tooltip("Categoría", title="Categoría"),
-                     alt.Tooltip("Monto", title="Monto", format=",.0f")]
-        ).properties(width=600, height=400)
-        st.altair_chart(chart, use_container_width=True)
+    if vista["barras"] is not None:
+        st.vega_lite_chart(vista["barras"], use_container_width=True)
 
     # Pie por categoría
     st.subheader("🥧 Gasto por categoría (torta 3D)")
-    fig_pie = px.pie(
-        df_agrupado,
-        names="Categoría",
-        values="Monto",
-        title="🧻 Distribución por categoría",
-        hole=0.4
-    )
-    fig_pie.update_traces(
-        textinfo='percent+label',
-        pull=[0.05]*len(df_agrupado),
-        hovertemplate="%{label}<br>$ %{value:,.0f}<extra></extra>"
-    )
-    fig_pie.update_layout(showlegend=True, height=500)
-    st.plotly_chart(fig_pie, use_container_width=True)
+    st.plotly_chart(vista["torta"], use_container_width=True)
 
     # Seguimiento de gasto neto por cartola (25 a 25)
     st.subheader("📉 Seguimiento de Gasto Neto por Cartola (25 a 25)")
-    df_gasto_neto = df_historico.groupby("Periodo").agg(
-        Gastos=("Monto", lambda x: x[x > 0].sum()),
-        Abonos=("Monto", lambda x: x[x < 0].sum())
-    ).reset_index()
-    df_gasto_neto["Gasto Neto"] = df_gasto_neto["Gastos"] + df_gasto_neto["Abonos"]
-
-    grafico = alt.Chart(df_gasto_neto).mark_bar().encode(
-        x=alt.X("Periodo:N", sort=None),
-        y=alt.Y("Gasto Neto:Q", title="Gasto Neto"),
-        tooltip=[alt.Tooltip("Periodo", title="Periodo"),
-                 alt.Tooltip("Gasto Neto", format=",.0f")]
-    ).properties(width=800, height=400)
-    st.altair_chart(grafico, use_container_width=True)
-
+    with medir("app.grafico_gasto_neto"):
+        st.vega_lite_chart(grafico_gasto_neto(version), use_container_width=True)
 
+    # Evolución en el tiempo (rollup del gasto diario; con muchos puntos se agrupa más grueso)
+    st.subheader("📈 Evolución del gasto")
+    granularidad = st.radio("Agrupar por:", list(GRANULARIDADES), horizontal=True)
+    with medir("app.grafico_temporal"):
+        temporal = grafico_temporal(version, filtro_periodo, tuple(filtro_cat), granularidad)
+    if temporal["granularidad"] != granularidad:
+        st.caption(f"Demasiados puntos para una vista {granularidad.lower()}: se muestra {temporal['granularidad'].lower()}.")
+    st.vega_lite_chart(temporal["spec"], use_container_width=True)
 
+# ---------- Rendimiento ----------
+traza = instrumentacion.terminar_traza()
+with st.expander("⏱️ Rendimiento"):
+    st.toggle(
+        "Medir tiempos por etapa",
+        key="instrumentacion",
+        value=traza is not None,
+        help="Cronometra cada etapa (PDF, parseo, histórico, gráficos, APIs de Google). Aplica desde el próximo rerun.",
+    )
+    if traza is None:
+        st.caption("La instrumentación está desactivada: no agrega costo a los reruns.")
+    else:
+        etapas = pd.DataFrame(instrumentacion.resumen_etapas(traza))
+        st.caption(
+            f"Rerun: {traza['duracion_ms']:,.0f} ms · pico de memoria del proceso: "
+            f"{traza['pico_mb'] or 0:,.0f} MB".replace(",", ".")
+        )
+        if not etapas.empty:
+            st.dataframe(
+                etapas[["etapa", "llamadas", "ms", "max_ms", "pct", "pico_mb"]],
+                hide_index=True,
+                column_config={
+                    "ms": st.column_config.NumberColumn("Total (ms)", format="%.1f"),
+                    "max_ms": st.column_config.NumberColumn("Máx. (ms)", format="%.1f"),
+                    "pct": st.column_config.ProgressColumn("% del rerun", format="%.0f%%", min_value=0, max_value=100),
+                    "pico_mb": st.column_config.NumberColumn("Pico memoria (MB)", format="%.0f"),
+                },
+            )
+        if traza["contadores"]:
+            st.caption(" · ".join(f"{k}: {v:,}".replace(",", ".") for k, v in sorted(traza["contadores"].items())))
+        st.download_button(
+            "Descargar trazas (JSONL)",
+            instrumentacion.trazas_jsonl(instrumentacion.trazas_guardadas(SESION)),
+            file_name="trazas_rendimiento.jsonl",
+            mime="application/jsonl",
+        )
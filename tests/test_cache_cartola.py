@@ -0,0 +1,48 @@
+# tests/test_cache_cartola.py
+"""Caché de cartolas (utils.cache_cartola) sobre un PDF sintético cifrado."""
+import os
+import stat
+
+import pytest
+
+from benchmarks.sintetico import generar_pdf
+from utils import cache_cartola
+
+PDF = generar_pdf(60, password="1234", columnas=True, semilla=3)
+
+
+@pytest.fixture(autouse=True)
+def cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache_cartola, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.delenv("CARTOLA_PDF_MODO", raising=False)
+    cache_cartola._memo.clear()
+    yield tmp_path / "cache"
+    cache_cartola._memo.clear()
+
+
+def test_solo_el_parquet_va_a_disco_y_con_permisos_0600(cache):
+    df = cache_cartola.movimientos_cacheados(PDF, "1234", workers=1)
+    assert len(df) > 0
+    archivos = sorted(os.listdir(cache))
+    assert [a for a in archivos if not a.startswith(".")] == [a for a in archivos if a.endswith(".parquet")]
+    assert len([a for a in archivos if a.endswith(".parquet")]) == 1
+    for nombre in archivos:
+        assert stat.S_IMODE(os.stat(cache / nombre).st_mode) == 0o600
+    assert stat.S_IMODE(os.stat(cache).st_mode) == 0o700
+
+
+def test_hit_en_disco_y_clave_incorrecta(cache):
+    df = cache_cartola.movimientos_cacheados(PDF, "1234", workers=1)
+    cache_cartola._memo.clear()
+    hits = cache_cartola.ESTADISTICAS["disco_hits"]
+    assert cache_cartola.movimientos_cacheados(PDF, "1234", workers=1).equals(df)
+    assert cache_cartola.ESTADISTICAS["disco_hits"] == hits + 1
+    with pytest.raises(Exception):
+        cache_cartola.movimientos_cacheados(PDF, "otra", workers=1)
+
+
+def test_el_modo_pdf_es_parte_de_la_clave(cache, monkeypatch):
+    cache_cartola.movimientos_cacheados(PDF, "1234", workers=1)
+    monkeypatch.setenv("CARTOLA_PDF_MODO", "tabla")
+    cache_cartola.movimientos_cacheados(PDF, "1234", workers=1)
+    assert len([a for a in os.listdir(cache) if a.endswith(".parquet")]) == 2
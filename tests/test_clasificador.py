@@ -0,0 +1,91 @@
+# tests/test_clasificador.py
+"""
+Paridad de utils.clasificador con la cadena if/elif original (copia textual de
+clasificar_categoria en streamlit_app.py del commit base), no con REGLAS misma.
+"""
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.sintetico import generar_descripciones
+from utils.clasificador import REGLAS, clasificar_categoria, classify_series
+
+
+# ---------- Copia textual del original (streamlit_app.py, commit base) ----------
+def clasificar_categoria_original(descripcion: str) -> str:
+    descripcion = str(descripcion).upper()
+    if "ENEL" in descripcion:
+        return "💡 Luz"
+    if "NOTA DE CREDITO" in descripcion:
+        return "🍱 Devoluciones"
+    elif "BARBER" in descripcion:
+        return "✂️ Barbería"
+    elif "ENTELPCS" in descripcion or "ENTEL PCS" in descripcion:
+        return "📱 Plan Celular"
+    elif "AGUASCORDILLERA" in descripcion or "AGUAS CORDILLERA" in descripcion:
+        return "🚿 Agua"
+    elif any(x in descripcion for x in ["ARAMCO", "COPEC", "PETROBRAS", "SHELL"]):
+        return "⛽ Gasolina"
+    elif any(x in descripcion for x in ["GUESS", "PARIS", "FALABELLA", "HM", "H&M", "EASTON", "CK", "KAKOBUY"]):
+        return "👖 Ropa"
+    elif any(x in descripcion for x in ["SABA", "ESTACIONAMIENTO", "PARKING", "ALTO"]):
+        return "🚩 Estacionamiento"
+    elif any(x in descripcion for x in ["VESPUCIONORTE", "COSTANERA", "AUTOPASE", "VESPUCIOSUR", "CONCESIO", "AUTOPISTA"]):
+        return "🚧 Peaje / Autopista"
+    elif any(x in descripcion for x in ["KRYTERION"]):
+        return "🎓 Educacion"
+    elif any(x in descripcion for x in ["UBER", "DIDI", "BIPQR"]):
+        return "🚗 Transporte"
+    elif any(x in descripcion for x in ["BRANDO", "CASAIDEAS"]):
+        return "🏠 Hogar"
+    elif any(x in descripcion for x in ["FARMACIA", "CRUZ VERDE", "SALCO", "PROCEDIMIENTOS", "CONTINGENCIA CPA", "CLINICA", "CONSALUD", "MEGASALUD"]):
+        return "💊 Salud"
+    elif any(x in descripcion for x in ["PRODUCTOS", "MERCADOLIBRE", "TECNOPRO", "VISUALHEX"]):
+        return "🛍️ Compra Online"
+    elif any(x in descripcion for x in ["CHILEDRINK", "ANTICIPA", "CHEERS", "BARBANEGRA"]):
+        return "🍺 Alcohol"
+    elif any(x in descripcion for x in ["TUU","BDK", "GASTRONOMICA", "RESTAURANTE", "CAFE", "MCDONALD", "STARBUCKS", "MELT", "ICE", "BOAS"]):
+        return "🍽️ Comida"
+    elif any(x in descripcion for x in ["VETERINARIA", "PET", "VETIVERY"]):
+        return "🐾 Veterinaria"
+    elif any(x in descripcion for x in ["HAIRTREK"]):
+        return "🚫 Estafa"
+    elif "SEGURO" in descripcion or "SANTANDER COMPRAS P.A.T" in descripcion:
+        return "🛡️ Seguro Auto"
+    elif "CHATGPT" in descripcion:
+        return "🤖 Chat GPT"
+    elif "METROGAS" in descripcion:
+        return "💨 Gas"
+    elif "MOVISTARHOGAR" in descripcion:
+        return "📺 Internet + TV"
+    elif any(x in descripcion for x in ["STA ISABEL","PIWEN", "LIDER", "JUMBO", "TOTTUS"]):
+        return "🛒 Supermercado"
+    else:
+        return "📦 Otro gasto"
+# ---------- fin de la copia ----------
+
+
+PALABRAS = sorted({p for _, _, palabras in REGLAS for p in palabras})
+
+
+def _casos() -> list:
+    solas = PALABRAS + [p.lower() for p in PALABRAS] + [f"COMPRA {p} SANTIAGO" for p in PALABRAS]
+    # pares de palabras en ambos órdenes: decide la prioridad de la regla, no la posición
+    pares = [f"{a} {b}" for a, b in itertools.permutations(PALABRAS, 2)]
+    raros = [None, np.nan, "", "   ", 12345, "NONE", "Revisar", "LIDER PUENTE ALTO", "HMO", "ALTOS DEL SUR"]
+    return solas + pares + raros + generar_descripciones(5_000).tolist()
+
+
+def test_clasificar_categoria_igual_al_original():
+    for descripcion in _casos():
+        assert clasificar_categoria(descripcion) == clasificar_categoria_original(descripcion), descripcion
+
+
+def test_classify_series_igual_al_original():
+    casos = pd.Series(_casos(), dtype=object)
+    esperado = [clasificar_categoria_original(d) for d in casos]
+    assert classify_series(casos).tolist() == esperado
+    # mismo índice que la entrada
+    desordenada = casos.set_axis(np.arange(len(casos))[::-1])
+    assert classify_series(desordenada).index.equals(desordenada.index)
@@ -0,0 +1,107 @@
+# tests/test_clientes_google.py
+"""Caché de clientes y metadatos (utils.clientes_google): vigencia, expiración y refresco de token."""
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from utils import clientes_google, sheets_io
+from utils.sheets_fake import FakeClient
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    """Reloj manual para clientes_google: avanzar con reloj.t += segundos."""
+    actual = SimpleNamespace(t=1_000.0)
+    monkeypatch.setattr(clientes_google, "time", SimpleNamespace(monotonic=lambda: actual.t))
+    clientes_google.invalidar()
+    clientes_google.ESTADISTICAS.clear()
+    yield actual
+    clientes_google.invalidar()
+    clientes_google.ESTADISTICAS.clear()
+
+
+def _contador():
+    creados = []
+
+    def crear():
+        creados.append(object())
+        return creados[-1]
+    return creados, crear
+
+
+def test_reutiliza_mientras_esta_vigente(reloj):
+    creados, crear = _contador()
+    primero = clientes_google.obtener("x", "k", crear, ttl=60)
+    reloj.t += 59
+    assert clientes_google.obtener("x", "k", crear, ttl=60) is primero
+    assert len(creados) == 1
+    assert clientes_google.ESTADISTICAS["x_hits"] == 1 and clientes_google.ESTADISTICAS["x_misses"] == 1
+    assert clientes_google.resumen()["viajes_ahorrados"] == 1
+
+
+def test_expira_al_vencer_el_ttl(reloj):
+    creados, crear = _contador()
+    primero = clientes_google.obtener("x", "k", crear, ttl=60)
+    reloj.t += 61
+    segundo = clientes_google.obtener("x", "k", crear, ttl=60)
+    assert segundo is not primero and len(creados) == 2
+    assert clientes_google.ESTADISTICAS["x_expirados"] == 1
+
+
+def test_ttl_por_defecto_es_el_de_metadatos(reloj, monkeypatch):
+    monkeypatch.setattr(clientes_google, "TTL_METADATOS", 10.0)
+    creados, crear = _contador()
+    clientes_google.obtener("x", "k", crear)
+    reloj.t += 11
+    clientes_google.obtener("x", "k", crear)
+    assert len(creados) == 2
+
+
+def test_claves_e_invalidacion_independientes(reloj):
+    creados, crear = _contador()
+    a = clientes_google.obtener("x", "a", crear, ttl=60)
+    b = clientes_google.obtener("x", "b", crear, ttl=60)
+    clientes_google.obtener("y", "a", crear, ttl=60)
+    assert a is not b and len(creados) == 3
+    assert clientes_google.invalidar("x", "a") == 1
+    assert clientes_google.obtener("x", "b", crear, ttl=60) is b
+    assert clientes_google.obtener("x", "a", crear, ttl=60) is not a
+    assert clientes_google.invalidar("x") == 2 and clientes_google.invalidar() == 1
+
+
+def test_refresca_el_token_solo_al_reutilizar(reloj):
+    creados, crear = _contador()
+    refrescos = []
+
+    def refrescar(valor):
+        refrescos.append(valor)
+        return len(refrescos) == 2  # el segundo reuso encuentra el token vencido
+
+    valor = clientes_google.obtener("x", "k", crear, ttl=60, refrescar=refrescar)
+    assert refrescos == []  # recién creado: no se refresca
+    clientes_google.obtener("x", "k", crear, ttl=60, refrescar=refrescar)
+    clientes_google.obtener("x", "k", crear, ttl=60, refrescar=refrescar)
+    assert refrescos == [valor, valor]
+    assert clientes_google.resumen()["tokens_refrescados"] == 1
+
+
+def test_sheets_reutiliza_cliente_libro_y_hoja(reloj, monkeypatch):
+    cliente = FakeClient()
+    autenticaciones = []
+    monkeypatch.setattr(sheets_io, "_crear_cliente", lambda: autenticaciones.append(1) or cliente)
+    df = pd.DataFrame({"Fecha": ["2025-01-01"], "Descripción": ["A"], "Monto": [1]})
+
+    for _ in range(3):
+        sheets_io.write_dataframe(df, mode="append", spreadsheet_id="libro")
+    assert len(autenticaciones) == 1
+    assert cliente.llamadas["open_by_key"] == 1
+    assert cliente.llamadas["worksheet"] == 1 and cliente.llamadas["add_worksheet"] == 1  # no existía: se creó
+
+    cliente.http_client.auth.valid = False  # token vencido: se renueva sin re-autenticar
+    sheets_io.write_dataframe(df, mode="append", spreadsheet_id="libro")
+    assert cliente.http_client.auth.refrescos == 1 and len(autenticaciones) == 1
+
+    reloj.t += clientes_google.TTL_METADATOS + 1  # vencen libro y hoja, el cliente sigue vigente
+    sheets_io.write_dataframe(df, mode="append", spreadsheet_id="libro")
+    assert cliente.llamadas["open_by_key"] == 2 and len(autenticaciones) == 1
@@ -0,0 +1,88 @@
+# tests/test_comercios.py
+"""Índice comercio → categoría (utils.comercios)."""
+import os
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+from utils import comercios, historico
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(comercios.__file__)))
+
+
+@pytest.fixture(autouse=True)
+def indice(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)  # historico/ (comercios.json, particiones, .lock) es relativo
+    comercios.recargar()
+    yield
+    comercios.recargar()
+
+
+def _clasificar(*descripciones):
+    return comercios.clasificar_series(pd.Series(descripciones)).tolist()
+
+
+def test_el_orden_de_llegada_no_cambia_categorias():
+    directo = _clasificar("LIDER PUENTE ALTO", "LIDER LA FLORIDA")
+    comercios.recargar()
+    inverso = _clasificar("LIDER LA FLORIDA", "LIDER PUENTE ALTO")
+    assert directo == ["🚩 Estacionamiento", "🛒 Supermercado"]
+    assert inverso == directo[::-1]
+    assert _clasificar("LIDER PUENTE ALTO") == ["🚩 Estacionamiento"]  # desde el índice, igual que por REGLAS
+
+
+def test_la_correccion_del_usuario_manda():
+    _clasificar("LIDER PUENTE ALTO", "LIDER LA FLORIDA")
+    comercios.asignar("LIDER", "🏠 Hogar")
+    assert _clasificar("LIDER PUENTE ALTO", "LIDER LA FLORIDA", "LIDER 123") == ["🏠 Hogar"] * 3
+
+
+def test_guardar_y_recargar():
+    _clasificar("COPEC SANTIAGO 1234")
+    assert comercios.guardar()
+    comercios.recargar()
+    assert comercios.consultar("COPEC") == ("⛽ Gasolina", comercios.REGLA)
+
+
+def test_clave_nueva_sin_regla_usa_el_comercio_mas_parecido():
+    _clasificar("MOVISTARHOGAR")
+    assert _clasificar("MOVISTAR HOGAR 0042", "ZAPATERIA XYZ") == ["📺 Internet + TV", "📦 Otro gasto"]
+    assert comercios.consultar("MOVISTAR HOGAR") == ("📺 Internet + TV", comercios.PARECIDO)
+    assert comercios.consultar("ZAPATERIA XYZ") == ("📦 Otro gasto", comercios.DEFAULT)
+
+
+def test_reclasificar_historico_reescribe_solo_las_cartolas_afectadas():
+    def cartola(*descripciones):
+        return pd.DataFrame({
+            "Fecha": pd.date_range("2025-01-02", periods=len(descripciones)),
+            "Descripción": descripciones,
+            "Monto": [-1000.0] * len(descripciones),
+            "Categoría": _clasificar(*descripciones),
+        })
+
+    historico.guardar_periodo(cartola("ZAPATERIA XYZ 12", "COPEC 1234"), "2025-01-25")
+    historico.guardar_periodo(cartola("COPEC 99"), "2025-02-25")
+    intacta = os.stat(os.path.join(historico.DATASET_DIR, "Periodo=2025-02-25", historico.ARCHIVO_PARTICION)).st_mtime_ns
+
+    comercios.asignar("ZAPATERIA XYZ", "👖 Ropa")
+    assert comercios.reclasificar_historico(["ZAPATERIA XYZ"]) == ["2025-01-25"]
+    df = historico.cargar_historico(periodos=["2025-01-25"])
+    assert df["Categoría"].astype(str).tolist() == ["👖 Ropa", "⛽ Gasolina"]
+    assert os.stat(os.path.join(historico.DATASET_DIR, "Periodo=2025-02-25", historico.ARCHIVO_PARTICION)).st_mtime_ns == intacta
+    assert comercios.reclasificar_historico(["ZAPATERIA XYZ"]) == []  # ya está al día
+
+
+def test_guardar_fusiona_con_lo_que_escribio_otro_proceso(tmp_path):
+    _clasificar("LIDER LA FLORIDA", "COPEC 1234")  # este proceso aprende LIDER por regla
+    otro = 'from utils import comercios; comercios.asignar("LIDER", "🏠 Hogar"); comercios.clasificar("JUMBO"); comercios.guardar()'
+    subprocess.run([sys.executable, "-c", otro], cwd=tmp_path, env={**os.environ, "PYTHONPATH": RAIZ}, check=True)
+
+    assert comercios.guardar()
+    assert comercios.consultar("LIDER") == ("🏠 Hogar", comercios.USUARIO)  # visible sin recargar
+    comercios.recargar()
+    assert comercios.consultar("LIDER") == ("🏠 Hogar", comercios.USUARIO)
+    assert comercios.consultar("COPEC") == ("⛽ Gasolina", comercios.REGLA)
+    assert comercios.consultar("JUMBO") == ("🛒 Supermercado", comercios.REGLA)
+    assert comercios.resumen()["revision"] == 1
@@ -0,0 +1,181 @@
+# tests/test_drive_io.py
+"""Subida reanudable (drive_io.subir_a_drive) contra el endpoint falso de drive_fake, con fallas inyectadas."""
+import gzip
+import os
+import random
+
+import pytest
+import requests
+
+from utils import clientes_google, drive_io
+from utils.drive_fake import CorteProceso, FakeDrive, FakeSesionSubida
+
+CHUNK = 256 * 1024
+DATOS = random.Random(0).randbytes(5 * CHUNK + 12_345)
+
+
+@pytest.fixture
+def drive(monkeypatch, tmp_path):
+    falso = FakeDrive()
+    carpeta = falso.crear(drive_io.DRIVE_FOLDER_NAME, carpeta=True)
+    falso.file_id = falso.crear("historico.csv", padre=carpeta)
+    monkeypatch.setattr(drive_io, "_crear_drive", lambda: falso)
+    monkeypatch.setattr(drive_io, "SUBIDA_ESPERA_INICIAL", 0.0)
+    monkeypatch.setattr(drive_io, "CHECKPOINT_DIR", str(tmp_path))
+    clientes_google.invalidar()
+    yield falso
+    clientes_google.invalidar()
+
+
+def _trozos(datos: bytes, tamano: int = 100_000):
+    return (datos[i:i + tamano] for i in range(0, len(datos), tamano))
+
+
+def _subir(drive, sesion, fuente=DATOS, **kwargs):
+    return drive_io.subir_a_drive(fuente, "historico.csv", chunk_bytes=CHUNK, sesion=sesion, **kwargs)
+
+
+def test_sin_fallas_sube_por_trozos(drive):
+    sesion = FakeSesionSubida(drive)
+    assert _subir(drive, sesion, _trozos(DATOS)) == drive.file_id
+    assert drive.archivos[drive.file_id]["contenido"] == DATOS
+    assert drive.llamadas["subida_PATCH"] == 1
+    assert drive.llamadas["subida_PUT"] == len(DATOS) // CHUNK + 1
+    assert sesion.bytes_recibidos == len(DATOS)
+
+
+def test_reintenta_503_al_iniciar_y_a_mitad(drive):
+    sesion = FakeSesionSubida(drive, errores_503=2)  # el PATCH inicial falla 2 veces
+    _subir(drive, sesion)
+    assert drive.llamadas["subida_PATCH"] == 3
+
+    sesion = FakeSesionSubida(drive)
+    original = sesion.request
+    respuestas = []
+
+    def con_503(method, url, **kwargs):
+        if method == "PUT" and len(respuestas) == 2:
+            sesion.errores_503 = 1  # el tercer PUT responde 503
+        respuestas.append(method)
+        return original(method, url, **kwargs)
+
+    sesion.request = con_503
+    _subir(drive, sesion)
+    assert drive.archivos[drive.file_id]["contenido"] == DATOS
+    assert sesion.bytes_recibidos == len(DATOS)  # el trozo rechazado no había llegado: no hay reenvío de más
+
+
+def test_corte_de_red_retoma_desde_lo_confirmado(drive):
+    sesion = FakeSesionSubida(drive, cortes_red=[CHUNK // 2, 3 * CHUNK + 10])
+    _subir(drive, sesion, _trozos(DATOS))
+    assert drive.archivos[drive.file_id]["contenido"] == DATOS
+    # tras cada corte el servidor informa (308 + Range) lo recibido y solo se reenvía el resto del trozo
+    assert sesion.bytes_recibidos == len(DATOS)
+    assert drive.llamadas["subida_PATCH"] == 1
+
+
+def test_gzip_en_streaming(drive):
+    sesion = FakeSesionSubida(drive, cortes_red=[1_000])
+    _subir(drive, sesion, _trozos(DATOS), comprimir=True)
+    archivo = drive.archivos[drive.file_id]
+    assert gzip.decompress(archivo["contenido"]) == DATOS
+    assert archivo["metadata"]["mimeType"] == "application/gzip"
+
+
+def test_proceso_muerto_retoma_desde_el_checkpoint(drive):
+    sesion = FakeSesionSubida(drive, cortes_proceso=[3 * CHUNK + 100])
+    with pytest.raises(CorteProceso):
+        _subir(drive, sesion, _trozos(DATOS), id_subida="export")
+    assert os.path.exists(drive_io._ruta_checkpoint("export"))
+    recibidos = sesion.bytes_recibidos
+
+    _subir(drive, sesion, _trozos(DATOS), id_subida="export")
+    assert drive.archivos[drive.file_id]["contenido"] == DATOS
+    assert sesion.bytes_recibidos - recibidos == len(DATOS) - recibidos  # solo lo que faltaba
+    assert drive.llamadas["subida_PATCH"] == 1  # se reusó la sesión de subida
+    assert not os.path.exists(drive_io._ruta_checkpoint("export"))
+
+
+def test_checkpoint_de_otra_fuente_falla(drive):
+    sesion = FakeSesionSubida(drive, cortes_proceso=[2 * CHUNK])
+    with pytest.raises(CorteProceso):
+        _subir(drive, sesion, id_subida="export")
+    with pytest.raises(RuntimeError, match="más corta"):
+        _subir(drive, sesion, DATOS[:CHUNK], id_subida="export")
+
+
+def test_sin_avance_se_rinde_y_conserva_el_checkpoint(drive):
+    sesion = FakeSesionSubida(drive, cortes_red=[CHUNK + 1] * drive_io.SUBIDA_REINTENTOS)
+    original = sesion.request
+
+    def sin_progreso(method, url, headers=None, data=None, timeout=None):
+        if method == "PUT" and data:
+            sesion.cortes_red = [int(headers["Content-Range"].split()[1].split("-")[0])]  # corta en el primer byte
+        return original(method, url, headers=headers, data=data, timeout=timeout)
+
+    sesion.request = sin_progreso
+    with pytest.raises(RuntimeError, match="no avanza"):
+        _subir(drive, sesion, id_subida="export")
+    assert os.path.exists(drive_io._ruta_checkpoint("export"))
+
+
+def test_archivo_inexistente_invalida_la_cache(drive):
+    sesion = FakeSesionSubida(drive)
+    _subir(drive, sesion)
+    del drive.archivos[drive.file_id]
+    with pytest.raises(RuntimeError, match="404"):
+        _subir(drive, sesion)
+    assert clientes_google.invalidar("drive_archivo") == 0  # ya se había olvidado el ID
+
+
+def test_trozo_no_multiplo_de_256_kib(drive):
+    with pytest.raises(ValueError):
+        drive_io.subir_a_drive(DATOS, "historico.csv", chunk_bytes=100_000, sesion=FakeSesionSubida(drive))
+
+
+class _AuthConToken:
+    """drive.auth de PyDrive2: get_access_token entrega el token vigente, Refresh emite uno nuevo."""
+
+    def __init__(self):
+        self.token, self.refrescos = "t0", 0
+        self.credentials = self
+
+    def get_access_token(self):
+        return type("Token", (), {"access_token": self.token})
+
+    def Refresh(self):
+        self.refrescos += 1
+        self.token = f"t{self.refrescos}"
+
+
+def test_sesion_renueva_el_token_ante_401(monkeypatch):
+    auth = _AuthConToken()
+    vistos = []
+
+    def responder(self, method, url, headers=None, **kwargs):
+        vistos.append(headers["Authorization"])
+        respuesta = requests.Response()
+        respuesta.status_code = 401 if headers["Authorization"] == "Bearer t0" else 308
+        return respuesta
+
+    monkeypatch.setattr(requests.Session, "request", responder)
+    sesion = drive_io._sesion_autenticada(type("Drive", (), {"auth": auth}))
+    assert sesion.request("PUT", "https://subida", headers={"Content-Range": "bytes */*"}).status_code == 308
+    assert vistos == ["Bearer t0", "Bearer t1"] and auth.refrescos == 1
+
+    auth.token = "t0"  # revocado de nuevo y el refresco no lo arregla: el 401 se entrega sin insistir
+    auth.Refresh = lambda: None
+    assert sesion.request("PUT", "https://subida").status_code == 401
+    assert len(vistos) == 4
+
+
+def test_servidor_que_retrocede_no_corrompe_la_subida(drive):
+    sesion = FakeSesionSubida(drive, retroceso=(2 * CHUNK, CHUNK + 10))  # tras el 2º trozo confirma CHUNK - 10
+    with pytest.raises(RuntimeError, match="retrocedió"):
+        _subir(drive, sesion, _trozos(DATOS), id_subida="export")
+    assert drive.archivos[drive.file_id].get("contenido") != DATOS
+    assert os.path.exists(drive_io._ruta_checkpoint("export"))
+
+    _subir(drive, sesion, _trozos(DATOS), id_subida="export")  # retoma desde lo que el servidor sí tiene
+    assert drive.archivos[drive.file_id]["contenido"] == DATOS
+    assert drive.llamadas["subida_PATCH"] == 1
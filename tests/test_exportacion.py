@@ -0,0 +1,77 @@
+# tests/test_exportacion.py
+"""Pipeline de exportación (utils.exportacion) con exportadores falsos inyectados, sin conexión."""
+import threading
+import time
+
+import pandas as pd
+
+from utils import exportacion
+
+DF = pd.DataFrame({"Fecha": ["2025-01-01"], "Descripción": ["COMPRA"], "Monto": [1_000]})
+PAUSA = 0.2
+
+
+class _Exportador:
+    """Registra cuántas llamadas corren a la vez; cada una tarda PAUSA."""
+
+    def __init__(self, error: Exception = None):
+        self.error = error
+        self.activos = self.max_activos = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, df, *args):
+        with self._lock:
+            self.activos += 1
+            self.max_activos = max(self.max_activos, self.activos)
+        time.sleep(PAUSA)
+        with self._lock:
+            self.activos -= 1
+        if self.error:
+            raise self.error
+        return f"{len(df)} filas"
+
+
+def _trabajos(ids):
+    assert exportacion.esperar(ids, timeout=10)
+    return {t["id"]: t for t in exportacion.listar_trabajos(ids)}
+
+
+def test_sheets_y_drive_corren_a_la_vez():
+    sheet, drive = _Exportador(), _Exportador()
+    ids = exportacion.encolar_exportacion(DF, worksheet_title="a", drive_title="x.csv", exportador_sheet=sheet, exportador_drive=drive)
+    trabajos = _trabajos(ids)
+    a, b = (trabajos[i] for i in ids)
+    assert a["inicio"] < b["fin"] and b["inicio"] < a["fin"]  # los intervalos se traslapan
+    assert {t["estado"] for t in trabajos.values()} == {"listo"}
+    assert a["resultado"] == "1 filas"
+
+
+def test_un_mismo_destino_se_serializa():
+    sheet = _Exportador()
+    ids = [
+        i
+        for _ in range(3)
+        for i in exportacion.encolar_exportacion(DF, worksheet_title="misma", exportador_sheet=sheet)
+    ]
+    trabajos = sorted(_trabajos(ids).values(), key=lambda t: t["inicio"])
+    assert sheet.max_activos == 1
+    for antes, despues in zip(trabajos, trabajos[1:]):
+        assert despues["inicio"] >= antes["fin"]
+
+
+def test_falla_queda_registrada_con_su_error():
+    ids = exportacion.encolar_exportacion(DF, worksheet_title="b", exportador_sheet=_Exportador(RuntimeError("sin cuota")))
+    (trabajo,) = _trabajos(ids).values()
+    assert trabajo["estado"] == "fallido" and trabajo["error"] == "sin cuota"
+    assert trabajo["resultado"] is None
+
+
+def test_registra_tiempos_y_filtra_por_ids():
+    ids = exportacion.encolar_exportacion(DF, worksheet_title="c", exportador_sheet=_Exportador())
+    otros = exportacion.encolar_exportacion(DF, worksheet_title="d", exportador_sheet=_Exportador())
+    (trabajo,) = _trabajos(ids).values()
+    assert trabajo["espera_s"] >= 0 and trabajo["duracion_s"] >= PAUSA * 0.9
+    assert trabajo["creado"] <= trabajo["inicio"] <= trabajo["fin"]
+    assert [t["id"] for t in exportacion.listar_trabajos(ids)] == ids
+    assert exportacion.esperar(otros, timeout=10)
+    assert not exportacion.hay_trabajos_activos(ids + otros)
@@ -0,0 +1,78 @@
+# tests/test_huellas.py
+"""Índice de huellas (utils.huellas): fusión idempotente de cartolas, en una carpeta temporal."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import historico, huellas
+
+
+@pytest.fixture(autouse=True)
+def carpeta(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)  # historico/ (dataset y huellas.npy) es relativo
+    huellas.recargar()
+    yield tmp_path
+    huellas.recargar()
+
+
+def _movimientos(desde: str, dias: int) -> pd.DataFrame:
+    fechas = pd.date_range(desde, periods=dias, freq="D")
+    return pd.DataFrame({
+        "Fecha": fechas,
+        "Descripción": [f"COMPRA {d.day % 5}" for d in fechas],
+        "Monto": [1_000 + d.day for d in fechas],
+        "Categoría": ["📦 Otro gasto"] * dias,
+    })
+
+
+def _huellas_guardadas() -> np.ndarray:
+    tabla = np.asarray(huellas._estado["tabla"])
+    return np.sort(tabla[tabla != 0])
+
+
+def test_cartolas_traslapadas_solo_insertan_lo_nuevo():
+    primera = _movimientos("2025-01-01", 20)
+    segunda = _movimientos("2025-01-11", 20)  # 10 días en común
+    assert huellas.fusionar(primera, "2025-01-25") == 20
+    assert huellas.fusionar(segunda, "2025-02-25") == 10
+    assert huellas.fusionar(segunda, "2025-02-25") == 0
+    assert len(historico.cargar_historico(periodos=["2025-02-25"])) == 10
+    assert huellas.contiene(segunda).all()
+
+
+def test_compras_identicas_el_mismo_dia_se_conservan():
+    cafe = pd.DataFrame({
+        "Fecha": pd.to_datetime(["2025-03-03"] * 2),
+        "Descripción": ["STARBUCKS"] * 2,
+        "Monto": [3_500] * 2,
+        "Categoría": ["🍽️ Comida"] * 2,
+    })
+    assert huellas.fusionar(cafe, "2025-03-25") == 2
+    assert huellas.fusionar(cafe, "2025-03-25") == 0
+    tres = pd.concat([cafe, cafe.iloc[:1]], ignore_index=True)  # la cartola corregida trae un tercer café
+    assert huellas.fusionar(tres, "2025-03-25") == 1
+    assert len(historico.cargar_historico()) == 3
+
+
+def test_reconstruir_da_la_misma_tabla_que_insertar_de_a_poco():
+    for i in range(4):
+        huellas.fusionar(_movimientos(f"2025-0{i + 1}-05", 40), f"2025-0{i + 1}-25")
+    incremental = _huellas_guardadas()
+    n = huellas.resumen()["huellas"]
+    assert huellas.reconstruir() == n == len(incremental)
+    assert np.array_equal(_huellas_guardadas(), incremental)
+
+
+def test_particion_cambiada_por_fuera_fuerza_reconstruccion():
+    huellas.fusionar(_movimientos("2025-01-01", 20), "2025-01-25")
+    externos = _movimientos("2025-06-01", 5)
+    assert not huellas.contiene(externos).any()
+
+    guardados = historico.cargar_historico(periodos=["2025-01-25"])
+    historico.guardar_periodo(pd.concat([guardados, externos], ignore_index=True), "2025-01-25")  # sin fusionar
+    antes = huellas.ESTADISTICAS["reconstrucciones"]
+    assert huellas.contiene(externos).all()
+    assert huellas.ESTADISTICAS["reconstrucciones"] == antes + 1
+
+    huellas.recargar()  # también al reabrir desde disco el índice queda al día
+    assert huellas.contiene(externos).all()
@@ -0,0 +1,69 @@
+# tests/test_ingesta.py
+"""CLI de ingesta (utils.ingesta) sobre PDFs sintéticos cifrados, en una carpeta temporal."""
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from benchmarks.sintetico import generar_pdf
+from utils import comercios, historico, huellas, ingesta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(historico.__file__)))
+
+
+@pytest.fixture
+def carpeta(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)  # historico/ y cache/ son relativos
+    huellas.recargar()
+    comercios.recargar()
+    pdfs = tmp_path / "pdfs"
+    pdfs.mkdir()
+    for i, desde in enumerate(("2025-03-26", "2025-04-26")):
+        (pdfs / f"80_{i}_0350262800063301494_2025{i + 4:02d}22.pdf").write_bytes(
+            generar_pdf(200, password="1234", semilla=i, desde=desde)
+        )
+    yield pdfs
+    huellas.recargar()
+    comercios.recargar()
+
+
+def test_reingerir_omite_los_pdfs_sin_abrirlos(carpeta, monkeypatch):
+    rutas = ingesta.listar_pdfs([str(carpeta)])
+    primera = ingesta.ingerir(rutas, "1234", workers=1)
+    assert primera["archivos"] == 2 and primera["filas"] > 0 and primera["omitidos"] == 0
+    assert len(historico.listar_periodos()) == 2
+
+    def no_abrir(*args):
+        raise AssertionError("no debería procesar un PDF ya ingerido")
+
+    monkeypatch.setattr(ingesta.ProcessPoolExecutor, "submit", no_abrir)
+    segunda = ingesta.ingerir(rutas, "1234", workers=1)
+    assert (segunda["archivos"], segunda["filas"], segunda["omitidos"]) == (0, 0, 2)
+
+
+def test_reingiere_si_la_cartola_se_borro(carpeta):
+    rutas = ingesta.listar_pdfs([str(carpeta)])
+    ingesta.ingerir(rutas, "1234", workers=1)
+    borrado = historico.listar_periodos()[0]
+    historico.borrar_periodos([borrado])
+    resumen = ingesta.ingerir(rutas, "1234", workers=1)
+    assert resumen["archivos"] == 1 and resumen["omitidos"] == 1 and resumen["filas"] > 0
+    assert borrado in historico.listar_periodos()
+
+
+def test_escritura_es_reentrante_y_usa_un_archivo_de_lock(carpeta):
+    with historico.escritura:
+        with historico.escritura:
+            historico.guardar_periodo(historico.cargar_historico(), "2025-01-25")
+    assert (carpeta.parent / "historico" / ".lock").exists()
+
+
+def test_escritura_excluye_a_otro_proceso(carpeta):
+    codigo = "from utils import historico\nwith historico.escritura:\n    print('ok')"
+    with historico.escritura:
+        otro = subprocess.Popen([sys.executable, "-c", codigo], stdout=subprocess.PIPE, env={**os.environ, "PYTHONPATH": RAIZ})
+        time.sleep(1.0)
+        assert otro.poll() is None  # espera el lock
+    assert otro.communicate(timeout=30)[0].strip() == b"ok"
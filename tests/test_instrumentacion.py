@@ -0,0 +1,70 @@
+# tests/test_instrumentacion.py
+"""La instrumentación se activa por contexto (una sesión de Streamlit = un hilo), no por proceso."""
+import threading
+
+from utils import instrumentacion
+from utils.instrumentacion import contar, cronometrado, medir
+
+
+@cronometrado("test.etapa")
+def _etapa():
+    contar("filas", 3)
+
+
+def _rerun(activa, resultados, nombre):
+    instrumentacion.iniciar_traza(nombre, activa)
+    with medir("test.bloque"):
+        _etapa()
+    resultados[nombre] = (instrumentacion.activa(), instrumentacion.terminar_traza())
+
+
+def test_cada_contexto_usa_su_propio_flag():
+    resultados = {}
+    hilos = [threading.Thread(target=_rerun, args=(activa, resultados, f"sesion_{activa}")) for activa in (True, False)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    activa, traza = resultados["sesion_True"]
+    assert activa and [r["etapa"] for r in traza["registros"]] == ["test.etapa", "test.bloque"]
+    assert traza["contadores"]["filas"] == 3
+    assert resultados["sesion_False"] == (False, None)
+
+
+def test_default_del_proceso():
+    try:
+        instrumentacion.activar(True)
+        assert instrumentacion.iniciar_traza("a") is not None
+        assert instrumentacion.iniciar_traza("b", activa=False) is None and not instrumentacion.activa()
+        instrumentacion.activar(False)
+        assert instrumentacion.iniciar_traza("c") is None
+        assert instrumentacion.iniciar_traza("d", activa=True) is not None
+    finally:
+        instrumentacion.activar(False)
+        instrumentacion.iniciar_traza("fin", activa=False)
+
+
+def test_trazas_guardadas_por_sesion():
+    instrumentacion.reiniciar()
+    for sesion in ("a", "b", "a"):
+        instrumentacion.iniciar_traza("rerun", True, sesion)
+        contar("filas")
+        instrumentacion.terminar_traza()
+    assert [t["sesion"] for t in instrumentacion.trazas_guardadas("a")] == ["a", "a"]
+    lineas = instrumentacion.trazas_jsonl(instrumentacion.trazas_guardadas("b")).splitlines()
+    assert len(lineas) == 1 and '"sesion": "b"' in lineas[0]
+
+
+def test_rerun_de_fragmento_abre_su_propia_traza():
+    instrumentacion.reiniciar()
+    rerun = instrumentacion.iniciar_traza("rerun", True, "s")
+    with instrumentacion.traza_fragmento("fragmento.panel", True, "s") as traza:
+        assert traza is rerun  # rerun completo: el fragmento mide en la traza del rerun
+    instrumentacion.terminar_traza()
+
+    with instrumentacion.traza_fragmento("fragmento.panel", True, "s") as traza:  # rerun parcial
+        _etapa()
+    assert traza is not rerun and traza["contadores"]["filas"] == 3 and "duracion_ms" in traza
+    assert rerun["contadores"]["filas"] == 0 and not instrumentacion.activa()
+    assert [t["nombre"] for t in instrumentacion.trazas_guardadas("s")] == ["rerun", "fragmento.panel"]
@@ -0,0 +1,145 @@
+# tests/test_sheets_io.py
+"""sync_worksheet contra el worksheet falso (utils.sheets_fake), sin conexión."""
+import itertools
+import re
+
+import gspread
+import pandas as pd
+import pytest
+
+from utils import sheets_io
+from utils.sheets_fake import FakeWorksheet
+from utils.sheets_io import (
+    COLUMNA_HASH, COLUMNA_ID, _hash_texto, append_worksheet, claves_movimientos, overwrite_worksheet, sync_worksheet,
+)
+
+
+def _movimientos(n: int = 20) -> pd.DataFrame:
+    return pd.DataFrame({
+        "Fecha": pd.date_range("2025-01-01", periods=n, freq="D"),
+        "Descripción": [f"COMPRA {i % 4}" for i in range(n)],
+        "Monto": [1_000 * (i + 1) for i in range(n)],
+        "Categoría": ["📦 Otro gasto"] * n,
+    })
+
+
+def _monto_con_id_numerico() -> int:
+    """Un monto cuyo _id (hex) tiene solo dígitos: USER_ENTERED lo leería de vuelta como número."""
+    for monto in itertools.count(1):
+        if re.fullmatch(r"\d+", _hash_texto(("2025-02-01", "PAGO", monto, 0))):
+            return monto
+
+
+def _cuerpo(ws: FakeWorksheet) -> pd.DataFrame:
+    filas = ws.get_all_values()
+    return pd.DataFrame(filas[1:], columns=filas[0])
+
+
+def test_primera_sincronizacion_escribe_todo():
+    df = _movimientos()
+    ws = FakeWorksheet()
+    resumen = sync_worksheet(ws, df)
+    assert resumen["insertadas"] == len(df)
+    hoja = _cuerpo(ws)
+    assert list(hoja.columns) == list(df.columns) + [COLUMNA_ID, COLUMNA_HASH]
+    assert hoja[COLUMNA_ID].tolist() == claves_movimientos(df)
+
+
+def test_claves_y_formulas_se_escriben_como_texto():
+    monto = _monto_con_id_numerico()
+    df = pd.concat([_movimientos(), pd.DataFrame({
+        "Fecha": pd.to_datetime(["2025-02-01", "2025-02-02"]),
+        "Descripción": ["PAGO", "=HYPERLINK(\"x\")"],
+        "Monto": [monto, 5],
+        "Categoría": ["📦 Otro gasto"] * 2,
+    })], ignore_index=True)
+    ws = FakeWorksheet()
+    sync_worksheet(ws, df)
+
+    hoja = _cuerpo(ws)
+    assert hoja[COLUMNA_ID].tolist() == claves_movimientos(df)
+    assert hoja["Descripción"].iloc[-1] == "=HYPERLINK(\"x\")"
+
+    ws.llamadas.clear()
+    resumen = sync_worksheet(ws, df)
+    assert (resumen["insertadas"], resumen["actualizadas"], resumen["borradas"]) == (0, 0, 0)
+    assert ws.llamadas["batch_update"] == 0
+
+
+def test_delta_inserta_actualiza_y_borra():
+    df = _movimientos()
+    ws = FakeWorksheet()
+    sync_worksheet(ws, df)
+
+    nuevo = pd.concat([df.iloc[3:], _movimientos(25).iloc[20:]], ignore_index=True)
+    nuevo.loc[0, "Categoría"] = "🛒 Supermercado"
+    ws.llamadas.clear()
+    resumen = sync_worksheet(ws, nuevo)
+
+    assert (resumen["insertadas"], resumen["actualizadas"], resumen["borradas"]) == (5, 1, 3)
+    assert ws.llamadas["get_all_values"] == 1 and ws.llamadas["batch_update"] == 1
+    hoja = _cuerpo(ws)
+    assert len(hoja) == len(nuevo)
+    assert sorted(hoja[COLUMNA_ID]) == sorted(claves_movimientos(nuevo))
+    assert hoja.loc[hoja[COLUMNA_ID] == claves_movimientos(nuevo)[0], "Categoría"].item() == "🛒 Supermercado"
+
+
+def test_encabezados_distintos_reescriben_la_hoja():
+    ws = FakeWorksheet()
+    ws.cargar([["Otra", "Cosa"], ["1", "2"], ["3", "4"]])
+    df = _movimientos(5)
+    resumen = sync_worksheet(ws, df)
+    assert resumen["borradas"] == 2 and resumen["insertadas"] == 5
+    assert ws.llamadas["clear"] == 1
+    assert len(_cuerpo(ws)) == 5
+
+
+def test_handle_desactualizado_tras_append_no_recorta_la_hoja():
+    df = _movimientos(170)
+    completa = FakeWorksheet()
+    sync_worksheet(completa, df)
+
+    ws = FakeWorksheet(rows=100)
+    sync_worksheet(ws, df.iloc[:20])
+    ws.append_rows(completa.get_all_values()[21:], value_input_option="RAW")  # la hoja crece; el handle no
+    assert ws.row_count == 100 and ws.grilla[0] == 171
+
+    df.loc[148, "Categoría"] = "🛒 Supermercado"  # fila 150 de la hoja: más allá del row_count del handle
+    ws.llamadas.clear()
+    resumen = sync_worksheet(ws, df)
+    assert (resumen["insertadas"], resumen["actualizadas"], resumen["borradas"]) == (0, 1, 0)
+    assert ws.llamadas["resize"] == 0
+    assert _cuerpo(ws)[COLUMNA_ID].tolist() == claves_movimientos(df)
+
+
+def test_reescritura_y_append_guardan_el_texto_tal_cual():
+    df = pd.DataFrame({
+        "Fecha": pd.to_datetime(["2025-02-01", "2025-02-02"]),
+        "Descripción": ["=HYPERLINK(\"x\")", "00123"],
+        "Monto": [1_500, 12_345_678_901_234_567],
+        "Categoría": ["📦 Otro gasto"] * 2,
+    })
+    esperado = [["2025-02-01", "=HYPERLINK(\"x\")", "1500", "📦 Otro gasto"],
+                ["2025-02-02", "00123", "12345678901234567", "📦 Otro gasto"]]
+
+    completa = FakeWorksheet(rows=1, cols=2)  # la grilla se agranda para el DataFrame
+    assert overwrite_worksheet(completa, df) == 2
+    assert completa.get_all_values()[1:] == esperado
+
+    por_append = FakeWorksheet()
+    assert append_worksheet(por_append, df) == 2
+    assert por_append.get_all_values() == completa.get_all_values()
+
+
+def test_append_reintenta_la_cuota_pero_no_duplica_tras_un_503(monkeypatch):
+    monkeypatch.setattr(sheets_io, "REINTENTO_ESPERA_INICIAL", 0.0)
+    df = _movimientos(30)
+    ws = FakeWorksheet()
+    ws.fallas["append_rows"] = 2  # 429: rechazado sin aplicar, se reintenta
+    assert append_worksheet(ws, df, max_celdas=40) == 30
+    assert ws.llamadas["append_rows"] == 2 + 4 and len(_cuerpo(ws)) == 30
+
+    ws.fallas_tras_aplicar["append_rows"] = 1  # 503 de un lote que sí quedó escrito
+    with pytest.raises(gspread.exceptions.APIError):
+        append_worksheet(ws, df, max_celdas=40)
+    assert len(_cuerpo(ws)) == 30 + 10  # el lote una sola vez, sin reenviar ni seguir con los demás
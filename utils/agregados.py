@@ -0,0 +1,157 @@
+# utils/agregados.py
+import os
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils import historico
+from utils.instrumentacion import cronometrado
+from utils.periodos import asignar_periodo, etiquetar_periodos
+
+# Versión del cálculo: súbela si cambia cómo se agrega (los agregados viejos quedan ignorados).
+AGREGADOS_VERSION = "3"
+# Un agregado pequeño por cartola guardada: historico/agregados/v{version}/{periodo_cartola}.parquet
+AGREGADOS_DIR = os.path.join(historico.HIST_DIR, "agregados", f"v{AGREGADOS_VERSION}")
+
+COLUMNAS_AGREGADO = ["Periodo", "Dia", "Categoría", "Gastos", "Abonos", "N_gastos", "N_abonos", "N"]
+
+_memo: Dict[str, object] = {"firma": None, "agregado": None}
+_lock = threading.Lock()
+
+
+def _ruta(periodo_cartola: str) -> str:
+    return os.path.join(AGREGADOS_DIR, f"{periodo_cartola}.parquet")
+
+
+@cronometrado()
+def calcular_agregado(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Periodo (25 a 25, según la Fecha) × Día × Categoría → suma de gastos (>0), suma de abonos (<0)
+    y conteos, aplicando los mismos filtros globales que la vista histórica.
+    El día permite las series temporales (utils.datos_graficos) sin volver a las filas.
+    """
+    df = df.dropna(subset=["Fecha"])
+    df = df[~df["Descripción"].str.contains("Revisar", case=False, na=False)]
+    if df.empty:
+        return pd.DataFrame(columns=COLUMNAS_AGREGADO)
+
+    monto = df["Monto"]
+    base = pd.DataFrame({
+        "Periodo": np.asarray(etiquetar_periodos(asignar_periodo(df["Fecha"])), dtype=object),
+        "Dia": pd.to_datetime(df["Fecha"]).dt.normalize(),
+        "Categoría": df["Categoría"].astype(str),
+        "Gastos": monto.where(monto > 0, 0),
+        "Abonos": monto.where(monto < 0, 0),
+        "N_gastos": (monto > 0).astype("int64"),
+        "N_abonos": (monto < 0).astype("int64"),
+        "N": 1,
+    })
+    return base.groupby(["Periodo", "Dia", "Categoría"], as_index=False).sum()[COLUMNAS_AGREGADO]
+
+
+def actualizar_agregado(periodo_cartola: str, df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """Recalcula y guarda el agregado de UNA cartola (lee su partición si no se entrega df)."""
+    if df is None:
+        df = historico.cargar_historico(columnas=["Fecha", "Descripción", "Monto", "Categoría"], periodos=[periodo_cartola])
+    agregado = calcular_agregado(df)
+    os.makedirs(AGREGADOS_DIR, exist_ok=True)
+    tmp = f"{_ruta(periodo_cartola)}.tmp"
+    agregado.to_parquet(tmp, index=False)
+    os.replace(tmp, _ruta(periodo_cartola))
+    return agregado
+
+
+def borrar_agregados(periodos_cartola: Iterable[str]) -> None:
+    for periodo in periodos_cartola:
+        if os.path.exists(_ruta(periodo)):
+            os.remove(_ruta(periodo))
+
+
+@cronometrado()
+def sincronizar_agregados() -> Tuple[int, int]:
+    """
+    Mantiene un agregado por cartola guardada, de forma incremental:
+    - calcula los que faltan o quedaron más antiguos que su partición,
+    - borra los de cartolas eliminadas.
+    Retorna (recalculados, borrados).
+    """
+    guardados = set(historico.listar_periodos())
+    existentes = set()
+    if os.path.isdir(AGREGADOS_DIR):
+        existentes = {f[: -len(".parquet")] for f in os.listdir(AGREGADOS_DIR) if f.endswith(".parquet")}
+
+    recalculados = 0
+    for periodo in guardados:
+        particion = os.path.join(historico.DATASET_DIR, f"Periodo={periodo}", historico.ARCHIVO_PARTICION)
+        if periodo not in existentes or os.path.getmtime(_ruta(periodo)) < os.path.getmtime(particion):
+            actualizar_agregado(periodo)
+            recalculados += 1
+
+    huerfanos = existentes - guardados
+    borrar_agregados(huerfanos)
+    return recalculados, len(huerfanos)
+
+
+@cronometrado()
+def cargar_agregados() -> pd.DataFrame:
+    """
+    Agregado total Periodo × Día × Categoría (suma de los agregados por cartola).
+    Memoizado en el proceso: solo se relee si cambió algún agregado en disco.
+    """
+    sincronizar_agregados()
+    archivos = sorted(os.listdir(AGREGADOS_DIR)) if os.path.isdir(AGREGADOS_DIR) else []
+    archivos = [os.path.join(AGREGADOS_DIR, f) for f in archivos if f.endswith(".parquet")]
+    firma = tuple((f, os.path.getmtime(f)) for f in archivos)
+
+    with _lock:
+        if _memo["firma"] == firma:
+            return _memo["agregado"]
+
+    if archivos:
+        agregado = pd.concat([pd.read_parquet(f) for f in archivos], ignore_index=True)
+        agregado = agregado.groupby(["Periodo", "Dia", "Categoría"], as_index=False).sum()
+    else:
+        agregado = pd.DataFrame(columns=COLUMNAS_AGREGADO)
+
+    with _lock:
+        _memo["firma"], _memo["agregado"] = firma, agregado
+    return agregado
+
+
+# --- Consultas para el dashboard (todas sobre la tabla agregada, no sobre las filas) ---
+def filtrar_agregado(agregado: pd.DataFrame, periodo: Optional[str], categorias: Iterable[str]) -> pd.DataFrame:
+    """periodo=None o "Todos" → todos los periodos."""
+    if periodo and periodo != "Todos":
+        agregado = agregado[agregado["Periodo"] == periodo]
+    return agregado[agregado["Categoría"].isin(list(categorias))]
+
+
+def kpis(agregado: pd.DataFrame) -> Dict[str, float]:
+    gastos = agregado["Gastos"].sum()
+    abonos = agregado["Abonos"].sum()
+    return {
+        "gastos": gastos,
+        "abonos": abonos,
+        "gasto_neto": gastos + abonos,
+        "movimientos": int(agregado["N"].sum()),
+    }
+
+
+def gasto_por_categoria(agregado: pd.DataFrame) -> pd.DataFrame:
+    """Suma de gastos (>0) por categoría, solo categorías con al menos un gasto."""
+    por_cat = agregado.groupby("Categoría", as_index=False)[["Gastos", "N_gastos"]].sum()
+    por_cat = por_cat[por_cat["N_gastos"] > 0]
+    return por_cat.rename(columns={"Gastos": "Monto"})[["Categoría", "Monto"]].reset_index(drop=True)
+
+
+def gasto_neto_por_periodo(agregado: pd.DataFrame) -> pd.DataFrame:
+    por_periodo = agregado.groupby("Periodo", as_index=False)[["Gastos", "Abonos"]].sum()
+    por_periodo["Gasto Neto"] = por_periodo["Gastos"] + por_periodo["Abonos"]
+    return por_periodo
+
+
+def gasto_diario(agregado: pd.DataFrame) -> pd.DataFrame:
+    """Dia → Gastos, Abonos (días con movimientos, en orden)."""
+    return agregado.groupby("Dia", as_index=False)[["Gastos", "Abonos"]].sum()
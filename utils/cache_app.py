@@ -0,0 +1,180 @@
+# utils/cache_app.py
+"""
+Caché del dashboard sobre st.cache_data / st.cache_resource, con claves versionadas
+por el contenido de historico/:
+
+- versión de una cartola: mtime_ns de su partición (cambia al guardarla, también si la
+  escribe la CLI de ingesta en otro proceso);
+- versión del histórico: tupla (periodo, versión) de todas las cartolas guardadas.
+
+Cada partición compacta se cachea con la versión de SU cartola; el índice, el agregado,
+las opciones de filtro y los gráficos, con la versión del histórico.
+invalidar_cartolas() borra exactamente las particiones de las cartolas tocadas; las entradas
+derivadas no se borran: su clave es la versión del histórico, que cambió, así que las viejas
+quedan inalcanzables y max_entries las desaloja.
+
+Con CARTOLA_BACKEND=sqlite (utils.historico_sql) no se construye el índice en memoria: las
+mismas funciones consultan la base SQLite, sincronizada una vez por versión del histórico.
+"""
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+import streamlit as st
+from pandas.api.types import union_categoricals
+
+from utils import agregados, consultas, datos_graficos, graficos, historico, historico_sql
+from utils.movimientos import compactar
+from utils.periodos import clave_desde_etiqueta
+
+Version = Tuple[Tuple[str, int], ...]
+
+_versiones_cacheadas: Dict[str, int] = {}  # periodo → versión con la que se cacheó su partición
+
+
+def version_cartola(periodo: str) -> int:
+    return os.stat(os.path.join(historico.DATASET_DIR, f"Periodo={periodo}", historico.ARCHIVO_PARTICION)).st_mtime_ns
+
+
+def version_historico() -> Version:
+    return tuple((p, version_cartola(p)) for p in sorted(historico.listar_periodos()))
+
+
+def backend() -> str:
+    """"pandas" (default: índice en memoria) o "sqlite" (utils.historico_sql)."""
+    return os.getenv("CARTOLA_BACKEND", "pandas").strip().lower()
+
+
+# --- Entradas por cartola ---
+@st.cache_data(show_spinner=False, max_entries=1_000)
+def _particion(periodo: str, version: int) -> pd.DataFrame:
+    df = historico.cargar_historico(columnas=["Fecha", "Descripción", "Monto", "Categoría"], periodos=[periodo], diccionario=True)
+    return compactar(df)
+
+
+def _concatenar(partes: List[pd.DataFrame]) -> pd.DataFrame:
+    """concat que mantiene Descripción/Categoría categóricas (une los diccionarios de cada cartola)."""
+    if not partes:
+        return compactar(historico.cargar_historico(columnas=["Fecha", "Descripción", "Monto", "Categoría"]))
+    df = pd.concat(partes, ignore_index=True)
+    for col in ("Descripción", "Categoría"):
+        df[col] = union_categoricals([p[col] for p in partes], ignore_order=True)
+    return df
+
+
+# --- Entradas derivadas de todo el histórico ---
+@st.cache_resource(show_spinner=False, max_entries=1)
+def indice_historico(version: Version) -> Dict:
+    """Índice de consultas (utils.consultas) sobre todas las cartolas. Recurso: no se copia en cada rerun."""
+    partes = [_particion(periodo, v) for periodo, v in version]
+    _versiones_cacheadas.update(version)
+    return consultas.construir_indice(_concatenar(partes))
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def base_sql(version: Version) -> str:
+    """Sincroniza historico_sql con las particiones de esta versión (una vez por versión)."""
+    historico_sql.sincronizar()
+    return historico_sql.RUTA_DB
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def agregado_historico(version: Version) -> pd.DataFrame:
+    return agregados.cargar_agregados()
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def opciones_filtros(version: Version) -> Tuple[List[str], List[str]]:
+    """(periodos del más reciente al más antiguo, categorías) para los filtros."""
+    if backend() == "sqlite":
+        base_sql(version)
+        return historico_sql.opciones_filtros()
+    agregado = agregado_historico(version)
+    return sorted(agregado["Periodo"].unique(), reverse=True), sorted(agregado["Categoría"].unique())
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def vista_graficos(version: Version, filtro_periodo: str, categorias: Tuple[str, ...]) -> Dict:
+    """KPIs y especificaciones de barras/torta (top de categorías + "Otras") para una combinación de filtros."""
+    if backend() == "sqlite":
+        base_sql(version)
+        resumen = historico_sql.resumen_por_categoria(_clave(filtro_periodo), categorias)
+        por_categoria, indicadores = historico_sql.gasto_por_categoria(resumen), historico_sql.kpis(resumen)
+    else:
+        vista = agregados.filtrar_agregado(agregado_historico(version), filtro_periodo, categorias)
+        por_categoria, indicadores = agregados.gasto_por_categoria(vista), agregados.kpis(vista)
+    top = datos_graficos.top_categorias(por_categoria)
+    return {
+        "kpis": indicadores,
+        "barras": graficos.barras_por_categoria(top) if not top.empty else None,
+        "torta": graficos.torta_por_categoria(top),
+    }
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def grafico_gasto_neto(version: Version) -> Dict:
+    if backend() == "sqlite":
+        base_sql(version)
+        return graficos.barras_gasto_neto(historico_sql.gasto_neto_por_periodo())
+    return graficos.barras_gasto_neto(agregados.gasto_neto_por_periodo(agregado_historico(version)))
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def grafico_temporal(version: Version, filtro_periodo: str, categorias: Tuple[str, ...], granularidad: str) -> Dict:
+    """{"spec", "granularidad"}: serie de gastos/abonos/gasto neto (la granularidad puede quedar más gruesa)."""
+    if backend() == "sqlite":
+        base_sql(version)
+        diario = historico_sql.gasto_diario(_clave(filtro_periodo), categorias)
+    else:
+        diario = agregados.gasto_diario(agregados.filtrar_agregado(agregado_historico(version), filtro_periodo, categorias))
+    serie, usada = datos_graficos.serie_temporal(diario, granularidad)
+    return {"spec": graficos.lineas_temporales(serie, usada), "granularidad": usada}
+
+
+def _clave(filtro_periodo: Optional[str]) -> Optional[int]:
+    return None if not filtro_periodo or filtro_periodo == "Todos" else clave_desde_etiqueta(filtro_periodo)
+
+
+# --- Tabla paginada y descripciones (mismo contrato en ambos backends) ---
+@st.cache_data(show_spinner=False, max_entries=64)
+def _consultar_sql(version: Version, clave_periodo: Optional[int], categorias: Tuple[str, ...]) -> Dict:
+    base_sql(version)
+    return historico_sql.consultar(clave_periodo, categorias)
+
+
+def consultar_movimientos(version: Version, filtro_periodo: str, categorias: Iterable[str]) -> Dict:
+    """Resultado del filtro para n_paginas/pagina_movimientos ("Todos" = todos los periodos)."""
+    if backend() == "sqlite":
+        return _consultar_sql(version, _clave(filtro_periodo), tuple(categorias))
+    return consultas.consultar(indice_historico(version), _clave(filtro_periodo), categorias)
+
+
+def pagina_movimientos(version: Version, resultado: Dict, numero: int) -> pd.DataFrame:
+    """Filas de la página `numero` (desde 0) del resultado."""
+    if backend() == "sqlite":
+        return historico_sql.pagina(resultado, numero)
+    return consultas.pagina(indice_historico(version), resultado, numero)
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def descripciones_historico(version: Version, categoria: Optional[str] = None) -> List[str]:
+    """Descripciones distintas del histórico (de una categoría, si se indica)."""
+    if backend() == "sqlite":
+        base_sql(version)
+        return historico_sql.descripciones(categoria)
+    tabla = indice_historico(version)["tabla"]
+    if categoria is None:
+        return list(tabla["Descripción"].cat.categories)
+    return list(tabla.loc[tabla["Categoría"] == categoria, "Descripción"].unique())
+
+
+def invalidar_cartolas(periodos: Iterable[str]) -> None:
+    """
+    Llamar después de guardar o borrar cartolas: descarta la partición cacheada de cada una
+    (las demás cartolas siguen en caché). Las derivadas del histórico completo no se tocan:
+    el próximo rerun las pide con la versión nueva.
+    """
+    for periodo in periodos:
+        version = _versiones_cacheadas.pop(periodo, None)
+        if version is not None:
+            _particion.clear(periodo, version)
@@ -0,0 +1,189 @@
+# utils/cache_cartola.py
+import hashlib
+import hmac
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import pandas as pd
+
+from utils.cartola import PARSER_VERSION, extraer_movimientos_vectorizado
+from utils.clasificador import CLASIFICADOR_VERSION
+
+# Caché en disco junto a historico/: solo los movimientos parseados (parquet, 0600). El texto
+# descifrado del PDF se cachea únicamente en memoria.
+CACHE_DIR = "cache"
+CACHE_MAX_BYTES = int(os.getenv("CARTOLA_CACHE_MAX_BYTES", 200 * 1024 * 1024))
+MEMO_MAX_ENTRADAS = 32
+
+# Contadores del proceso (se muestran en la UI).
+ESTADISTICAS: Dict[str, int] = {"memo_hits": 0, "disco_hits": 0, "misses": 0, "evicciones": 0}
+
+_memo: "OrderedDict[str, object]" = OrderedDict()
+_lock = threading.Lock()
+_secreto: Dict[str, bytes] = {}
+
+
+def hash_pdf(datos: bytes) -> str:
+    """SHA-256 del contenido del PDF (identidad del archivo, independiente del nombre)."""
+    return hashlib.sha256(datos).hexdigest()
+
+
+def _contar(nombre: str) -> None:
+    with _lock:
+        ESTADISTICAS[nombre] += 1
+
+
+def _crear_carpeta() -> None:
+    os.makedirs(CACHE_DIR, mode=0o700, exist_ok=True)
+
+
+def _leer_secreto() -> bytes:
+    """Secreto local (cache/.secreto, 0600) con que se firman los nombres de archivo; se crea la primera vez."""
+    with _lock:
+        if CACHE_DIR in _secreto:
+            return _secreto[CACHE_DIR]
+        _crear_carpeta()
+        ruta = os.path.join(CACHE_DIR, ".secreto")
+        if not os.path.exists(ruta):
+            # se escribe completo en un temporal y se enlaza: otro proceso nunca lee un secreto a medias
+            tmp = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with os.fdopen(os.open(tmp, os.O_CREAT | os.O_WRONLY | os.O_TRUNC, 0o600), "wb") as f:
+                f.write(os.urandom(32))
+            try:
+                os.link(tmp, ruta)
+            except FileExistsError:
+                pass  # otro proceso lo creó primero
+            else:
+                # Secreto nuevo: las entradas anteriores ya no se alcanzan (y las .txt tenían el texto en claro)
+                for nombre in os.listdir(CACHE_DIR):
+                    if nombre.endswith((".txt", ".parquet")):
+                        os.remove(os.path.join(CACHE_DIR, nombre))
+            finally:
+                os.remove(tmp)
+        with open(ruta, "rb") as f:
+            secreto = f.read()
+        _secreto[CACHE_DIR] = secreto
+        return secreto
+
+
+def _clave(datos: bytes, password: str, *versiones: str) -> str:
+    """
+    HMAC (con el secreto local) del PDF, su clave y las versiones. La clave del PDF entra para no
+    entregar un PDF ya cacheado con una clave incorrecta, pero sin el secreto el nombre del archivo
+    no sirve para probar claves por fuerza bruta.
+    """
+    h = hmac.new(_leer_secreto(), hash_pdf(datos).encode(), hashlib.sha256)
+    for parte in (password, *versiones):
+        h.update(b"\0" + parte.encode())
+    return h.hexdigest()
+
+
+def _memo_get(clave: str):
+    with _lock:
+        if clave in _memo:
+            _memo.move_to_end(clave)
+            ESTADISTICAS["memo_hits"] += 1
+            return _memo[clave]
+    return None
+
+
+def _memo_put(clave: str, valor) -> None:
+    with _lock:
+        _memo[clave] = valor
+        _memo.move_to_end(clave)
+        while len(_memo) > MEMO_MAX_ENTRADAS:
+            _memo.popitem(last=False)
+
+
+def _ruta(clave: str, extension: str) -> str:
+    return os.path.join(CACHE_DIR, f"{clave}{extension}")
+
+
+def _tocar(ruta: str) -> None:
+    """Marca la entrada como usada recientemente (el LRU en disco se ordena por mtime)."""
+    try:
+        os.utime(ruta)
+    except OSError:
+        pass
+
+
+def _evictar(max_bytes: int = CACHE_MAX_BYTES) -> None:
+    """Borra las entradas menos usadas hasta que la carpeta quede bajo max_bytes."""
+    entradas = []
+    for nombre in os.listdir(CACHE_DIR):
+        if nombre.startswith("."):  # el secreto no se evicta
+            continue
+        ruta = os.path.join(CACHE_DIR, nombre)
+        try:
+            info = os.stat(ruta)
+        except OSError:
+            continue
+        entradas.append((info.st_mtime, info.st_size, ruta))
+
+    total = sum(tam for _, tam, _ in entradas)
+    for _, tam, ruta in sorted(entradas):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(ruta)
+        except OSError:
+            continue
+        total -= tam
+        _contar("evicciones")
+
+
+def _escribir(ruta: str, escribir) -> None:
+    # Escritura atómica: otro rerun/sesión nunca ve un archivo a medias.
+    _crear_carpeta()
+    tmp = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+    os.close(os.open(tmp, os.O_CREAT | os.O_WRONLY | os.O_TRUNC, 0o600))  # 0600 antes de escribir el contenido
+    escribir(tmp)
+    os.replace(tmp, ruta)
+    _evictar()
+
+
+def texto_pdf_cacheado(datos: bytes, password: str, workers: Optional[int] = None) -> str:
+    """Texto del PDF: memo → pdfplumber (extraer_texto_pdf con `workers` procesos). Nunca va a disco."""
+    clave = _clave(datos, password)
+    texto = _memo_get(clave)
+    if texto is not None:
+        return texto
+
+    from utils.pdf_texto import extraer_texto_pdf  # pdfplumber solo se importa al abrir un PDF
+
+    _contar("misses")
+    texto = extraer_texto_pdf(datos, password, workers=workers)
+    _memo_put(clave, texto)
+    return texto
+
+
+def movimientos_cacheados(datos: bytes, password: str, workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Movimientos parseados y clasificados del PDF, cacheados por
+    SHA-256 del PDF + versión del parser + versión del clasificador + modo (texto/tabla).
+    workers: procesos para extraer el texto (1 dentro de un worker de un pool; ver extraer_texto_pdf).
+    Retorna una copia (el llamador puede modificarla libremente).
+    """
+    from utils.pdf_tabla import extraer_movimientos_tabla, modo_pdf
+
+    modo = modo_pdf()
+    clave = _clave(datos, password, PARSER_VERSION, CLASIFICADOR_VERSION, modo)
+    df: Optional[pd.DataFrame] = _memo_get(clave)
+    if df is not None:
+        return df.copy()
+
+    ruta = _ruta(clave, ".parquet")
+    if os.path.exists(ruta):
+        df = pd.read_parquet(ruta)
+        _tocar(ruta)
+        _contar("disco_hits")
+    else:
+        df = extraer_movimientos_tabla(datos, password) if modo == "tabla" else None
+        if df is None:  # modo texto, o la cartola no tiene columnas alineadas
+            df = extraer_movimientos_vectorizado(texto_pdf_cacheado(datos, password, workers))
+        _escribir(ruta, lambda tmp: df.to_parquet(tmp, index=False))
+
+    _memo_put(clave, df)
+    return df.copy()
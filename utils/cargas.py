@@ -0,0 +1,291 @@
+# utils/cargas.py
+"""
+Servicio de cargas de cartolas PDF, fuera del rerun de Streamlit.
+
+- Cola: tabla trabajos en historico/cargas.sqlite (sin broker). encolar() registra el trabajo
+  y retorna de inmediato; la UI consulta el estado con estado() / listar_trabajos(ids),
+  con los IDs que encoló cada sesión (la cola es compartida por todas).
+- Workers: un pool de procesos (spawn) corre extracción → parseo/clasificación por REGLAS →
+  normalización (procesar_carga), así los PDFs se reparten entre los núcleos y el proceso de
+  Streamlit no queda ocupado parseando.
+- Almacenamiento: un hilo coordinador toma los trabajos de la cola, los manda al pool y guarda
+  cada resultado (comercios + huellas.fusionar + agregados) de a uno, como utils.ingesta: los
+  índices de comercios y huellas tienen un solo escritor (historico.escritura, que también
+  excluye a otros procesos, como el CLI de ingesta).
+- El PDF y la clave viven solo en memoria del proceso que inició el servicio (_entradas, por
+  ID de trabajo): la cola guarda estados y tiempos, nunca la clave. Al iniciar, los trabajos
+  que quedaron "pendiente"/"en_curso" (el proceso murió con sus claves) se marcan fallidos.
+"""
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import closing
+from multiprocessing import get_context
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from utils import historico
+from utils.instrumentacion import cronometrado
+
+COLA_PATH = os.path.join(historico.HIST_DIR, "cargas.sqlite")
+WORKERS = int(os.getenv("CARTOLA_CARGAS_WORKERS", "0")) or os.cpu_count() or 1
+INTERVALO = 0.5  # s entre revisiones de la cola cuando no hay nada en vuelo
+ESTADOS_TERMINALES = ("listo", "fallido")  # además: "pendiente", "en_curso"
+_TERMINALES_SQL = ", ".join("?" * len(ESTADOS_TERMINALES))
+MAX_TRABAJOS_GUARDADOS = 50
+
+_COLUMNAS = (
+    "id", "nombre", "estado", "creado", "inicio", "fin", "espera_s", "duracion_s",
+    "periodo", "movimientos", "insertados", "error",
+)
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS trabajos (
+    id TEXT PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    estado TEXT NOT NULL,
+    creado REAL NOT NULL,
+    inicio REAL,
+    fin REAL,
+    espera_s REAL,
+    duracion_s REAL,
+    periodo TEXT,
+    movimientos INTEGER,
+    insertados INTEGER,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS trabajos_estado ON trabajos (estado, creado);
+"""
+
+_lock = threading.Lock()
+_despertar = threading.Event()
+_servicio: Dict[str, object] = {"hilo": None}
+_entradas: Dict[str, tuple] = {}  # id → (PDF, clave) de los trabajos pendientes, solo en memoria
+
+
+def _conectar() -> sqlite3.Connection:
+    directorio = os.path.dirname(COLA_PATH)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    if not os.path.exists(COLA_PATH):
+        # se crea 0600 antes de abrirla: SQLite crea -wal y -shm con los permisos del archivo
+        os.close(os.open(COLA_PATH, os.O_CREAT | os.O_WRONLY, 0o600))
+    con = sqlite3.connect(COLA_PATH, timeout=30, isolation_level=None, check_same_thread=False)
+    con.execute("PRAGMA secure_delete=ON")
+    con.execute("PRAGMA journal_mode=WAL")
+    con.executescript(_ESQUEMA)
+    return con
+
+
+def _actualizar(id_trabajo: str, **cambios) -> None:
+    with closing(_conectar()) as con:
+        asignaciones = ", ".join(f"{k} = ?" for k in cambios)
+        con.execute(f"UPDATE trabajos SET {asignaciones} WHERE id = ?", (*cambios.values(), id_trabajo))
+
+
+# --- Worker (proceso del pool) ---
+def procesar_carga(datos: bytes, password: str) -> pd.DataFrame:
+    """Extracción → parseo/clasificación (con caché por contenido) → normalización."""
+    from utils.cache_cartola import movimientos_cacheados
+    from utils.cartola import normalizar_movimientos
+
+    # el paralelismo es entre cartolas: sin pool de páginas dentro de cada worker
+    return normalizar_movimientos(movimientos_cacheados(datos, password, workers=1))
+
+
+# --- Coordinador (hilo del proceso que inició el servicio) ---
+def _tomar() -> Optional[Dict]:
+    """Marca como en_curso el trabajo pendiente más antiguo de este proceso y lo retorna (con PDF y clave)."""
+    with _lock:
+        ids = list(_entradas)
+    if not ids:
+        return None
+    with closing(_conectar()) as con:
+        con.execute("BEGIN IMMEDIATE")  # nadie más toma el mismo trabajo
+        fila = con.execute(
+            f"SELECT id, periodo, creado FROM trabajos WHERE estado = 'pendiente' AND id IN ({','.join('?' * len(ids))}) "
+            "ORDER BY creado LIMIT 1",
+            ids,
+        ).fetchone()
+        if fila is None:
+            con.execute("COMMIT")
+            return None
+        inicio = time.time()
+        con.execute(
+            "UPDATE trabajos SET estado = 'en_curso', inicio = ?, espera_s = ? WHERE id = ?",
+            (inicio, inicio - fila[2], fila[0]),
+        )
+        con.execute("COMMIT")
+    with _lock:
+        pdf, password = _entradas.pop(fila[0])
+    return {"id": fila[0], "periodo": fila[1], "pdf": pdf, "password": password, "t0": time.perf_counter()}
+
+
+@cronometrado()
+def _almacenar(trabajo: Dict, df: pd.DataFrame) -> int:
+    from utils import comercios, huellas
+    from utils.agregados import sincronizar_agregados
+
+    with historico.escritura:  # la UI también escribe (correcciones de categoría)
+        df = comercios.clasificar_movimientos(df)
+        comercios.guardar()
+        df["Periodo"] = trabajo["periodo"]
+        insertados = huellas.fusionar(df, trabajo["periodo"])
+        if insertados:
+            sincronizar_agregados()
+    return insertados
+
+
+def _terminar(trabajo: Dict, futuro) -> None:
+    cambios = {}
+    try:
+        df = futuro.result()
+        cambios.update(estado="listo", movimientos=len(df), insertados=_almacenar(trabajo, df))
+    except Exception as e:
+        cambios.update(estado="fallido", error=str(e) or type(e).__name__)
+    _actualizar(trabajo["id"], fin=time.time(), duracion_s=time.perf_counter() - trabajo["t0"], **cambios)
+
+
+def _abortar(en_vuelo: Dict) -> None:
+    """El pool murió con estos trabajos adentro: fallan todos (ninguno queda en_curso para siempre)."""
+    for futuro, trabajo in en_vuelo.items():
+        if futuro.done():
+            _terminar(trabajo, futuro)
+        else:
+            _actualizar(trabajo["id"], estado="fallido", fin=time.time(), duracion_s=time.perf_counter() - trabajo["t0"],
+                        error="Se cayó el proceso que la procesaba; vuelve a subir la cartola")
+    en_vuelo.clear()
+
+
+def _atender() -> None:
+    en_vuelo: Dict = {}
+    with ProcessPoolExecutor(max_workers=WORKERS, mp_context=get_context("spawn")) as pool:
+        try:
+            while True:
+                while len(en_vuelo) < WORKERS:  # en_curso = corriendo en un worker, no esperando en el pool
+                    trabajo = _tomar()
+                    if trabajo is None:
+                        break
+                    try:
+                        futuro = pool.submit(procesar_carga, trabajo["pdf"], trabajo["password"])
+                    except BrokenProcessPool:
+                        with _lock:
+                            _entradas[trabajo["id"]] = (trabajo["pdf"], trabajo["password"])
+                        _actualizar(trabajo["id"], estado="pendiente", inicio=None)  # lo toma el pool nuevo
+                        raise
+                    del trabajo["pdf"], trabajo["password"]
+                    en_vuelo[futuro] = trabajo
+                if not en_vuelo:
+                    _despertar.wait(INTERVALO)
+                    _despertar.clear()
+                    continue
+                listos, _ = wait(en_vuelo, timeout=INTERVALO, return_when=FIRST_COMPLETED)
+                for futuro in listos:
+                    _terminar(en_vuelo.pop(futuro), futuro)
+        except BrokenProcessPool:
+            _abortar(en_vuelo)
+            raise
+
+
+def _coordinar() -> None:
+    while True:
+        try:
+            _atender()
+        except BrokenProcessPool:  # murió un worker (p. ej. sin memoria): sus trabajos fallan, se crea otro pool
+            continue
+
+
+def iniciar() -> None:
+    """Arranca el servicio (una vez por proceso); lo que quedó a medias falla (sus claves se perdieron)."""
+    with _lock:
+        if _servicio["hilo"] is not None:
+            return
+        with closing(_conectar()) as con:
+            con.execute(
+                "UPDATE trabajos SET estado = 'fallido', fin = ?, error = ? WHERE estado IN ('pendiente', 'en_curso')",
+                (time.time(), "El servicio se reinició antes de procesarla; vuelve a subir la cartola"),
+            )
+        hilo = threading.Thread(target=_coordinar, name="cargas", daemon=True)
+        hilo.start()
+        _servicio["hilo"] = hilo
+
+
+# --- API pública ---
+def encolar(datos: bytes, password: str, nombre: str, periodo: str) -> str:
+    """Encola la cartola (se guardará en la cartola `periodo`) y retorna el ID del trabajo de inmediato."""
+    iniciar()
+    id_trabajo = uuid.uuid4().hex[:8]
+    with _lock:
+        _entradas[id_trabajo] = (datos, password)
+    with closing(_conectar()) as con:
+        con.execute(
+            "INSERT INTO trabajos (id, nombre, estado, creado, periodo) VALUES (?, ?, 'pendiente', ?, ?)",
+            (id_trabajo, nombre, time.time(), periodo),
+        )
+        con.execute(
+            f"""DELETE FROM trabajos WHERE id IN (
+                SELECT id FROM trabajos WHERE estado IN ({_TERMINALES_SQL})
+                ORDER BY creado DESC LIMIT -1 OFFSET ?)""",
+            (*ESTADOS_TERMINALES, MAX_TRABAJOS_GUARDADOS),
+        )
+    _despertar.set()
+    return id_trabajo
+
+
+def estado(id_trabajo: str) -> Optional[Dict]:
+    with closing(_conectar()) as con:
+        fila = con.execute(f"SELECT {', '.join(_COLUMNAS)} FROM trabajos WHERE id = ?", (id_trabajo,)).fetchone()
+    return dict(zip(_COLUMNAS, fila)) if fila else None
+
+
+def _filtro_ids(ids: Optional[Iterable[str]]):
+    """(condición SQL, parámetros) para limitar una consulta a esos IDs; None = todos los trabajos."""
+    if ids is None:
+        return "1 = 1", ()
+    ids = tuple(ids)
+    return f"id IN ({', '.join('?' * len(ids))})", ids
+
+
+def listar_trabajos(ids: Optional[Iterable[str]] = None) -> List[Dict]:
+    """
+    Estado de los trabajos, del más reciente al más antiguo.
+    ids: solo esos trabajos (p. ej. los encolados por una sesión); None = todos los de la cola.
+    """
+    condicion, parametros = _filtro_ids(ids)
+    with closing(_conectar()) as con:
+        filas = con.execute(
+            f"SELECT {', '.join(_COLUMNAS)} FROM trabajos WHERE {condicion} ORDER BY creado DESC", parametros
+        ).fetchall()
+    return [dict(zip(_COLUMNAS, f)) for f in filas]
+
+
+def hay_trabajos_activos(ids: Optional[Iterable[str]] = None) -> bool:
+    condicion, parametros = _filtro_ids(ids)
+    with closing(_conectar()) as con:
+        fila = con.execute(
+            f"SELECT 1 FROM trabajos WHERE {condicion} AND estado NOT IN ({_TERMINALES_SQL}) LIMIT 1",
+            (*parametros, *ESTADOS_TERMINALES),
+        )
+        return fila.fetchone() is not None
+
+
+def esperar(ids: Iterable[str], timeout: Optional[float] = None, intervalo: float = 0.05) -> bool:
+    """Espera a que los trabajos terminen (para scripts y benchmarks). Retorna False si vence el timeout."""
+    ids = list(ids)
+    limite = None if timeout is None else time.monotonic() + timeout
+    while True:
+        with closing(_conectar()) as con:
+            marcas = ",".join("?" * len(ids))
+            activos = con.execute(
+                f"SELECT COUNT(*) FROM trabajos WHERE id IN ({marcas}) AND estado NOT IN ({_TERMINALES_SQL})",
+                (*ids, *ESTADOS_TERMINALES),
+            ).fetchone()[0]
+        if not activos:
+            return True
+        if limite is not None and time.monotonic() > limite:
+            return False
+        time.sleep(intervalo)
@@ -0,0 +1,126 @@
+# utils/cartola.py
+import re
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from utils.clasificador import clasificar_categoria, classify_series
+from utils.instrumentacion import contar, cronometrado
+from utils.periodos import obtener_periodo_facturacion_custom
+
+# Versión del parser: súbela cada vez que cambie la forma de leer la cartola.
+PARSER_VERSION = "2"
+
+COLUMNAS_MOVIMIENTOS = ["Fecha", "Descripción", "Monto", "Categoría"]
+LINEAS_CABECERA = 8  # líneas de cabecera del PDF que se saltan
+
+_RE_MOVIMIENTO = re.compile(r"(\d{2}/\d{2}/\d{4}).*?\$[\s-]*([\d.]+)")
+
+# Misma lógica que _RE_MOVIMIENTO, con la descripción en su propio grupo (texto tras la
+# fecha hasta el primer "$"). Compatible con RE2 para que pyarrow la evalúe en C.
+_PATRON_MOVIMIENTO = (
+    r"(?P<fecha>\d{2}/\d{2}/\d{4})"
+    r"(?P<descripcion>[^$]*)"
+    r".*?\$[\s-]*(?P<monto>[\d.]+)"
+)
+_DTYPE_LINEAS = pd.ArrowDtype(pa.string())
+_RE_FECHA_PDF = re.compile(r"_(\d{8})\.pdf$")
+
+
+@cronometrado()
+def extraer_movimientos(texto: str) -> pd.DataFrame:
+    movimientos = []
+    lineas = texto.splitlines()[LINEAS_CABECERA:]  # saltar cabecera del PDF
+    for linea in lineas:
+        if "$" not in linea:
+            continue
+        match = _RE_MOVIMIENTO.search(linea)
+        if not match:
+            continue
+        fecha = match.group(1)
+        monto = float(match.group(2).replace(".", ""))
+        if "NOTA DE CREDITO" in linea.upper():
+            monto *= -1
+
+        # Descripción robusta
+        partes = linea.split(fecha)
+        desc_bruta = partes[1].split("$")[0].strip() if len(partes) > 1 else "Revisar"
+        if not desc_bruta or desc_bruta.upper() in ["", "NONE"]:
+            desc_bruta = "Revisar"
+
+        categoria = clasificar_categoria(desc_bruta)
+        movimientos.append({
+            "Fecha": fecha,
+            "Descripción": desc_bruta,
+            "Monto": monto,
+            "Categoría": categoria
+        })
+    return pd.DataFrame(movimientos)
+
+
+@cronometrado()
+def extraer_movimientos_vectorizado(texto: str) -> pd.DataFrame:
+    """
+    Igual que extraer_movimientos, pero por columnas:
+    todas las líneas van a una Serie (Arrow) y se parsean con un único str.extract.
+    Devuelve las mismas columnas y en el mismo orden de filas.
+    """
+    lineas = pd.Series(pa.array(texto.splitlines()[LINEAS_CABECERA:], type=pa.string()), dtype=_DTYPE_LINEAS)
+    lineas = lineas[lineas.str.contains("$", regex=False)]
+
+    partes = lineas.str.extract(_PATRON_MOVIMIENTO)
+    validas = partes["fecha"].notna().to_numpy(dtype=bool)
+    partes = partes[validas]
+    if partes.empty:
+        return pd.DataFrame(columns=COLUMNAS_MOVIMIENTOS)
+
+    monto = partes["monto"].str.replace(".", "", regex=False).astype(float).to_numpy()
+    es_nota_credito = lineas[validas].str.contains("NOTA DE CREDITO", case=False, regex=False).to_numpy(dtype=bool)
+    monto = np.where(es_nota_credito, -monto, monto)
+
+    fechas = partes["fecha"]
+    descripcion = partes["descripcion"]
+
+    # linea.split(fecha)[1]: si la misma fecha se repite antes del "$", se corta ahí
+    repetidas = descripcion.str.contains("/", regex=False).to_numpy(dtype=bool)
+    if repetidas.any():
+        descripcion = descripcion.copy()
+        descripcion[repetidas] = [
+            d.split(f)[0] for d, f in zip(descripcion[repetidas], fechas[repetidas])
+        ]
+
+    descripcion = descripcion.str.strip()
+    sin_desc = (descripcion == "") | (descripcion.str.upper() == "NONE")
+    descripcion = descripcion.mask(sin_desc, "Revisar")
+
+    df = pd.DataFrame({
+        "Fecha": fechas.to_numpy(dtype=object),
+        "Descripción": descripcion.to_numpy(dtype=object),
+        "Monto": monto,
+    })
+    df["Categoría"] = classify_series(descripcion).to_numpy()
+    contar("movimientos_parseados", len(df))
+    return df
+
+
+@cronometrado()
+def normalizar_movimientos(df: pd.DataFrame) -> pd.DataFrame:
+    """Fecha a datetime y descarte de filas sin fecha, de banco/monto cancelado y "Revisar"."""
+    df = df.copy()
+    df["Fecha"] = pd.to_datetime(df["Fecha"], format="%d/%m/%Y", errors="coerce")
+    df = df.dropna(subset=["Fecha"])
+    df = df[~df["Descripción"].str.contains("(?i)banco|monto cancelado", na=False)]
+    df = df[~df["Descripción"].str.contains("Revisar", case=False, na=False)]  # ⛔️ excluir "Revisar"
+    return df
+
+
+def periodo_desde_nombre_pdf(nombre_pdf: str) -> Optional[str]:
+    """Periodo de la cartola a partir del nombre del PDF (…_YYYYMMDD.pdf); None si no calza."""
+    m = _RE_FECHA_PDF.search(nombre_pdf)
+    if not m:
+        return None
+    fecha_pdf = datetime.strptime(m.group(1), "%Y%m%d")
+    return obtener_periodo_facturacion_custom(fecha_pdf)
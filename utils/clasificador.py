@@ -0,0 +1,99 @@
+# utils/clasificador.py
+import re
+from functools import lru_cache
+from typing import Iterable, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.instrumentacion import cronometrado
+
+# Versión de las reglas: súbela cada vez que cambie REGLAS (invalida cachés derivados).
+CLASIFICADOR_VERSION = "1"
+
+CATEGORIA_DEFAULT = "📦 Otro gasto"
+
+# Tabla de reglas: (prioridad, categoría, palabras clave).
+# Gana la regla de MENOR prioridad que tenga al menos una palabra contenida en la
+# descripción (en mayúsculas), igual que la cadena if/elif original.
+REGLAS: List[Tuple[int, str, Tuple[str, ...]]] = [
+    (10, "💡 Luz", ("ENEL",)),
+    (20, "🍱 Devoluciones", ("NOTA DE CREDITO",)),
+    (30, "✂️ Barbería", ("BARBER",)),
+    (40, "📱 Plan Celular", ("ENTELPCS", "ENTEL PCS")),
+    (50, "🚿 Agua", ("AGUASCORDILLERA", "AGUAS CORDILLERA")),
+    (60, "⛽ Gasolina", ("ARAMCO", "COPEC", "PETROBRAS", "SHELL")),
+    (70, "👖 Ropa", ("GUESS", "PARIS", "FALABELLA", "HM", "H&M", "EASTON", "CK", "KAKOBUY")),
+    (80, "🚩 Estacionamiento", ("SABA", "ESTACIONAMIENTO", "PARKING", "ALTO")),
+    (90, "🚧 Peaje / Autopista", ("VESPUCIONORTE", "COSTANERA", "AUTOPASE", "VESPUCIOSUR", "CONCESIO", "AUTOPISTA")),
+    (100, "🎓 Educacion", ("KRYTERION",)),
+    (110, "🚗 Transporte", ("UBER", "DIDI", "BIPQR")),
+    (120, "🏠 Hogar", ("BRANDO", "CASAIDEAS")),
+    (130, "💊 Salud", ("FARMACIA", "CRUZ VERDE", "SALCO", "PROCEDIMIENTOS", "CONTINGENCIA CPA", "CLINICA", "CONSALUD", "MEGASALUD")),
+    (140, "🛍️ Compra Online", ("PRODUCTOS", "MERCADOLIBRE", "TECNOPRO", "VISUALHEX")),
+    (150, "🍺 Alcohol", ("CHILEDRINK", "ANTICIPA", "CHEERS", "BARBANEGRA")),
+    (160, "🍽️ Comida", ("TUU", "BDK", "GASTRONOMICA", "RESTAURANTE", "CAFE", "MCDONALD", "STARBUCKS", "MELT", "ICE", "BOAS")),
+    (170, "🐾 Veterinaria", ("VETERINARIA", "PET", "VETIVERY")),
+    (180, "🚫 Estafa", ("HAIRTREK",)),
+    (190, "🛡️ Seguro Auto", ("SEGURO", "SANTANDER COMPRAS P.A.T")),
+    (200, "🤖 Chat GPT", ("CHATGPT",)),
+    (210, "💨 Gas", ("METROGAS",)),
+    (220, "📺 Internet + TV", ("MOVISTARHOGAR",)),
+    (230, "🛒 Supermercado", ("STA ISABEL", "PIWEN", "LIDER", "JUMBO", "TOTTUS")),
+]
+
+# Categorías posibles, en orden de prioridad (la default al final).
+CATEGORIAS: List[str] = [cat for _, cat, _ in sorted(REGLAS, key=lambda r: r[0])] + [CATEGORIA_DEFAULT]
+
+
+def compilar_reglas(
+    reglas: Iterable[Tuple[int, str, Sequence[str]]],
+) -> Tuple[List[str], List["re.Pattern[str]"], np.ndarray]:
+    """
+    Ordena las reglas por prioridad y compila una alternancia (regex) por regla.
+    Retorna: (patrones en texto, patrones compilados, arreglo de categorías), alineados.
+    """
+    ordenadas = sorted(reglas, key=lambda r: r[0])
+    patrones = ["|".join(re.escape(k) for k in palabras) for _, _, palabras in ordenadas]
+    compilados = [re.compile(p) for p in patrones]
+    categorias = np.array([cat for _, cat, _ in ordenadas], dtype=object)
+    return patrones, compilados, categorias
+
+
+# Se compila una sola vez al importar el módulo.
+_PATRONES, _COMPILADOS, _CATEGORIAS = compilar_reglas(REGLAS)
+
+
+@lru_cache(maxsize=65536)
+def _clasificar_texto(descripcion: str) -> str:
+    for patron, categoria in zip(_COMPILADOS, _CATEGORIAS):
+        if patron.search(descripcion):
+            return categoria
+    return CATEGORIA_DEFAULT
+
+
+def clasificar_categoria(descripcion: str) -> str:
+    """Clasifica una descripción según REGLAS (primera regla que coincide)."""
+    return _clasificar_texto(str(descripcion).upper())
+
+
+@cronometrado()
+def classify_series(descripciones: pd.Series) -> pd.Series:
+    """
+    Clasifica una columna completa de una sola pasada:
+    - factoriza la columna (cada descripción distinta se evalúa una sola vez),
+    - evalúa cada regla en forma vectorizada sobre las descripciones únicas,
+    - resuelve prioridades con np.select (gana la primera regla verdadera).
+    Retorna una Serie con el mismo índice que la entrada.
+    """
+    codigos, unicos = pd.factorize(descripciones)
+    if len(unicos) == 0:
+        return pd.Series(CATEGORIA_DEFAULT, index=descripciones.index, dtype=object, name="Categoría")
+
+    textos = pd.Series([str(u).upper() for u in unicos], dtype=str)
+    condiciones = [textos.str.contains(p, regex=True).to_numpy(dtype=bool) for p in _PATRONES]
+    etiquetas_unicas = np.select(condiciones, _CATEGORIAS, default=CATEGORIA_DEFAULT)
+
+    # Los nulos (código -1) caen en la categoría por defecto, como str(nan).upper()
+    etiquetas_unicas = np.append(etiquetas_unicas, CATEGORIA_DEFAULT).astype(object)
+    return pd.Series(etiquetas_unicas[codigos], index=descripciones.index, name="Categoría")
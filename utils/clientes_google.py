@@ -0,0 +1,102 @@
+# utils/clientes_google.py
+"""
+Caché compartida de clientes y metadatos de Google (gspread y PyDrive2).
+
+Cada entrada vive TTL segundos: clientes autenticados, Spreadsheets abiertos,
+handles de worksheets e IDs de carpetas/archivos de Drive ya resueltos.
+Al reutilizar un cliente solo se refresca el token si expiró.
+ESTADISTICAS cuenta aciertos, fallos y viajes a la API ahorrados.
+secreto() lee la configuración de st.secrets al usarla, no al importar los módulos de Google.
+"""
+import os
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import streamlit as st
+
+from utils.instrumentacion import medir
+
+# TTL en segundos (configurable por entorno/.env)
+TTL_CLIENTE = float(os.getenv("CARTOLA_GOOGLE_TTL_CLIENTE", 3600))
+TTL_METADATOS = float(os.getenv("CARTOLA_GOOGLE_TTL_METADATOS", 600))
+
+# Contadores del proceso (se muestran en la UI).
+# hits/misses/expirados por tipo de entrada; viajes_ahorrados = round-trips evitados.
+ESTADISTICAS: Counter = Counter()
+
+_entradas: Dict[Tuple[str, Hashable], Tuple[float, Any]] = {}
+_lock = threading.Lock()
+
+
+def secreto(nombre: str, default: str = "") -> str:
+    """Valor de Secrets (sin espacios); default si la clave no existe o no hay secrets.toml."""
+    try:
+        valor = st.secrets.get(nombre, default)
+    except FileNotFoundError:  # StreamlitSecretNotFoundError: no hay ningún secrets.toml
+        return default
+    return valor.strip() if isinstance(valor, str) else valor
+
+
+def obtener(
+    tipo: str,
+    clave: Hashable,
+    crear: Callable[[], Any],
+    ttl: Optional[float] = None,
+    refrescar: Optional[Callable[[Any], bool]] = None,
+) -> Any:
+    """
+    Devuelve la entrada (tipo, clave) si está vigente; si no, la crea con crear() y la guarda.
+    - ttl: segundos de vigencia (default: TTL_METADATOS).
+    - refrescar(valor): se llama al reutilizar la entrada; retorna True si tuvo que renovar el token.
+    La creación ocurre fuera del lock (puede hacer llamadas HTTP).
+    """
+    ahora = time.monotonic()
+    with _lock:
+        entrada = _entradas.get((tipo, clave))
+        if entrada is not None and entrada[0] > ahora:
+            ESTADISTICAS[f"{tipo}_hits"] += 1
+            ESTADISTICAS["viajes_ahorrados"] += 1
+            valor = entrada[1]
+        else:
+            if entrada is not None:
+                ESTADISTICAS[f"{tipo}_expirados"] += 1
+            ESTADISTICAS[f"{tipo}_misses"] += 1
+            valor = None
+
+    if valor is not None:
+        if refrescar is not None and refrescar(valor):
+            ESTADISTICAS["tokens_refrescados"] += 1
+        return valor
+
+    with medir(f"google.crear_{tipo}"):
+        valor = crear()
+    vigencia = TTL_METADATOS if ttl is None else ttl
+    with _lock:
+        _entradas[(tipo, clave)] = (time.monotonic() + vigencia, valor)
+    return valor
+
+
+def invalidar(tipo: Optional[str] = None, clave: Optional[Hashable] = None) -> int:
+    """Descarta entradas (todas, las de un tipo o una puntual). Retorna cuántas se borraron."""
+    with _lock:
+        borrar = [
+            k for k in _entradas
+            if (tipo is None or k[0] == tipo) and (clave is None or k[1] == clave)
+        ]
+        for k in borrar:
+            del _entradas[k]
+    return len(borrar)
+
+
+def resumen() -> Dict[str, int]:
+    """Totales para mostrar: aciertos, fallos, tokens refrescados y viajes ahorrados."""
+    hits = sum(v for k, v in ESTADISTICAS.items() if k.endswith("_hits"))
+    misses = sum(v for k, v in ESTADISTICAS.items() if k.endswith("_misses"))
+    return {
+        "hits": hits,
+        "misses": misses,
+        "tokens_refrescados": ESTADISTICAS["tokens_refrescados"],
+        "viajes_ahorrados": ESTADISTICAS["viajes_ahorrados"],
+    }
@@ -0,0 +1,351 @@
+# utils/comercios.py
+"""
+Índice persistente comercio → categoría.
+
+Cada descripción se normaliza a una clave de comercio (sin sufijos de tarjeta, cuotas, números,
+ciudades, forma jurídica ni puntuación) y la categoría se memoriza por clave en historico/comercios.json:
+
+- acierto exacto: un dict lookup (O(1)), sin evaluar REGLAS;
+- clave nueva: REGLAS (clasificador); si cae en CATEGORIA_DEFAULT, se busca el comercio
+  conocido más parecido por trigramas (índice invertido en memoria) y, si supera
+  UMBRAL_SIMILITUD, se usa su categoría;
+- correcciones del usuario (asignar): quedan en el mismo índice y mandan sobre todo lo demás.
+
+Si lo que la clave descarta cambia la categoría por REGLAS ('LIDER PUENTE ALTO' cae en
+Estacionamiento por "ALTO", 'LIDER' en Supermercado), la descripción no usa ni alimenta la
+entrada aprendida de su clave (solo la del usuario): se clasifica por REGLAS, así el índice
+no depende del orden en que llegan las descripciones.
+
+Orígenes de cada entrada: "u" usuario, "r" regla, "p" parecido (trigramas), "d" default.
+Solo las entradas "u" y "r" sirven de vecinos para la búsqueda por parecido. Si cambia
+CLASIFICADOR_VERSION se descartan las entradas aprendidas y se conservan las del usuario.
+
+La app, los workers de cargas y el CLI de ingesta comparten comercios.json: guardar() toma el lock
+de escritura del histórico, vuelve a leer el archivo y le aplica solo las claves que cambiaron en
+este proceso (una corrección del usuario hecha en otro proceso no se pisa con una entrada aprendida).
+"""
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+from functools import lru_cache
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils import historico
+from utils.clasificador import CATEGORIA_DEFAULT, CLASIFICADOR_VERSION, clasificar_categoria, classify_series
+from utils.instrumentacion import contar, cronometrado
+
+INDICE_PATH = os.path.join(historico.HIST_DIR, "comercios.json")
+FORMATO_VERSION = 1
+UMBRAL_SIMILITUD = 0.6  # coeficiente de Dice sobre trigramas
+
+USUARIO, REGLA, PARECIDO, DEFAULT = "u", "r", "p", "d"
+
+# Contadores del proceso (se muestran en la UI).
+ESTADISTICAS: Counter = Counter()
+
+CIUDADES = (
+    "SANTIAGO", "STGO", "PROVIDENCIA", "LAS CONDES", "VITACURA", "NUNOA", "MAIPU", "LA FLORIDA",
+    "PUENTE ALTO", "LA REINA", "LO BARNECHEA", "HUECHURABA", "QUILICURA", "SAN MIGUEL", "RECOLETA",
+    "ESTACION CENTRAL", "INDEPENDENCIA", "VINA DEL MAR", "VALPARAISO", "CONCEPCION", "RANCAGUA",
+    "TEMUCO", "ANTOFAGASTA", "LA SERENA", "PUERTO MONTT", "CHILE", "CL", "CHL", "SCL",
+)
+_RE_SUFIJOS = re.compile(r"\*+\s*\d+|\bX{2,}\d*|\bTJ\s*\d+|\bCUOTAS?\s*\d+\s*(?:/|DE)\s*\d+")
+_RE_NO_LETRAS = re.compile(r"[^A-Z& ]+")
+FORMAS_JURIDICAS = ("SPA", "LTDA", "LIMITADA", "EIRL", "S A", "SA", "CIA")
+_RE_RUIDO = re.compile(r"\b(?:" + "|".join(sorted(CIUDADES + FORMAS_JURIDICAS, key=len, reverse=True)) + r")\b")
+_RE_ESPACIOS = re.compile(r"\s+")
+
+_lock = threading.Lock()
+_estado: Dict = {
+    "cargado": False, "sucio": False, "revision": 0, "entradas": {}, "trigramas": None,
+    "cambios": set(),     # claves escritas en este proceso desde la última carga/escritura
+    "asignaciones": 0,    # correcciones del usuario (asignar) en ese lapso
+}
+
+
+@lru_cache(maxsize=65536)
+def clave_comercio(descripcion: str) -> str:
+    """
+    'SANTIAGO COPEC 1234 *5678' → 'COPEC'. Mayúsculas sin tildes; fuera sufijos de tarjeta
+    (*1234, XXXX1234, TJ 1234), cuotas (CUOTA 01/06), números, ciudades, SPA/LTDA y puntuación.
+    """
+    texto = unicodedata.normalize("NFKD", str(descripcion).upper()).encode("ascii", "ignore").decode()
+    texto = _RE_SUFIJOS.sub(" ", texto)
+    texto = _RE_NO_LETRAS.sub(" ", texto)
+    texto = _RE_RUIDO.sub(" ", texto)
+    return _RE_ESPACIOS.sub(" ", texto).strip()
+
+
+@lru_cache(maxsize=65536)
+def _clave_indice(descripcion: str) -> str:
+    """clave_comercio, o "" si la descripción y su clave no caen en la misma regla de REGLAS."""
+    clave = clave_comercio(descripcion)
+    if clave and clasificar_categoria(descripcion) != clasificar_categoria(clave):
+        return ""
+    return clave
+
+
+def _trigramas(clave: str) -> Set[str]:
+    texto = f"  {clave} "
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+# --- Persistencia ---
+def _leer(ruta: str) -> Tuple[Dict[str, Tuple[str, str]], int]:
+    """(entradas, revision) del archivo; sin las aprendidas si cambió CLASIFICADOR_VERSION."""
+    entradas: Dict[str, Tuple[str, str]] = {}
+    if not os.path.exists(ruta):
+        return entradas, 0
+    with open(ruta, encoding="utf-8") as f:
+        datos = json.load(f)
+    categorias = datos["categorias"]
+    mismas_reglas = datos.get("clasificador") == CLASIFICADOR_VERSION
+    for clave, (i, origen) in datos["entradas"].items():
+        if origen == USUARIO or mismas_reglas:
+            entradas[clave] = (categorias[i], origen)
+    return entradas, datos.get("revision", 0)
+
+
+def _cargar() -> None:
+    """Lee el índice de disco (una vez por proceso). Llamar con _lock tomado."""
+    if _estado["cargado"]:
+        return
+    entradas, revision = _leer(INDICE_PATH)
+    _estado.update(cargado=True, sucio=False, revision=revision, entradas=entradas, trigramas=None,
+                   cambios=set(), asignaciones=0)
+
+
+def _fusionar(en_disco: Dict[str, Tuple[str, str]]) -> Dict[str, Tuple[str, str]]:
+    """Archivo + claves cambiadas en este proceso. Llamar con _lock tomado."""
+    entradas = dict(en_disco)
+    if _estado["asignaciones"]:  # como en asignar: lo aprendido por parecido o default se recalcula
+        entradas = {k: v for k, v in entradas.items() if v[1] not in (PARECIDO, DEFAULT)}
+    for clave in _estado["cambios"]:
+        propia = _estado["entradas"].get(clave)
+        if propia is None:
+            continue
+        ajena = entradas.get(clave)
+        if ajena is not None and ajena[1] == USUARIO and propia[1] != USUARIO:
+            continue  # corrección hecha en otro proceso
+        entradas[clave] = propia
+    return entradas
+
+
+def guardar(ruta: Optional[str] = None) -> bool:
+    """
+    Escribe el índice si cambió desde la última carga/escritura. Retorna True si escribió.
+    Fusiona con lo que otro proceso haya escrito entretanto y deja esa fusión en memoria.
+    """
+    ruta = ruta or INDICE_PATH
+    with historico.escritura:
+        with _lock:
+            if not _estado["cargado"] or not _estado["sucio"]:
+                return False
+            en_disco, revision = _leer(ruta)
+            entradas = _fusionar(en_disco)
+            revision = max(revision + _estado["asignaciones"], _estado["revision"])
+            _estado.update(sucio=False, revision=revision, entradas=entradas, trigramas=None,
+                           cambios=set(), asignaciones=0)
+            categorias = sorted({cat for cat, _ in entradas.values()})
+            posicion = {cat: i for i, cat in enumerate(categorias)}
+            datos = {
+                "formato": FORMATO_VERSION,
+                "clasificador": CLASIFICADOR_VERSION,
+                "revision": revision,
+                "categorias": categorias,
+                "entradas": {clave: [posicion[cat], origen] for clave, (cat, origen) in sorted(entradas.items())},
+            }
+        os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+        tmp = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(datos, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, ruta)
+        return True
+
+
+def recargar() -> None:
+    """Olvida el estado en memoria; la próxima consulta vuelve a leer INDICE_PATH."""
+    with _lock:
+        _estado.update(cargado=False, sucio=False, entradas={}, trigramas=None, cambios=set(), asignaciones=0)
+
+
+# --- Búsqueda por parecido ---
+def _indice_trigramas() -> Dict[str, List[str]]:
+    """trigrama → claves conocidas ("u"/"r", categoría distinta de la default). Llamar con _lock tomado."""
+    if _estado["trigramas"] is None:
+        indice = defaultdict(list)
+        for clave, (categoria, origen) in _estado["entradas"].items():
+            if origen in (USUARIO, REGLA) and categoria != CATEGORIA_DEFAULT:
+                for t in _trigramas(clave):
+                    indice[t].append(clave)
+        _estado["trigramas"] = indice
+    return _estado["trigramas"]
+
+
+def _parecido(clave: str) -> Optional[Tuple[str, float]]:
+    """Clave conocida más parecida (Dice sobre trigramas ≥ UMBRAL_SIMILITUD) y su similitud."""
+    indice = _indice_trigramas()
+    propios = _trigramas(clave)
+    comunes = Counter(chain.from_iterable(indice[t] for t in propios if t in indice))
+    mejor, mejor_sim = None, UMBRAL_SIMILITUD
+    for candidata, n in comunes.items():
+        # cota superior barata (la candidata tiene al menos n trigramas) antes de calcular los suyos
+        if 2 * n / (len(propios) + n) < mejor_sim:
+            continue
+        sim = 2 * n / (len(propios) + len(_trigramas(candidata)))
+        if sim >= mejor_sim:
+            mejor, mejor_sim = candidata, sim
+    return (mejor, mejor_sim) if mejor is not None else None
+
+
+def _aprender(clave: str, categoria: str, origen: str) -> None:
+    _estado["entradas"][clave] = (categoria, origen)
+    _estado["cambios"].add(clave)
+    _estado["sucio"] = True
+    if _estado["trigramas"] is not None and origen in (USUARIO, REGLA) and categoria != CATEGORIA_DEFAULT:
+        for t in _trigramas(clave):
+            _estado["trigramas"][t].append(clave)
+
+
+# --- API ---
+@cronometrado()
+def clasificar_series(descripciones: pd.Series, categorias_regla: Optional[pd.Series] = None) -> pd.Series:
+    """
+    Categoría por descripción usando el índice (una consulta por descripción distinta).
+    - categorias_regla: categorías ya calculadas con REGLAS (alineadas con descripciones);
+      si no se entregan, se calculan solo para las claves que no están en el índice.
+    Las claves nuevas quedan memorizadas (persistir con guardar()).
+    """
+    codigos, unicas = pd.factorize(descripciones)
+    claves = [_clave_indice(u) for u in unicas]
+    etiquetas = np.empty(len(unicas) + 1, dtype=object)
+    etiquetas[-1] = CATEGORIA_DEFAULT  # nulos (código -1)
+
+    with _lock:
+        _cargar()
+        entradas = _estado["entradas"]
+        faltantes = []
+        for i, clave in enumerate(claves):
+            if clave:
+                entrada = entradas.get(clave)
+            else:  # sin clave propia: solo una corrección del usuario manda sobre REGLAS
+                entrada = entradas.get(clave_comercio(unicas[i]))
+                entrada = entrada if entrada is not None and entrada[1] == USUARIO else None
+            if entrada is None:
+                faltantes.append(i)
+            else:
+                etiquetas[i] = entrada[0]
+        ESTADISTICAS["hits"] += len(unicas) - len(faltantes)
+        ESTADISTICAS["misses"] += len(faltantes)
+        contar("comercios_misses", len(faltantes))
+
+    if faltantes:
+        if categorias_regla is not None:
+            valores, primera = np.unique(codigos, return_index=True)  # primera fila de cada descripción
+            regla = np.asarray(categorias_regla, dtype=object)[primera[valores >= 0][faltantes]]
+        else:
+            regla = classify_series(pd.Series(unicas[faltantes], dtype=object)).to_numpy()
+        with _lock:
+            for i, categoria in zip(faltantes, regla):
+                clave = claves[i]
+                if not clave:
+                    etiquetas[i] = categoria
+                    continue
+                entrada = _estado["entradas"].get(clave)
+                if entrada is not None:  # otra descripción del mismo comercio, ya vista en este lote
+                    etiquetas[i] = entrada[0]
+                    continue
+                origen = REGLA if categoria != CATEGORIA_DEFAULT else DEFAULT
+                if origen == DEFAULT:
+                    vecino = _parecido(clave)
+                    if vecino is not None:
+                        categoria, origen = _estado["entradas"][vecino[0]][0], PARECIDO
+                        ESTADISTICAS["parecidos"] += 1
+                _aprender(clave, categoria, origen)
+                etiquetas[i] = categoria
+
+    return pd.Series(etiquetas[codigos], index=descripciones.index, name="Categoría")
+
+
+def clasificar(descripcion: str) -> str:
+    """Versión escalar de clasificar_series."""
+    return clasificar_series(pd.Series([descripcion]))[0]
+
+
+def clasificar_movimientos(df: pd.DataFrame) -> pd.DataFrame:
+    """Reemplaza Categoría (calculada por REGLAS en el parser) por la del índice."""
+    df = df.copy()
+    df["Categoría"] = clasificar_series(df["Descripción"], df["Categoría"] if "Categoría" in df else None)
+    return df
+
+
+def asignar(clave: str, categoria: str) -> None:
+    """
+    Corrección del usuario: clave de comercio → categoría (se persiste de inmediato).
+    Las entradas por parecido o default se olvidan, para recalcularlas con el nuevo vecino.
+    """
+    clave = clave_comercio(clave)
+    if not clave:
+        raise ValueError("La descripción no tiene una clave de comercio (solo números o ciudad).")
+    with _lock:
+        _cargar()
+        for k in [k for k, (_, origen) in _estado["entradas"].items() if origen in (PARECIDO, DEFAULT)]:
+            del _estado["entradas"][k]
+        _estado["entradas"][clave] = (categoria, USUARIO)
+        _estado["cambios"].add(clave)
+        _estado["revision"] += 1
+        _estado["asignaciones"] += 1
+        _estado["sucio"] = True
+        _estado["trigramas"] = None
+    guardar()
+
+
+def consultar(clave: str) -> Optional[Tuple[str, str]]:
+    """(categoría, origen) memorizados para la clave, o None."""
+    with _lock:
+        _cargar()
+        return _estado["entradas"].get(clave_comercio(clave))
+
+
+def resumen() -> Dict[str, int]:
+    with _lock:
+        _cargar()
+        origenes = Counter(origen for _, origen in _estado["entradas"].values())
+        return {
+            "comercios": len(_estado["entradas"]),
+            "usuario": origenes[USUARIO],
+            "parecidos": origenes[PARECIDO],
+            "revision": _estado["revision"],
+            **ESTADISTICAS,
+        }
+
+
+@cronometrado()
+def reclasificar_historico(claves: Iterable[str]) -> List[str]:
+    """
+    Aplica el índice a las filas del histórico cuyas descripciones tienen alguna de las claves
+    (p.ej. tras asignar). Reescribe solo las cartolas que cambian; retorna sus periodos.
+    """
+    claves = {clave_comercio(c) for c in claves}
+    tocados = []
+    for periodo in historico.listar_periodos():
+        df = historico.cargar_historico(columnas=["Fecha", "Descripción", "Monto", "Categoría"], periodos=[periodo])
+        codigos, unicas = pd.factorize(df["Descripción"])
+        afectadas = np.append([clave_comercio(u) in claves for u in unicas], False)[codigos]
+        if not afectadas.any():
+            continue
+        nuevas = clasificar_series(df["Descripción"][afectadas])
+        if (nuevas.to_numpy() == df["Categoría"][afectadas].astype(object).to_numpy()).all():
+            continue
+        df["Categoría"] = df["Categoría"].astype(object)
+        df.loc[afectadas, "Categoría"] = nuevas
+        historico.guardar_periodo(df, periodo)
+        tocados.append(periodo)
+    return tocados
@@ -0,0 +1,85 @@
+# utils/consultas.py
+"""
+Capa de consultas indexada sobre la tabla compacta de movimientos (utils.movimientos).
+
+La tabla se ordena una sola vez por Fecha (más reciente primero). Como la clave de periodo
+crece con la fecha, cada periodo ocupa un rango contiguo de filas: filtrar por periodo es un
+slice sin copia. Cada categoría tiene un bitmap de filas (np.packbits); filtrar por categorías
+es un OR de bitmaps recortado al rango del periodo. Solo se materializa la página visible.
+El índice se construye una vez por versión del histórico (ver cache_app.indice_historico).
+"""
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.instrumentacion import cronometrado
+
+TAMANO_PAGINA = 100
+
+
+@cronometrado()
+def construir_indice(df: pd.DataFrame) -> Dict:
+    """
+    Índice sobre la tabla compacta:
+    - tabla: filas ordenadas por Fecha descendente (RangeIndex),
+    - rangos_periodo: Clave_periodo → (inicio, fin) de filas,
+    - bitmaps_categoria: Categoría → bitmap empaquetado (1 bit por fila).
+    """
+    orden = np.argsort(df["Fecha"].to_numpy(), kind="stable")[::-1]
+    tabla = df.take(orden).reset_index(drop=True)
+
+    claves = tabla["Clave_periodo"].to_numpy()
+    cortes = np.flatnonzero(np.diff(claves)) + 1
+    inicios = np.concatenate(([0], cortes)) if len(claves) else np.array([], dtype=np.int64)
+    fines = np.concatenate((cortes, [len(claves)])) if len(claves) else np.array([], dtype=np.int64)
+    rangos = {int(claves[i]): (int(i), int(f)) for i, f in zip(inicios, fines)}
+
+    codigos = tabla["Categoría"].cat.codes.to_numpy()
+    bitmaps = {
+        categoria: np.packbits(codigos == i)
+        for i, categoria in enumerate(tabla["Categoría"].cat.categories)
+    }
+    return {"tabla": tabla, "rangos_periodo": rangos, "bitmaps_categoria": bitmaps}
+
+
+@cronometrado()
+def consultar(
+    indice: Dict,
+    clave_periodo: Optional[int] = None,
+    categorias: Optional[Iterable[str]] = None,
+) -> Dict:
+    """
+    Filtra por periodo (clave YYYYMM; None = todos) y categorías (None = todas).
+    Retorna {"inicio", "fin", "filas", "total"}: si filas es None, el resultado es el slice
+    [inicio, fin) de la tabla; si no, filas son las posiciones (ya en orden de Fecha desc).
+    """
+    n = len(indice["tabla"])
+    inicio, fin = (0, n) if clave_periodo is None else indice["rangos_periodo"].get(int(clave_periodo), (0, 0))
+
+    bitmaps = indice["bitmaps_categoria"]
+    if categorias is None or set(bitmaps) <= set(categorias):
+        return {"inicio": inicio, "fin": fin, "filas": None, "total": fin - inicio}
+
+    b0, b1 = inicio // 8, (fin + 7) // 8
+    union = np.zeros(b1 - b0, dtype=np.uint8)
+    for categoria in categorias:
+        if categoria in bitmaps:
+            union |= bitmaps[categoria][b0:b1]
+    bits = np.unpackbits(union)[inicio - 8 * b0: fin - 8 * b0]
+    filas = np.flatnonzero(bits) + inicio
+    return {"inicio": inicio, "fin": fin, "filas": filas, "total": len(filas)}
+
+
+def n_paginas(resultado: Dict, tamano: int = TAMANO_PAGINA) -> int:
+    return max(1, -(-resultado["total"] // tamano))
+
+
+@cronometrado()
+def pagina(indice: Dict, resultado: Dict, numero: int, tamano: int = TAMANO_PAGINA) -> pd.DataFrame:
+    """Filas de la página `numero` (desde 0): lo único que se copia del resultado."""
+    desde = numero * tamano
+    if resultado["filas"] is None:
+        inicio = resultado["inicio"] + desde
+        return indice["tabla"].iloc[inicio:min(inicio + tamano, resultado["fin"])]
+    return indice["tabla"].take(resultado["filas"][desde:desde + tamano])
@@ -0,0 +1,58 @@
+# utils/datos_graficos.py
+"""
+Datos de los gráficos: tablas chicas, ya agregadas, que van embebidas en las especificaciones.
+
+Altair y Plotly embeben los datos en la especificación que viaja al navegador, así que el
+tamaño del payload depende de cuántas filas recibe el gráfico, no del histórico:
+- por categoría: las TOP_CATEGORIAS de mayor gasto y el resto sumado en "Otras";
+- series temporales: rollup diario, semanal o mensual del gasto diario (agregados.gasto_diario /
+  historico_sql.gasto_diario); si la granularidad pedida da más de MAX_PUNTOS puntos se usa la
+  siguiente más gruesa (un histórico de varios años no se dibuja día a día);
+- montos redondeados a pesos (enteros) y solo las columnas que el gráfico usa.
+"""
+import os
+from typing import Tuple
+
+import pandas as pd
+
+from utils.instrumentacion import cronometrado
+
+TOP_CATEGORIAS = int(os.getenv("CARTOLA_TOP_CATEGORIAS", "8"))
+MAX_PUNTOS = int(os.getenv("CARTOLA_MAX_PUNTOS", "600"))
+OTRAS = "Otras"
+
+# Nombre visible → regla de pandas; en orden de más fina a más gruesa.
+GRANULARIDADES = {"Diaria": "D", "Semanal": "W-MON", "Mensual": "MS"}
+
+
+@cronometrado()
+def top_categorias(por_categoria: pd.DataFrame, n: int = TOP_CATEGORIAS) -> pd.DataFrame:
+    """Categoría, Monto de las n categorías con más gasto (de mayor a menor) y "Otras" con el resto."""
+    orden = por_categoria.sort_values("Monto", ascending=False, kind="stable")
+    top = orden.head(n)[["Categoría", "Monto"]]
+    if len(orden) > n:
+        otras = pd.DataFrame({"Categoría": [OTRAS], "Monto": [orden["Monto"].iloc[n:].sum()]})
+        top = pd.concat([top, otras], ignore_index=True)
+    return top.assign(Monto=top["Monto"].round().astype("int64")).reset_index(drop=True)
+
+
+@cronometrado()
+def serie_temporal(diario: pd.DataFrame, granularidad: str = "Diaria") -> Tuple[pd.DataFrame, str]:
+    """
+    Rollup del gasto diario (Dia, Gastos, Abonos) a la granularidad pedida o, si excede
+    MAX_PUNTOS puntos, a la primera más gruesa que no. Retorna (Fecha, Gastos, Abonos,
+    Gasto Neto; granularidad usada). Fecha es el inicio de cada día, semana o mes.
+    """
+    if diario.empty:
+        return pd.DataFrame(columns=["Fecha", "Gastos", "Abonos", "Gasto Neto"]), granularidad
+    nombres = list(GRANULARIDADES)
+    for nombre in nombres[nombres.index(granularidad):]:
+        serie = (
+            diario.set_index("Dia")[["Gastos", "Abonos"]]
+            .resample(GRANULARIDADES[nombre], label="left", closed="left").sum()
+            .round().astype("int64")
+            .rename_axis("Fecha").reset_index()
+        )
+        serie["Gasto Neto"] = serie["Gastos"] + serie["Abonos"]
+        if len(serie) <= MAX_PUNTOS or nombre == nombres[-1]:
+            return serie, nombre
@@ -0,0 +1,189 @@
+# utils/drive_fake.py
+"""
+Drive falso (en memoria) con la interfaz de PyDrive2 que usa drive_io,
+para probar subidas sin conexión. Cada método que en PyDrive2 es una llamada HTTP
+suma 1 en `llamadas[nombre]` y espera `latencia_s` (simula la red).
+"""
+import json
+import re
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+
+class _AuthFalsa:
+    class credentials:
+        access_token = None
+
+    access_token_expired = False
+
+
+class FakeDriveFile(dict):
+    def __init__(self, drive: "FakeDrive", metadata: Dict):
+        super().__init__(metadata)
+        self._drive = drive
+        self._ruta: Optional[str] = None
+
+    def FetchMetadata(self, **kwargs) -> None:
+        self._drive._llamada("FetchMetadata")
+        if self["id"] not in self._drive.archivos:
+            raise FileNotFoundError(self["id"])
+        self.update(self._drive.archivos[self["id"]]["metadata"])
+
+    def SetContentFile(self, ruta: str) -> None:
+        self._ruta = ruta
+
+    def Upload(self, param=None) -> None:
+        self._drive._llamada("Upload")
+        if self["id"] not in self._drive.archivos:
+            raise FileNotFoundError(self["id"])
+        with open(self._ruta, "rb") as f:
+            self._drive.archivos[self["id"]]["contenido"] = f.read()
+
+
+class _ListaFalsa:
+    def __init__(self, drive: "FakeDrive", query: str):
+        self._drive = drive
+        self._query = query
+
+    def GetList(self) -> List[Dict]:
+        self._drive._llamada("ListFile")
+        titulo = re.search(r"title='([^']*)'", self._query).group(1)
+        padre = re.search(r"'([^']*)' in parents", self._query)
+        es_carpeta = "google-apps.folder" in self._query
+        return [
+            dict(a["metadata"]) for a in self._drive.archivos.values()
+            if a["metadata"]["title"] == titulo
+            and a["carpeta"] == es_carpeta
+            and (padre is None or a["padre"] == padre.group(1))
+        ]
+
+
+class FakeDrive:
+    def __init__(self, latencia_s: float = 0.0, llamadas: Optional[Counter] = None):
+        self.latencia_s = latencia_s
+        self.llamadas = llamadas if llamadas is not None else Counter()
+        self.auth = _AuthFalsa()
+        self.archivos: Dict[str, Dict] = {}
+
+    def _llamada(self, nombre: str) -> None:
+        self.llamadas[nombre] += 1
+        if self.latencia_s:
+            time.sleep(self.latencia_s)
+
+    def crear(self, titulo: str, padre: Optional[str] = None, carpeta: bool = False) -> str:
+        """Precarga una carpeta o archivo (sin contar llamadas). Retorna su ID."""
+        file_id = f"id{len(self.archivos)}"
+        self.archivos[file_id] = {
+            "metadata": {"id": file_id, "title": titulo},
+            "padre": padre,
+            "carpeta": carpeta,
+            "contenido": b"",
+        }
+        return file_id
+
+    # --- API compatible con pydrive2.drive.GoogleDrive ---
+    def ListFile(self, param: Dict) -> _ListaFalsa:
+        return _ListaFalsa(self, param["q"])
+
+    def CreateFile(self, metadata: Dict) -> FakeDriveFile:
+        return FakeDriveFile(self, metadata)
+
+
+# --- Endpoint de subida reanudable (protocolo resumable de Drive v3) ---
+class CorteProceso(Exception):
+    """Simula que el proceso muere a mitad de la subida (no es un error de red: no se reintenta)."""
+
+
+class _Respuesta:
+    def __init__(self, status_code: int, headers: Optional[Dict] = None, cuerpo: Optional[Dict] = None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = json.dumps(cuerpo or {})
+
+
+_RE_CONTENT_RANGE = re.compile(r"bytes (?:(\d+)-(\d+)|\*)/(\d+|\*)")
+
+
+class FakeSesionSubida:
+    """
+    Sesión estilo requests.Session que implementa el protocolo de subida reanudable sobre un FakeDrive.
+    Fallas inyectables:
+    - cortes_red: offsets (bytes) donde la conexión se corta a mitad de un PUT (llega hasta ahí).
+    - cortes_proceso: offsets donde se lanza CorteProceso (el llamador muere; el servidor conserva lo recibido).
+    - errores_503: cuántas de las próximas llamadas responden 503.
+    - retroceso: (offset, n): cuando lo recibido pasa de offset, el servidor olvida los últimos n
+      bytes y su Range retrocede por debajo de lo que ya había confirmado.
+    """
+
+    def __init__(self, drive: FakeDrive, cortes_red: Optional[List[int]] = None,
+                 cortes_proceso: Optional[List[int]] = None, errores_503: int = 0,
+                 retroceso: Optional[Tuple[int, int]] = None):
+        self.drive = drive
+        self.cortes_red = sorted(cortes_red or [])
+        self.cortes_proceso = sorted(cortes_proceso or [])
+        self.errores_503 = errores_503
+        self.retroceso = retroceso
+        self.bytes_recibidos = 0  # incluye reenvíos
+        self._sesiones: Dict[str, Dict] = {}
+
+    def _estado(self, sesion: Dict) -> _Respuesta:
+        if sesion["completa"]:
+            return _Respuesta(200, cuerpo={"id": sesion["file_id"]})
+        n = len(sesion["datos"])
+        return _Respuesta(308, {"Range": f"bytes=0-{n - 1}"} if n else {})
+
+    def request(self, method: str, url: str, headers: Optional[Dict] = None, data=None, timeout=None) -> _Respuesta:
+        self.drive._llamada(f"subida_{method}")
+        headers = headers or {}
+        if self.errores_503 > 0:
+            self.errores_503 -= 1
+            return _Respuesta(503)
+
+        if method == "PATCH":  # inicio de sesión
+            file_id = re.search(r"/files/([^?]+)", url).group(1)
+            if file_id not in self.drive.archivos:
+                return _Respuesta(404)
+            uri = f"https://fake.upload/{len(self._sesiones)}"
+            tipo = headers.get("X-Upload-Content-Type", "application/octet-stream")
+            self._sesiones[uri] = {"file_id": file_id, "datos": bytearray(), "completa": False, "tipo": tipo}
+            return _Respuesta(200, {"Location": uri})
+
+        sesion = self._sesiones.get(url)
+        if sesion is None:
+            return _Respuesta(404)
+        m = _RE_CONTENT_RANGE.fullmatch(headers.get("Content-Range", ""))
+        if m is None:
+            return _Respuesta(400)
+        data = bytes(data or b"")
+        if not data:  # consulta de estado (o cierre de una subida vacía)
+            if m.group(3) != "*" and int(m.group(3)) == len(sesion["datos"]):
+                self._completar(sesion)
+            return self._estado(sesion)
+
+        inicio, total = int(m.group(1)), m.group(3)
+        if inicio != len(sesion["datos"]):
+            return _Respuesta(400)
+        for cortes, error in ((self.cortes_red, requests.exceptions.ConnectionError), (self.cortes_proceso, CorteProceso)):
+            if cortes and inicio <= cortes[0] < inicio + len(data):
+                corte = cortes.pop(0)
+                sesion["datos"] += data[:corte - inicio]
+                self.bytes_recibidos += corte - inicio
+                raise error(f"corte simulado en el byte {corte:,}")
+        sesion["datos"] += data
+        self.bytes_recibidos += len(data)
+        if self.retroceso and len(sesion["datos"]) > self.retroceso[0]:
+            del sesion["datos"][-self.retroceso[1]:]
+            self.retroceso = None
+            return self._estado(sesion)
+        if total != "*" and int(total) == len(sesion["datos"]):
+            self._completar(sesion)
+        return self._estado(sesion)
+
+    def _completar(self, sesion: Dict) -> None:
+        sesion["completa"] = True
+        archivo = self.drive.archivos[sesion["file_id"]]
+        archivo["contenido"] = bytes(sesion["datos"])
+        archivo["metadata"]["mimeType"] = sesion["tipo"]
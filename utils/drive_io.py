@@ -1,19 +1,40 @@
 # utils/drive_io.py
+import json
 import os
-from typing import Optional
+import random
+import re
+import time
+import zlib
+from typing import Dict, Iterable, Iterator, Optional, Union
 
+import pandas as pd
+import requests
 import streamlit as st
 from pydrive2.auth import GoogleAuth
 from pydrive2.drive import GoogleDrive
 from oauth2client.service_account import ServiceAccountCredentials
 
+from utils import clientes_google
+from utils.instrumentacion import contar, cronometrado
+
 # --- Config ---
 DRIVE_SCOPES = ["https://www.googleapis.com/auth/drive"]
-DRIVE_FOLDER_NAME = st.secrets.get("GOOGLE_DRIVE_FOLDER_NAME", "LOOKER")
-DRIVE_FOLDER_ID = st.secrets.get("GOOGLE_DRIVE_FOLDER_ID", "").strip()   # opcional
-DRIVE_FILE_ID  = st.secrets.get("GOOGLE_DRIVE_FILE_ID", "").strip()      # **opcional**: si lo pones, actualizamos por ID
+# Se leen de Secrets al usarse (drive_io.DRIVE_FOLDER_NAME, ...), no al importar el módulo:
+_CONFIG = {
+    "DRIVE_FOLDER_NAME": ("GOOGLE_DRIVE_FOLDER_NAME", "LOOKER"),
+    "DRIVE_FOLDER_ID": ("GOOGLE_DRIVE_FOLDER_ID", ""),  # opcional
+    "DRIVE_FILE_ID": ("GOOGLE_DRIVE_FILE_ID", ""),      # **opcional**: si lo pones, actualizamos por ID
+}
 # Si no defines GOOGLE_DRIVE_FILE_ID, buscaremos por nombre (drive_title) dentro de la carpeta.
 
+def _config(nombre: str) -> str:
+    return clientes_google.secreto(*_CONFIG[nombre])
+
+def __getattr__(nombre: str):
+    if nombre in _CONFIG:
+        return _config(nombre)
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+
 # --- Auth ---
 def _load_credentials():
     if "gcp_service_account" not in st.secrets:
@@ -23,11 +44,24 @@ def _load_credentials():
     sa_info = dict(st.secrets["gcp_service_account"])
     return ServiceAccountCredentials.from_json_keyfile_dict(sa_info, DRIVE_SCOPES)
 
-def _drive_client() -> GoogleDrive:
+def _crear_drive() -> GoogleDrive:
     gauth = GoogleAuth()
     gauth.credentials = _load_credentials()
     return GoogleDrive(gauth)
 
+def _refrescar_token(drive: GoogleDrive) -> bool:
+    """Renueva el access token solo si expiró. Retorna True si lo renovó."""
+    if drive.auth.credentials.access_token is None or not drive.auth.access_token_expired:
+        return False  # sin emitir aún: PyDrive2 autoriza en la primera llamada
+    drive.auth.Refresh()
+    return True
+
+def _drive_client() -> GoogleDrive:
+    """Cliente Drive compartido (clientes_google): se autentica una vez por TTL_CLIENTE."""
+    return clientes_google.obtener(
+        "drive", "service_account", _crear_drive, clientes_google.TTL_CLIENTE, refrescar=_refrescar_token
+    )
+
 def _get_service_account_email() -> Optional[str]:
     try:
         return st.secrets["gcp_service_account"].get("client_email")
@@ -36,19 +70,22 @@ def _get_service_account_email() -> Optional[str]:
 
 # --- Folder lookup ---
 def _ensure_folder_id(drive: GoogleDrive) -> str:
-    if DRIVE_FOLDER_ID:
-        return DRIVE_FOLDER_ID
+    if _config("DRIVE_FOLDER_ID"):
+        return _config("DRIVE_FOLDER_ID")
+    return clientes_google.obtener("drive_carpeta", _config("DRIVE_FOLDER_NAME"), lambda: _buscar_folder_id(drive))
 
+def _buscar_folder_id(drive: GoogleDrive) -> str:
+    carpeta = _config("DRIVE_FOLDER_NAME")
     query = (
         "mimeType='application/vnd.google-apps.folder' and trashed=false "
-        f"and title='{DRIVE_FOLDER_NAME}'"
+        f"and title='{carpeta}'"
     )
     folders = drive.ListFile({'q': query}).GetList()
     if not folders:
         sa_email = _get_service_account_email()
         hint = f" y compártela con {sa_email} (Editor)" if sa_email else ""
         raise RuntimeError(
-            f"No encontré la carpeta '{DRIVE_FOLDER_NAME}'. Créala{hint}."
+            f"No encontré la carpeta '{carpeta}'. Créala{hint}."
         )
     return folders[0]["id"]
 
@@ -66,7 +103,39 @@ def _get_file_by_id(drive: GoogleDrive, file_id: str):
     except Exception:
         return None
 
+def _resolver_file_id(drive: GoogleDrive, drive_title: str) -> Optional[str]:
+    """
+    ID del archivo destino (GOOGLE_DRIVE_FILE_ID validado, o buscado por nombre en la carpeta),
+    cacheado por TTL_METADATOS: las subidas siguientes no repiten la búsqueda ni FetchMetadata.
+    """
+    file_id = _config("DRIVE_FILE_ID")
+    if file_id:
+        def _validar() -> str:
+            gfile = _get_file_by_id(drive, file_id)
+            if not gfile:
+                raise RuntimeError(
+                    "GOOGLE_DRIVE_FILE_ID no es válido o no hay permisos sobre ese archivo. "
+                    "Verifica el ID y que la Service Account tenga rol Editor."
+                )
+            return gfile["id"]
+        return clientes_google.obtener("drive_archivo", ("id", file_id), _validar)
+
+    folder_id = _ensure_folder_id(drive)
+
+    def _buscar() -> str:
+        gfile = _get_file_in_folder_by_title(drive, folder_id, drive_title)
+        if not gfile:
+            sa_email = _get_service_account_email()
+            raise RuntimeError(
+                f"No encontré el archivo '{drive_title}' dentro de la carpeta '{_config('DRIVE_FOLDER_NAME')}'. "
+                f"Como las Service Accounts no tienen cuota, debes PRE-CREAR el archivo en esa carpeta y "
+                f"compartirlo con {sa_email} (Editor), o bien define GOOGLE_DRIVE_FILE_ID en Secrets."
+            )
+        return gfile["id"]
+    return clientes_google.obtener("drive_archivo", (folder_id, drive_title), _buscar)
+
 # --- Public API ---
+@cronometrado()
 def upload_csv_to_drive(local_path: str, drive_title: str) -> str:
     """
     Actualiza un CSV existente en Drive. NO crea archivos nuevos (los SA no tienen cuota en 'Mi unidad').
@@ -77,32 +146,212 @@ def upload_csv_to_drive(local_path: str, drive_title: str) -> str:
     if not os.path.exists(local_path):
         raise FileNotFoundError(f"No existe el archivo local: {local_path}")
 
-    drive = _drive_client()
+    # Subida reanudable por trozos leyendo el archivo (ver subir_a_drive)
+    with open(local_path, "rb") as f:
+        return subir_a_drive(f, drive_title)
 
-    # 1) Si nos dan el FILE_ID por Secrets, actualizamos directo por ID.
-    if DRIVE_FILE_ID:
-        gfile = _get_file_by_id(drive, DRIVE_FILE_ID)
-        if not gfile:
-            raise RuntimeError(
-                "GOOGLE_DRIVE_FILE_ID no es válido o no hay permisos sobre ese archivo. "
-                "Verifica el ID y que la Service Account tenga rol Editor."
-            )
-        gfile.SetContentFile(local_path)
-        gfile.Upload()
-        return gfile["id"]
+# --- Subida reanudable por trozos (resumable upload de Drive v3, sin archivo temporal) ---
+UPLOAD_URL = "https://www.googleapis.com/upload/drive/v3/files/{file_id}?uploadType=resumable"
+CHUNK_BYTES = 8 * 256 * 1024          # los trozos intermedios deben ser múltiplos de 256 KiB
+SUBIDA_REINTENTOS = 5
+SUBIDA_ESPERA_INICIAL = 1.0           # segundos; se duplica en cada intento (+ jitter)
+SUBIDA_TIMEOUT = 60
+CHECKPOINT_DIR = os.path.join("cache", "subidas")
+_CODIGOS_REINTENTABLES = {408, 429, 500, 502, 503, 504}
+_RE_RANGE = re.compile(r"bytes=0-(\d+)")
 
-    # 2) Si no hay FILE_ID, buscamos por nombre dentro de la carpeta
-    folder_id = _ensure_folder_id(drive)
-    gfile = _get_file_in_folder_by_title(drive, folder_id, drive_title)
-    if not gfile:
-        sa_email = _get_service_account_email()
-        raise RuntimeError(
-            f"No encontré el archivo '{drive_title}' dentro de la carpeta '{DRIVE_FOLDER_NAME}'. "
-            f"Como las Service Accounts no tienen cuota, debes PRE-CREAR el archivo en esa carpeta y "
-            f"compartirlo con {sa_email} (Editor), o bien define GOOGLE_DRIVE_FILE_ID en Secrets."
+Fuente = Union[bytes, str, Iterable[Union[bytes, str]]]
+
+def csv_en_trozos(df: pd.DataFrame, filas_por_trozo: int = 20_000) -> Iterator[bytes]:
+    """CSV del DataFrame generado por bloques de filas (no se arma el archivo completo en memoria)."""
+    for inicio in range(0, max(len(df), 1), filas_por_trozo):
+        yield df.iloc[inicio:inicio + filas_por_trozo].to_csv(index=False, header=inicio == 0).encode("utf-8")
+
+def _trozos(fuente: Fuente, comprimir: bool) -> Iterator[bytes]:
+    if isinstance(fuente, (bytes, bytearray, str)):
+        fuente = [fuente]
+    elif hasattr(fuente, "read"):
+        fuente = iter(lambda leer=fuente.read: leer(CHUNK_BYTES), b"")
+    gz = zlib.compressobj(6, zlib.DEFLATED, 31) if comprimir else None  # wbits=31: formato gzip
+    for trozo in fuente:
+        if isinstance(trozo, str):
+            trozo = trozo.encode("utf-8")
+        if gz is not None:
+            trozo = gz.compress(trozo)
+        if trozo:
+            yield bytes(trozo)
+    if gz is not None:
+        yield gz.flush()
+
+def _ruta_checkpoint(id_subida: str) -> str:
+    return os.path.join(CHECKPOINT_DIR, f"{re.sub(r'[^A-Za-z0-9_.-]', '_', id_subida)}.json")
+
+def _guardar_checkpoint(id_subida: Optional[str], estado: Dict) -> None:
+    if not id_subida:
+        return
+    os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+    ruta = _ruta_checkpoint(id_subida)
+    with open(f"{ruta}.tmp", "w", encoding="utf-8") as f:
+        json.dump(estado, f)
+    os.replace(f"{ruta}.tmp", ruta)
+
+def _leer_checkpoint(id_subida: Optional[str]) -> Optional[Dict]:
+    if not id_subida or not os.path.exists(_ruta_checkpoint(id_subida)):
+        return None
+    with open(_ruta_checkpoint(id_subida), encoding="utf-8") as f:
+        return json.load(f)
+
+def _borrar_checkpoint(id_subida: Optional[str]) -> None:
+    if id_subida and os.path.exists(_ruta_checkpoint(id_subida)):
+        os.remove(_ruta_checkpoint(id_subida))
+
+class _SesionDrive(requests.Session):
+    """
+    Sesión HTTP firmada con el token de la Service Account. El token se lee en cada petición
+    (get_access_token lo renueva si expiró: una subida larga dura más que su hora de vida) y,
+    si Drive igual responde 401 (token revocado, reloj desfasado), se fuerza la renovación y
+    la petición se repite una vez.
+    """
+
+    def __init__(self, drive: GoogleDrive):
+        super().__init__()
+        self._drive = drive
+
+    def request(self, method, url, headers=None, **kwargs):
+        for intento in range(2):
+            token = self._drive.auth.credentials.get_access_token().access_token
+            respuesta = super().request(method, url, headers={**(headers or {}), "Authorization": f"Bearer {token}"}, **kwargs)
+            if respuesta.status_code != 401 or intento:
+                return respuesta
+            contar("drive_token_renovado")
+            self._drive.auth.Refresh()
+
+def _sesion_autenticada(drive: GoogleDrive) -> requests.Session:
+    return _SesionDrive(drive)
+
+def _confirmados(respuesta) -> int:
+    """Bytes que el servidor ya tiene (cabecera Range de una respuesta 308)."""
+    m = _RE_RANGE.search(respuesta.headers.get("Range", ""))
+    return int(m.group(1)) + 1 if m else 0
+
+def _con_reintentos(fn, *args, **kwargs):
+    """Llama fn reintentando ante cortes de red y códigos transitorios, con backoff exponencial."""
+    espera = SUBIDA_ESPERA_INICIAL
+    for intento in range(SUBIDA_REINTENTOS):
+        contar("drive_llamadas")
+        try:
+            respuesta = fn(*args, **kwargs)
+            if respuesta.status_code not in _CODIGOS_REINTENTABLES:
+                return respuesta
+            error: Exception = RuntimeError(f"Drive respondió {respuesta.status_code}")
+        except requests.exceptions.RequestException as e:
+            error = e
+        if intento == SUBIDA_REINTENTOS - 1:
+            raise error
+        contar("drive_reintentos")
+        time.sleep(espera + random.uniform(0, espera / 2))
+        espera *= 2
+
+@cronometrado()
+def subir_a_drive(
+    fuente: Fuente,
+    drive_title: str,
+    comprimir: bool = False,
+    mime: str = "text/csv",
+    chunk_bytes: int = CHUNK_BYTES,
+    id_subida: Optional[str] = None,
+    sesion=None,
+) -> str:
+    """
+    Actualiza el contenido de un archivo existente en Drive con una subida reanudable por trozos.
+    - fuente: bytes/str, un buffer con .read(), o un iterable/generador de trozos (p.ej. csv_en_trozos).
+      Solo se mantiene en memoria el trozo que aún no confirma el servidor.
+    - comprimir: gzip en streaming (el archivo queda como application/gzip).
+    - id_subida: si se indica, el avance se guarda en CHECKPOINT_DIR; si el proceso se corta, otra
+      llamada con el mismo id_subida (y la misma fuente) retoma desde el último byte confirmado.
+    - sesion: objeto estilo requests.Session (por defecto, autenticado con la Service Account).
+    Cada trozo se reintenta con backoff; tras un corte se consulta al servidor cuánto recibió y
+    se reenvía solo lo que falta. Return: file_id actualizado.
+    """
+    if chunk_bytes % (256 * 1024):
+        raise ValueError("chunk_bytes debe ser múltiplo de 256 KiB.")
+    drive = _drive_client()
+    file_id = _resolver_file_id(drive, drive_title)
+    sesion = sesion or _sesion_autenticada(drive)
+    tipo = "application/gzip" if comprimir else mime
+
+    # 1) Sesión de subida: nueva, o la del checkpoint si sigue viva
+    checkpoint = _leer_checkpoint(id_subida)
+    uri, enviados = None, 0
+    if checkpoint and checkpoint.get("file_id") == file_id:
+        estado = _con_reintentos(sesion.request, "PUT", checkpoint["uri"], headers={"Content-Range": "bytes */*"}, timeout=SUBIDA_TIMEOUT)
+        if estado.status_code == 308:
+            uri, enviados = checkpoint["uri"], _confirmados(estado)
+    if uri is None:
+        inicio = _con_reintentos(
+            sesion.request, "PATCH", UPLOAD_URL.format(file_id=file_id),
+            headers={"X-Upload-Content-Type": tipo, "Content-Type": "application/json; charset=UTF-8"},
+            data=json.dumps({"mimeType": tipo}), timeout=SUBIDA_TIMEOUT,
         )
+        if inicio.status_code in (403, 404):
+            # El archivo pudo borrarse o perder permisos: la próxima subida vuelve a resolverlo
+            clientes_google.invalidar("drive_archivo")
+            clientes_google.invalidar("drive_carpeta")
+        if inicio.status_code != 200:
+            raise RuntimeError(f"Drive rechazó la subida ({inicio.status_code}): {inicio.text[:200]}")
+        uri = inicio.headers["Location"]
+    _guardar_checkpoint(id_subida, {"uri": uri, "file_id": file_id, "enviados": enviados})
+
+    # 2) Trozos: el buffer empieza en el byte `enviados` (lo ya confirmado se descarta de la fuente)
+    trozos = _trozos(fuente, comprimir)
+    buffer, saltar, agotada, sin_avance = bytearray(), enviados, False, 0
+    while True:
+        while not agotada and len(buffer) < chunk_bytes:
+            trozo = next(trozos, None)
+            if trozo is None:
+                agotada = True
+            elif saltar:
+                descartar = min(saltar, len(trozo))
+                buffer += trozo[descartar:]
+                saltar -= descartar
+            else:
+                buffer += trozo
+        if saltar:
+            raise RuntimeError("La fuente es más corta que lo ya subido: no corresponde al checkpoint.")
+
+        cuerpo = bytes(buffer if agotada else buffer[:chunk_bytes])
+        total = str(enviados + len(cuerpo)) if agotada else "*"
+        rango = f"bytes {enviados}-{enviados + len(cuerpo) - 1}/{total}" if cuerpo else f"bytes */{total}"
+        try:
+            respuesta = sesion.request("PUT", uri, headers={"Content-Range": rango}, data=cuerpo, timeout=SUBIDA_TIMEOUT)
+            fallo = respuesta.status_code in _CODIGOS_REINTENTABLES
+        except requests.exceptions.RequestException:
+            fallo = True
+        if fallo:
+            # Corte a mitad del trozo: no se reenvía a ciegas, se pregunta cuánto llegó y se sigue desde ahí
+            time.sleep(SUBIDA_ESPERA_INICIAL * 2 ** sin_avance * random.uniform(1, 1.5))
+            respuesta = _con_reintentos(
+                sesion.request, "PUT", uri, headers={"Content-Range": f"bytes */{total}"}, timeout=SUBIDA_TIMEOUT
+            )
 
-    # Actualizar contenido
-    gfile.SetContentFile(local_path)
-    gfile.Upload()
-    return gfile["id"]
+        if respuesta.status_code in (200, 201):
+            _borrar_checkpoint(id_subida)
+            return file_id
+        if respuesta.status_code != 308:
+            _borrar_checkpoint(id_subida)
+            raise RuntimeError(f"La subida a Drive falló ({respuesta.status_code}): {respuesta.text[:200]}")
+        confirmados = _confirmados(respuesta)
+        if confirmados < enviados:
+            # El servidor perdió bytes que ya había confirmado y que el buffer ya descartó: no se pueden
+            # reenviar desde aquí. El checkpoint se conserva; una nueva llamada con el mismo id_subida
+            # (y la fuente desde el comienzo) retoma desde lo que el servidor sí tiene.
+            raise RuntimeError(
+                f"Drive retrocedió lo confirmado ({enviados:,} → {confirmados:,} bytes): vuelve a intentar la subida."
+            )
+        sin_avance = 0 if confirmados > enviados else sin_avance + 1
+        if sin_avance >= SUBIDA_REINTENTOS:
+            # El checkpoint se conserva: una nueva llamada con el mismo id_subida retoma desde aquí
+            raise RuntimeError(f"La subida a Drive no avanza (confirmados {enviados:,} bytes).")
+        del buffer[:confirmados - enviados]
+        enviados = confirmados
+        _guardar_checkpoint(id_subida, {"uri": uri, "file_id": file_id, "enviados": enviados})
@@ -0,0 +1,172 @@
+# utils/exportacion.py
+"""
+Exportaciones en segundo plano a Google Sheets y Drive.
+
+Un hilo dedicado corre un event loop de asyncio. Cada exportación encolada crea un
+trabajo por destino (Sheets y/o Drive) y ambos corren a la vez (asyncio.to_thread sobre
+las funciones bloqueantes de sheets_io/drive_io); las escrituras a un mismo destino se
+serializan con un lock por destino. La UI consulta el estado con listar_trabajos(ids),
+filtrando por los IDs que encoló cada sesión (los trabajos son del proceso).
+sheets_io y drive_io (gspread, PyDrive2, oauth2client) se importan en la primera exportación.
+"""
+import asyncio
+import hashlib
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+ESTADOS_TERMINALES = ("listo", "fallido")  # además: "pendiente", "en_curso"
+MAX_TRABAJOS_GUARDADOS = 50
+
+_trabajos: Dict[str, Dict] = {}
+_lock = threading.Lock()
+_bucle: Optional[asyncio.AbstractEventLoop] = None
+_locks_destino: Dict[str, asyncio.Lock] = {}  # solo se usa dentro del hilo del event loop
+
+
+# --- Exportadores (bloqueantes; se pueden reemplazar por fakes) ---
+def exportar_sheet(df: pd.DataFrame, spreadsheet_id: Optional[str], worksheet_title: str, modo: str) -> str:
+    """Escribe en la worksheet (modo "delta" o "reescribir"). Retorna un detalle legible."""
+    from utils.sheets_io import sync_sheet_with_dataframe, update_sheet_with_dataframe
+
+    if modo == "delta":
+        url, cambios = sync_sheet_with_dataframe(df, spreadsheet_id, worksheet_title)
+        return (
+            f"{cambios['insertadas']} nuevas · {cambios['actualizadas']} actualizadas · "
+            f"{cambios['borradas']} borradas — {url}"
+        )
+    return update_sheet_with_dataframe(df, spreadsheet_id, worksheet_title, include_index=False)
+
+
+def exportar_drive(df: pd.DataFrame, drive_title: str) -> str:
+    """
+    Sube el DataFrame como CSV al archivo de Drive, generado por trozos y con subida reanudable
+    (ver subir_a_drive). Si una exportación del mismo contenido quedó a medias, la retoma.
+    Retorna el file_id.
+    """
+    from utils.drive_io import csv_en_trozos, subir_a_drive
+
+    huella = hashlib.sha256(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()).hexdigest()[:16]
+    return subir_a_drive(csv_en_trozos(df), drive_title, id_subida=f"{drive_title}-{huella}")
+
+
+# --- Event loop en segundo plano ---
+def _obtener_bucle() -> asyncio.AbstractEventLoop:
+    global _bucle
+    with _lock:
+        if _bucle is None:
+            bucle = asyncio.new_event_loop()
+            threading.Thread(target=bucle.run_forever, name="exportacion", daemon=True).start()
+            _bucle = bucle
+        return _bucle
+
+
+def _nuevo_trabajo(destino: str, descripcion: str) -> Dict:
+    trabajo = {
+        "id": uuid.uuid4().hex[:8],
+        "destino": destino,
+        "descripcion": descripcion,
+        "estado": "pendiente",
+        "creado": time.time(),
+        "inicio": None,
+        "fin": None,
+        "espera_s": None,
+        "duracion_s": None,
+        "resultado": None,
+        "error": None,
+    }
+    with _lock:
+        _trabajos[trabajo["id"]] = trabajo
+        terminados = [k for k, t in _trabajos.items() if t["estado"] in ESTADOS_TERMINALES]
+        for k in terminados[:max(0, len(_trabajos) - MAX_TRABAJOS_GUARDADOS)]:
+            del _trabajos[k]
+    return trabajo
+
+
+def _actualizar(trabajo: Dict, **cambios) -> None:
+    with _lock:
+        trabajo.update(cambios)
+
+
+async def _correr(trabajo: Dict, clave_destino: str, fn: Callable, *args) -> None:
+    lock = _locks_destino.setdefault(clave_destino, asyncio.Lock())
+    async with lock:
+        inicio = time.time()
+        _actualizar(trabajo, estado="en_curso", inicio=inicio, espera_s=inicio - trabajo["creado"])
+        t0 = time.perf_counter()
+        try:
+            resultado = await asyncio.to_thread(fn, *args)
+        except Exception as e:
+            _actualizar(trabajo, estado="fallido", error=str(e), fin=time.time(), duracion_s=time.perf_counter() - t0)
+        else:
+            _actualizar(trabajo, estado="listo", resultado=resultado, fin=time.time(), duracion_s=time.perf_counter() - t0)
+
+
+async def _en_paralelo(corrutinas: List) -> None:
+    await asyncio.gather(*corrutinas)
+
+
+# --- API pública ---
+def encolar_exportacion(
+    df: pd.DataFrame,
+    spreadsheet_id: Optional[str] = None,
+    worksheet_title: Optional[str] = "cartola",
+    modo: str = "delta",
+    drive_title: Optional[str] = None,
+    exportador_sheet: Callable = exportar_sheet,
+    exportador_drive: Callable = exportar_drive,
+) -> List[str]:
+    """
+    Encola la exportación y retorna de inmediato los IDs de los trabajos creados.
+    - worksheet_title=None omite Sheets; drive_title=None omite Drive.
+    - Se exporta una copia del DataFrame tomada al encolar.
+    """
+    if df is None or df.empty:
+        raise ValueError("El DataFrame está vacío; nada que exportar.")
+    df = df.copy()
+    corrutinas, ids = [], []
+    if worksheet_title:
+        trabajo = _nuevo_trabajo("Sheets", f"{worksheet_title} ({modo})")
+        clave = f"sheets:{spreadsheet_id or ''}:{worksheet_title}"
+        corrutinas.append(_correr(trabajo, clave, exportador_sheet, df, spreadsheet_id, worksheet_title, modo))
+        ids.append(trabajo["id"])
+    if drive_title:
+        trabajo = _nuevo_trabajo("Drive", drive_title)
+        corrutinas.append(_correr(trabajo, "drive", exportador_drive, df, drive_title))  # PyDrive2 no es thread-safe
+        ids.append(trabajo["id"])
+    if corrutinas:
+        asyncio.run_coroutine_threadsafe(_en_paralelo(corrutinas), _obtener_bucle())
+    return ids
+
+
+def listar_trabajos(ids: Optional[Iterable[str]] = None) -> List[Dict]:
+    """
+    Copia del estado de los trabajos, del más reciente al más antiguo.
+    ids: solo esos trabajos (p. ej. los encolados por una sesión); None = todos los del proceso.
+    """
+    with _lock:
+        trabajos = reversed(_trabajos.values())
+        if ids is not None:
+            ids = set(ids)
+            trabajos = (t for t in trabajos if t["id"] in ids)
+        return [dict(t) for t in trabajos]
+
+
+def hay_trabajos_activos(ids: Optional[Iterable[str]] = None) -> bool:
+    return any(t["estado"] not in ESTADOS_TERMINALES for t in listar_trabajos(ids))
+
+
+def esperar(ids: Iterable[str], timeout: Optional[float] = None, intervalo: float = 0.02) -> bool:
+    """Espera a que los trabajos terminen (para scripts y benchmarks). Retorna False si vence el timeout."""
+    ids = list(ids)
+    limite = None if timeout is None else time.monotonic() + timeout
+    while True:
+        with _lock:
+            if all(_trabajos[i]["estado"] in ESTADOS_TERMINALES for i in ids if i in _trabajos):
+                return True
+        if limite is not None and time.monotonic() > limite:
+            return False
+        time.sleep(intervalo)
@@ -0,0 +1,79 @@
+# utils/graficos.py
+"""
+Gráficos del dashboard como especificaciones serializables:
+Altair → dict Vega-Lite (st.vega_lite_chart) y Plotly → dict (st.plotly_chart).
+Al ser dicts se pueden cachear (cache_app) sin reconstruir los objetos en cada rerun.
+Los datos llegan ya reducidos (utils.datos_graficos): el tamaño de cada especificación no
+crece con el histórico.
+Altair y Plotly se importan al construir el primer gráfico (no al cargar el app).
+"""
+from typing import Dict
+
+import pandas as pd
+
+from utils.instrumentacion import cronometrado
+
+
+@cronometrado()
+def barras_por_categoria(df_agrupado: pd.DataFrame) -> Dict:
+    import altair as alt
+
+    chart = alt.Chart(df_agrupado).mark_bar().encode(
+        x=alt.X("Categoría:N", sort='-y'),
+        y=alt.Y("Monto:Q", scale=alt.Scale(domain=[0, df_agrupado["Monto"].max() * 1.1])),
+        color="Categoría:N",
+        tooltip=[alt.Tooltip("Categoría", title="Categoría"),
+                 alt.Tooltip("Monto", title="Monto", format=",.0f")]
+    ).properties(width=600, height=400)
+    return chart.to_dict()
+
+
+@cronometrado()
+def torta_por_categoria(df_agrupado: pd.DataFrame) -> Dict:
+    import plotly.express as px
+
+    fig_pie = px.pie(
+        df_agrupado,
+        names="Categoría",
+        values="Monto",
+        title="🧻 Distribución por categoría",
+        hole=0.4
+    )
+    fig_pie.update_traces(
+        textinfo='percent+label',
+        pull=[0.05]*len(df_agrupado),
+        hovertemplate="%{label}<br>$ %{value:,.0f}<extra></extra>"
+    )
+    fig_pie.update_layout(showlegend=True, height=500)
+    return fig_pie.to_dict()
+
+
+@cronometrado()
+def barras_gasto_neto(df_gasto_neto: pd.DataFrame) -> Dict:
+    import altair as alt
+
+    grafico = alt.Chart(df_gasto_neto).mark_bar().encode(
+        x=alt.X("Periodo:N", sort=None),
+        y=alt.Y("Gasto Neto:Q", title="Gasto Neto"),
+        tooltip=[alt.Tooltip("Periodo", title="Periodo"),
+                 alt.Tooltip("Gasto Neto", format=",.0f")]
+    ).properties(width=800, height=400)
+    return grafico.to_dict()
+
+
+@cronometrado()
+def lineas_temporales(df_serie: pd.DataFrame, granularidad: str) -> Dict:
+    """Gastos, abonos y gasto neto en el tiempo; las tres series salen de las mismas filas (fold)."""
+    import altair as alt
+
+    grafico = alt.Chart(df_serie).transform_fold(
+        ["Gastos", "Abonos", "Gasto Neto"], as_=["Serie", "Monto"]
+    ).mark_line(point=len(df_serie) <= 60).encode(
+        x=alt.X("Fecha:T", title=granularidad),
+        y=alt.Y("Monto:Q", title="Monto"),
+        color=alt.Color("Serie:N", sort=["Gastos", "Abonos", "Gasto Neto"]),
+        tooltip=[alt.Tooltip("Fecha:T", title="Desde"),
+                 alt.Tooltip("Serie:N"),
+                 alt.Tooltip("Monto:Q", format=",.0f")]
+    ).properties(width=800, height=350)
+    return grafico.to_dict()
@@ -0,0 +1,219 @@
+# utils/historico.py
+import os
+import re
+import shutil
+import threading
+import time
+from typing import Iterable, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from utils.instrumentacion import contar, cronometrado
+
+# Almacenamiento histórico: un dataset Parquet particionado por Periodo (hive: Periodo=YYYY-MM-DD/).
+HIST_DIR = "historico"
+DATASET_DIR = os.path.join(HIST_DIR, "movimientos")
+CSV_MIGRADOS_DIR = os.path.join(HIST_DIR, "csv_migrados")
+ARCHIVO_PARTICION = "cartola.parquet"
+
+COLUMNAS = ["Fecha", "Descripción", "Monto", "Categoría", "Periodo"]
+_PARTICIONADO = ds.partitioning(pa.schema([("Periodo", pa.string())]), flavor="hive")
+_RE_CSV = re.compile(r"^cartola_(\d{4}-\d{2}-\d{2})\.csv$")
+
+class _Escritura:
+    """
+    Lock reentrante de escritura del histórico, entre hilos y entre procesos (la app, los workers
+    de su servicio de cargas y el CLI de ingesta escriben en las mismas particiones, huellas.npy y
+    comercios.json). La primera entrada del hilo toma un lock exclusivo sobre .lock, junto al
+    dataset; las entradas anidadas solo cuentan.
+    """
+
+    def __init__(self):
+        self._rlock = threading.RLock()
+        self._nivel = 0
+        self._fd: Optional[int] = None
+
+    def _ruta(self) -> str:
+        return os.path.join(os.path.dirname(DATASET_DIR) or ".", ".lock")
+
+    def __enter__(self) -> "_Escritura":
+        self._rlock.acquire()
+        if self._nivel == 0:
+            try:
+                os.makedirs(os.path.dirname(self._ruta()), exist_ok=True)
+                fd = os.open(self._ruta(), os.O_RDWR | os.O_CREAT, 0o600)
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                else:
+                    while True:
+                        try:
+                            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                            break
+                        except OSError:
+                            time.sleep(0.05)
+            except BaseException:
+                self._rlock.release()
+                raise
+            self._fd = fd
+        self._nivel += 1
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._nivel -= 1
+        if self._nivel == 0:
+            fd, self._fd = self._fd, None
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+            os.close(fd)
+        self._rlock.release()
+
+
+# Un solo escritor a la vez (servicio de cargas, correcciones del usuario, CLI de ingesta): quien
+# fusiona o reclasifica cartolas, comercios y huellas lo toma alrededor de todo el paso.
+escritura = _Escritura()
+
+
+def _dir_periodo(periodo: str) -> str:
+    return os.path.join(DATASET_DIR, f"Periodo={periodo}")
+
+
+def _tipar(df: pd.DataFrame) -> pd.DataFrame:
+    """Columnas tipadas: Fecha datetime64, Monto int64 (pesos), Categoría categórica."""
+    out = df[["Fecha", "Descripción", "Monto", "Categoría"]].copy()
+    out["Fecha"] = pd.to_datetime(out["Fecha"], errors="coerce").astype("datetime64[ns]")
+    out["Descripción"] = out["Descripción"].astype(str)
+    out["Monto"] = pd.to_numeric(out["Monto"]).round().astype("int64")
+    out["Categoría"] = out["Categoría"].astype("category")
+    return out
+
+
+def _vacio(columnas: Optional[List[str]] = None) -> pd.DataFrame:
+    df = pd.DataFrame({
+        "Fecha": pd.Series(dtype="datetime64[ns]"),
+        "Descripción": pd.Series(dtype=str),
+        "Monto": pd.Series(dtype="int64"),
+        "Categoría": pd.Series(dtype="category"),
+        "Periodo": pd.Series(dtype="category"),
+    })
+    return df[columnas] if columnas else df
+
+
+def listar_periodos() -> List[str]:
+    """Periodos guardados (uno por cartola), del más reciente al más antiguo."""
+    if not os.path.isdir(DATASET_DIR):
+        return []
+    periodos = [
+        nombre.split("=", 1)[1]
+        for nombre in os.listdir(DATASET_DIR)
+        if nombre.startswith("Periodo=") and os.path.exists(os.path.join(DATASET_DIR, nombre, ARCHIVO_PARTICION))
+    ]
+    return sorted(periodos, reverse=True)
+
+
+def existe_periodo(periodo: str) -> bool:
+    return os.path.exists(os.path.join(_dir_periodo(periodo), ARCHIVO_PARTICION))
+
+
+@cronometrado()
+def guardar_periodo(df: pd.DataFrame, periodo: str) -> str:
+    """
+    Escribe (o reemplaza) la partición de un periodo. Retorna la ruta del archivo.
+    La columna Periodo no se guarda dentro del archivo: la aporta la partición.
+    """
+    carpeta = _dir_periodo(periodo)
+    ruta = os.path.join(carpeta, ARCHIVO_PARTICION)
+    with escritura:
+        os.makedirs(carpeta, exist_ok=True)
+        tmp = f"{ruta}.tmp"
+        _tipar(df).to_parquet(tmp, index=False)
+        os.replace(tmp, ruta)
+    return ruta
+
+
+@cronometrado()
+def borrar_periodos(periodos: Iterable[str]) -> int:
+    """Elimina las particiones indicadas. Retorna cuántas se borraron."""
+    borrados = 0
+    with escritura:
+        for periodo in periodos:
+            carpeta = _dir_periodo(periodo)
+            if os.path.isdir(carpeta):
+                shutil.rmtree(carpeta)
+                borrados += 1
+    return borrados
+
+
+@cronometrado()
+def cargar_historico(
+    columnas: Optional[List[str]] = None,
+    periodos: Optional[Iterable[str]] = None,
+    diccionario: bool = False,
+) -> pd.DataFrame:
+    """
+    Lee el histórico tipado.
+    - columnas: proyección (solo se leen esas columnas del Parquet).
+    - periodos: poda de particiones (solo se abren esos periodos).
+    - diccionario: Descripción como categórica (codificada por diccionario en Arrow, sin crear
+      un string de Python por fila).
+    """
+    disponibles = listar_periodos()
+    if periodos is not None:
+        disponibles = [p for p in disponibles if p in set(periodos)]
+    if not disponibles:
+        return _vacio(columnas)
+
+    dataset = ds.dataset(
+        [os.path.join(_dir_periodo(p), ARCHIVO_PARTICION) for p in sorted(disponibles)],
+        format="parquet",
+        partitioning=_PARTICIONADO,
+        partition_base_dir=DATASET_DIR,
+    )
+    tabla = dataset.to_table(columns=columnas or COLUMNAS)
+    contar("filas_historico_leidas", tabla.num_rows)
+    if diccionario and "Descripción" in tabla.column_names:
+        i = tabla.column_names.index("Descripción")
+        tabla = tabla.set_column(i, "Descripción", pc.dictionary_encode(tabla.column(i)))
+    df = tabla.to_pandas()
+    if "Periodo" in df.columns:
+        df["Periodo"] = df["Periodo"].astype("category")
+    return df
+
+
+def migrar_csv(hist_dir: str = HIST_DIR) -> List[str]:
+    """
+    Migración única: convierte cada historico/cartola_{periodo}.csv en su partición Parquet
+    y mueve el CSV a historico/csv_migrados/. Retorna los periodos migrados.
+    """
+    if not os.path.isdir(hist_dir):
+        return []
+    migrados = []
+    for nombre in sorted(os.listdir(hist_dir)):
+        m = _RE_CSV.match(nombre)
+        if not m:
+            continue
+        periodo = m.group(1)
+        ruta_csv = os.path.join(hist_dir, nombre)
+        if not existe_periodo(periodo):
+            df = pd.read_csv(ruta_csv)
+            df = df[pd.to_datetime(df["Fecha"], errors="coerce").notna()]
+            guardar_periodo(df, periodo)
+            migrados.append(periodo)
+        os.makedirs(CSV_MIGRADOS_DIR, exist_ok=True)
+        shutil.move(ruta_csv, os.path.join(CSV_MIGRADOS_DIR, nombre))
+    return migrados
+
+
+if __name__ == "__main__":
+    periodos_migrados = migrar_csv()
+    print(f"✅ {len(periodos_migrados)} cartola(s) migrada(s) a {DATASET_DIR}: {', '.join(periodos_migrados) or '-'}")
@@ -0,0 +1,274 @@
+# utils/historico_sql.py
+"""
+Backend SQL embebido (SQLite: un archivo local, sin servidor) para la vista histórica.
+
+Con CARTOLA_BACKEND=sqlite el dashboard no carga el histórico en memoria: filtros, KPIs, gasto
+por categoría, gasto neto por periodo y la página visible de la tabla se resuelven con consultas
+sobre historico/movimientos.sqlite, y el proceso solo recibe los resultados.
+
+- movimientos es una tabla WITHOUT ROWID ordenada por (periodo, categoria, fecha): filtrar por
+  periodo y categorías es un rango contiguo de la clave primaria. Un índice (periodo, fecha)
+  sirve la tabla paginada (más reciente primero).
+- resumen guarda el agregado periodo × categoría × día de cada cartola: filtros, KPIs, gasto
+  por categoría, gasto neto, series diarias y conteos se calculan sobre él, sin recorrer los
+  movimientos.
+- Las descripciones van en un diccionario (descripciones) y en cada fila solo su id.
+- sincronizar() la mantiene al día con las particiones Parquet (la fuente de verdad): inserta,
+  reemplaza o borra solo las cartolas cuyo mtime cambió, como sincronizar_agregados.
+- Mismos filtros globales que la vista pandas: sin fecha y "Revisar" no entran.
+"""
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils import historico
+from utils.instrumentacion import contar, cronometrado
+from utils.movimientos import compactar
+from utils.periodos import etiquetar_periodos
+
+RUTA_DB = os.path.join(historico.HIST_DIR, "movimientos.sqlite")
+ESQUEMA_VERSION = 2  # súbela si cambia el esquema (la base se reconstruye)
+TAMANO_PAGINA = 100
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS cartolas (
+    id INTEGER PRIMARY KEY,
+    nombre TEXT NOT NULL UNIQUE,      -- Periodo=… de la partición en historico/
+    version INTEGER NOT NULL          -- mtime_ns de la partición al sincronizar
+);
+CREATE TABLE IF NOT EXISTS descripciones (
+    id INTEGER PRIMARY KEY,
+    texto TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS movimientos (
+    periodo INTEGER NOT NULL,         -- clave YYYYMM del periodo 25 a 25 que contiene la fecha
+    categoria TEXT NOT NULL,
+    fecha INTEGER NOT NULL,           -- ns desde 1970
+    cartola INTEGER NOT NULL,
+    fila INTEGER NOT NULL,
+    descripcion INTEGER NOT NULL,
+    monto INTEGER NOT NULL,
+    PRIMARY KEY (periodo, categoria, fecha, cartola, fila)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS movimientos_periodo_fecha ON movimientos (periodo, fecha);
+CREATE TABLE IF NOT EXISTS resumen (  -- agregado periodo × categoría × día por cartola (como utils.agregados)
+    periodo INTEGER NOT NULL,
+    categoria TEXT NOT NULL,
+    dia INTEGER NOT NULL,             -- ns desde 1970 del día (00:00)
+    cartola INTEGER NOT NULL,
+    gastos INTEGER NOT NULL,
+    abonos INTEGER NOT NULL,
+    n_gastos INTEGER NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (periodo, categoria, dia, cartola)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS resumen_cartola ON resumen (cartola);
+"""
+
+_lock = threading.Lock()
+
+
+def _conectar() -> sqlite3.Connection:
+    directorio = os.path.dirname(RUTA_DB)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    con = sqlite3.connect(RUTA_DB, check_same_thread=False)
+    con.execute("PRAGMA journal_mode=WAL")  # lecturas de otras sesiones no esperan a la sincronización
+    con.execute("PRAGMA synchronous=NORMAL")
+    con.execute("PRAGMA cache_size=-65536")  # 64 MiB de páginas por conexión
+    if con.execute("PRAGMA user_version").fetchone()[0] != ESQUEMA_VERSION:
+        con.executescript(
+            "DROP TABLE IF EXISTS resumen; DROP TABLE IF EXISTS movimientos; "
+            "DROP TABLE IF EXISTS descripciones; DROP TABLE IF EXISTS cartolas;"
+        )
+        con.executescript(_ESQUEMA)
+        con.execute(f"PRAGMA user_version={ESQUEMA_VERSION}")
+    return con
+
+
+def _version(periodo: str) -> int:
+    return os.stat(os.path.join(historico.DATASET_DIR, f"Periodo={periodo}", historico.ARCHIVO_PARTICION)).st_mtime_ns
+
+
+def _insertar_cartola(con: sqlite3.Connection, id_cartola: int, nombre: str) -> int:
+    df = compactar(historico.cargar_historico(
+        columnas=["Fecha", "Descripción", "Monto", "Categoría"], periodos=[nombre], diccionario=True,
+    ))
+    if df.empty:
+        return 0
+    textos = df["Descripción"].cat.categories.astype(str).tolist()
+    con.executemany("INSERT OR IGNORE INTO descripciones (texto) VALUES (?)", ((t,) for t in textos))
+    ids = {}
+    for i in range(0, len(textos), 500):  # límite de parámetros por consulta
+        parte = textos[i:i + 500]
+        ids.update(con.execute(
+            f"SELECT texto, id FROM descripciones WHERE texto IN ({','.join('?' * len(parte))})", parte,
+        ).fetchall())
+    id_descripcion = np.array([ids[t] for t in textos], dtype=np.int64)[df["Descripción"].cat.codes.to_numpy()]
+    df = df.assign(Descripción=id_descripcion, Fila=np.arange(len(df)))
+    df = df.sort_values(["Clave_periodo", "Categoría", "Fecha"], kind="stable")  # inserción en orden de la clave
+
+    filas = zip(
+        df["Clave_periodo"].tolist(),
+        df["Categoría"].astype(str).tolist(),
+        df["Fecha"].to_numpy(dtype="datetime64[ns]").view("int64").tolist(),
+        [id_cartola] * len(df),
+        df["Fila"].tolist(),
+        df["Descripción"].tolist(),
+        df["Monto"].tolist(),
+    )
+    con.executemany("INSERT INTO movimientos VALUES (?, ?, ?, ?, ?, ?, ?)", filas)
+    monto = df["Monto"]
+    resumen = pd.DataFrame({
+        "periodo": df["Clave_periodo"], "categoria": df["Categoría"].astype(str),
+        "dia": df["Fecha"].dt.normalize().to_numpy(dtype="datetime64[ns]").view("int64"), "cartola": id_cartola,
+        "gastos": monto.clip(lower=0), "abonos": monto.clip(upper=0), "n_gastos": (monto > 0).astype("int64"), "n": 1,
+    }).groupby(["periodo", "categoria", "dia", "cartola"], as_index=False).sum()
+    con.executemany("INSERT INTO resumen VALUES (?, ?, ?, ?, ?, ?, ?, ?)", resumen.astype(object).itertuples(index=False, name=None))
+    return len(df)
+
+
+def _borrar_cartola(con: sqlite3.Connection, id_cartola: int) -> None:
+    # sus filas están en los rangos (periodo, categoría) que registra su resumen: seeks por la clave primaria
+    con.execute("""
+        DELETE FROM movimientos
+        WHERE (periodo, categoria) IN (SELECT periodo, categoria FROM resumen WHERE cartola = ?) AND cartola = ?
+    """, (id_cartola, id_cartola))
+    con.execute("DELETE FROM resumen WHERE cartola = ?", (id_cartola,))
+    con.execute("DELETE FROM cartolas WHERE id = ?", (id_cartola,))
+
+
+@cronometrado()
+def sincronizar() -> Tuple[int, int]:
+    """
+    Deja la base igual a las particiones guardadas: (re)carga las cartolas nuevas o modificadas
+    y borra las eliminadas. Retorna (cartolas cargadas, cartolas borradas).
+    """
+    guardadas = {p: _version(p) for p in historico.listar_periodos()}
+    with _lock, closing(_conectar()) as con:
+        registradas = {nombre: (id_, version) for id_, nombre, version in con.execute("SELECT id, nombre, version FROM cartolas")}
+        cambiadas = [p for p, v in guardadas.items() if registradas.get(p, (None, None))[1] != v]
+        borradas = [p for p in registradas if p not in guardadas]
+        if not cambiadas and not borradas:
+            return 0, 0
+
+        with con:  # una transacción: otra sesión nunca ve una cartola a medias
+            for nombre in borradas + cambiadas:
+                if nombre in registradas:
+                    _borrar_cartola(con, registradas[nombre][0])
+            for nombre in sorted(cambiadas):
+                id_cartola = con.execute(
+                    "INSERT INTO cartolas (nombre, version) VALUES (?, ?)", (nombre, guardadas[nombre]),
+                ).lastrowid
+                contar("filas_sql_insertadas", _insertar_cartola(con, id_cartola, nombre))
+        return len(cambiadas), len(borradas)
+
+
+def _filtro(clave_periodo: Optional[int], categorias: Optional[Iterable[str]], alias: str = "") -> Tuple[str, List]:
+    """WHERE y parámetros para periodo (None = todos) y categorías (None = todas)."""
+    condiciones, parametros = [], []
+    if clave_periodo is not None:
+        condiciones.append(f"{alias}periodo = ?")
+        parametros.append(int(clave_periodo))
+    if categorias is not None:
+        categorias = list(categorias)
+        condiciones.append(f"{alias}categoria IN ({','.join('?' * len(categorias))})" if categorias else "0")
+        parametros.extend(categorias)
+    return (f"WHERE {' AND '.join(condiciones)}" if condiciones else ""), parametros
+
+
+def _consulta(sql: str, parametros: Iterable = ()) -> List[tuple]:
+    with closing(_conectar()) as con:
+        return con.execute(sql, list(parametros)).fetchall()
+
+
+# --- Consultas del dashboard (mismas salidas que agregados.* / consultas.*) ---
+# Todo lo agregado sale de resumen (miles de filas); movimientos solo sirve la página visible.
+@cronometrado()
+def opciones_filtros() -> Tuple[List[str], List[str]]:
+    """(periodos del más reciente al más antiguo, categorías), desde el resumen."""
+    claves = [p for (p,) in _consulta("SELECT DISTINCT periodo FROM resumen ORDER BY periodo")]
+    categorias = [c for (c,) in _consulta("SELECT DISTINCT categoria FROM resumen ORDER BY categoria")]
+    periodos = list(etiquetar_periodos(np.array(claves, dtype=np.int32)).categories) if claves else []
+    return periodos[::-1], categorias
+
+
+@cronometrado()
+def resumen_por_categoria(clave_periodo: Optional[int], categorias: Iterable[str]) -> pd.DataFrame:
+    """Categoría → Gastos (>0), Abonos (<0), N_gastos, N para el filtro."""
+    where, parametros = _filtro(clave_periodo, categorias)
+    filas = _consulta(f"""
+        SELECT categoria, SUM(gastos), SUM(abonos), SUM(n_gastos), SUM(n)
+        FROM resumen {where} GROUP BY categoria ORDER BY categoria
+    """, parametros)
+    return pd.DataFrame(filas, columns=["Categoría", "Gastos", "Abonos", "N_gastos", "N"])
+
+
+def kpis(resumen: pd.DataFrame) -> Dict[str, float]:
+    gastos = resumen["Gastos"].sum()
+    abonos = resumen["Abonos"].sum()
+    return {"gastos": gastos, "abonos": abonos, "gasto_neto": gastos + abonos, "movimientos": int(resumen["N"].sum())}
+
+
+def gasto_por_categoria(resumen: pd.DataFrame) -> pd.DataFrame:
+    """Como agregados.gasto_por_categoria: solo categorías con al menos un gasto."""
+    por_cat = resumen[resumen["N_gastos"] > 0]
+    return por_cat.rename(columns={"Gastos": "Monto"})[["Categoría", "Monto"]].reset_index(drop=True)
+
+
+@cronometrado()
+def gasto_neto_por_periodo() -> pd.DataFrame:
+    filas = _consulta("SELECT periodo, SUM(gastos), SUM(abonos) FROM resumen GROUP BY periodo ORDER BY periodo")
+    df = pd.DataFrame(filas, columns=["Clave", "Gastos", "Abonos"])
+    df.insert(0, "Periodo", np.asarray(etiquetar_periodos(df["Clave"].to_numpy(dtype=np.int32)), dtype=object))
+    df["Gasto Neto"] = df["Gastos"] + df["Abonos"]
+    return df.drop(columns="Clave")
+
+
+@cronometrado()
+def gasto_diario(clave_periodo: Optional[int], categorias: Iterable[str]) -> pd.DataFrame:
+    """Como agregados.gasto_diario, para el filtro: Dia → Gastos, Abonos."""
+    where, parametros = _filtro(clave_periodo, categorias)
+    filas = _consulta(f"SELECT dia, SUM(gastos), SUM(abonos) FROM resumen {where} GROUP BY dia ORDER BY dia", parametros)
+    df = pd.DataFrame(filas, columns=["Dia", "Gastos", "Abonos"])
+    df["Dia"] = pd.to_datetime(df["Dia"].astype("int64"))
+    return df
+
+
+@cronometrado()
+def consultar(clave_periodo: Optional[int] = None, categorias: Optional[Iterable[str]] = None) -> Dict:
+    """{"clave_periodo", "categorias", "total"}: el conteo sale del resumen; las filas, por página."""
+    categorias = None if categorias is None else tuple(categorias)
+    where, parametros = _filtro(clave_periodo, categorias)
+    total = _consulta(f"SELECT COALESCE(SUM(n), 0) FROM resumen {where}", parametros)[0][0]
+    return {"clave_periodo": clave_periodo, "categorias": categorias, "total": total}
+
+
+@cronometrado()
+def pagina(resultado: Dict, numero: int, tamano: int = TAMANO_PAGINA) -> pd.DataFrame:
+    """Filas de la página `numero` (desde 0) en el orden de consultas.pagina: más recientes primero."""
+    where, parametros = _filtro(resultado["clave_periodo"], resultado["categorias"], alias="m.")
+    filas = _consulta(f"""
+        SELECT m.fecha, d.texto, m.monto, m.categoria
+        FROM movimientos AS m JOIN descripciones AS d ON d.id = m.descripcion
+        {where}
+        ORDER BY m.periodo DESC, m.fecha DESC, m.cartola DESC, m.fila DESC LIMIT ? OFFSET ?
+    """, [*parametros, tamano, numero * tamano])
+    df = pd.DataFrame(filas, columns=["Fecha", "Descripción", "Monto", "Categoría"])
+    df["Fecha"] = pd.to_datetime(df["Fecha"].astype("int64"))
+    return df
+
+
+@cronometrado()
+def descripciones(categoria: Optional[str] = None) -> List[str]:
+    """Descripciones distintas del histórico (de una categoría, si se indica)."""
+    if categoria is None:
+        return [t for (t,) in _consulta("SELECT texto FROM descripciones WHERE id IN (SELECT descripcion FROM movimientos)")]
+    return [t for (t,) in _consulta(
+        "SELECT texto FROM descripciones WHERE id IN (SELECT descripcion FROM movimientos WHERE categoria = ?)", [categoria],
+    )]
@@ -0,0 +1,238 @@
+# utils/huellas.py
+"""
+Índice persistente de huellas de movimientos, para ingerir cartolas de forma idempotente.
+
+- Huella: hash de 64 bits de (Fecha, Descripción, Monto, ordinal). El ordinal numera los
+  movimientos idénticos del mismo día (dos cafés iguales el mismo día son 0 y 1), así que volver
+  a subir una cartola, una cartola corregida o una que se traslapa con otra (periodos 25 a 25)
+  produce las mismas huellas para los mismos movimientos.
+- Índice: tabla hash de direccionamiento abierto (sondeo lineal, 0 = vacío) en un .npy que se
+  abre con memmap: consultar si una huella existe toca unos pocos casilleros, O(1), sin cargar
+  la tabla entera al arrancar. Se reescribe de forma atómica al insertar.
+- fusionar() agrega a la partición de la cartola solo los movimientos que no estaban.
+- Se reconstruye desde el histórico (reconstruir) si falta, si no calza con las particiones
+  guardadas (se borró o reescribió una cartola por fuera de fusionar) o si cambia el hash.
+"""
+import json
+import os
+import threading
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from utils import historico
+from utils.instrumentacion import contar, cronometrado
+
+HUELLAS_PATH = os.path.join(historico.HIST_DIR, "huellas.npy")
+HUELLAS_VERSION = 1  # súbela si cambia qué entra en la huella
+CARGA_MAXIMA = 0.5   # ocupación máxima de la tabla antes de duplicarla
+CAPACIDAD_MINIMA = 1024
+
+# Contadores del proceso (resumen() los incluye).
+ESTADISTICAS: Dict[str, int] = {"insertados": 0, "duplicados": 0, "reconstrucciones": 0}
+
+_estado: Dict[str, object] = {"tabla": None, "n": 0, "particiones": None}
+_lock = threading.Lock()
+
+
+def calcular_huellas(df: pd.DataFrame) -> np.ndarray:
+    """Huella uint64 por fila (nunca 0). Fecha al día, Descripción sin espacios extremos, Monto en pesos."""
+    if df.empty:
+        return np.empty(0, dtype=np.uint64)
+    base = pd.DataFrame({
+        "f": pd.to_datetime(df["Fecha"]).dt.normalize().to_numpy(dtype="datetime64[ns]").view("int64"),
+        "d": df["Descripción"].astype(str).str.strip().to_numpy(dtype=object),
+        "m": pd.to_numeric(df["Monto"]).round().astype("int64").to_numpy(),
+    })
+    base["o"] = base.groupby(["f", "d", "m"], sort=False).cumcount().to_numpy()
+    huellas = pd.util.hash_pandas_object(base, index=False).to_numpy(dtype=np.uint64, copy=True)
+    huellas[huellas == 0] = 1  # 0 marca un casillero vacío
+    return huellas
+
+
+def _control() -> str:
+    # Huella de una fila fija: si cambia (otra versión de pandas), las guardadas no sirven.
+    fila = pd.DataFrame({"Fecha": ["2025-01-01"], "Descripción": ["CONTROL"], "Monto": [1]})
+    return f"{HUELLAS_VERSION}:{calcular_huellas(fila)[0]}"
+
+
+def _meta_path() -> str:
+    return f"{os.path.splitext(HUELLAS_PATH)[0]}.json"
+
+
+def _contiene(tabla: np.ndarray, huellas: np.ndarray) -> np.ndarray:
+    """Pertenencia vectorizada: cada huella sondea desde su casillero hasta hallarse o hallar un 0."""
+    mascara = np.uint64(len(tabla) - 1)
+    resultado = np.zeros(len(huellas), dtype=bool)
+    pendientes = np.arange(len(huellas))
+    posiciones = huellas & mascara
+    while len(pendientes):
+        valores = tabla[posiciones]
+        encontradas = valores == huellas[pendientes]
+        resultado[pendientes[encontradas]] = True
+        siguen = ~encontradas & (valores != 0)
+        pendientes = pendientes[siguen]
+        posiciones = (posiciones[siguen] + np.uint64(1)) & mascara
+    return resultado
+
+
+def _insertar(tabla: np.ndarray, huellas: np.ndarray) -> None:
+    """Inserta huellas únicas y ausentes; si dos compiten por el mismo casillero libre gana la primera."""
+    mascara = np.uint64(len(tabla) - 1)
+    posiciones = huellas & mascara
+    while len(huellas):
+        libres = np.flatnonzero(tabla[posiciones] == 0)
+        _, primeras = np.unique(posiciones[libres], return_index=True)
+        elegidas = libres[primeras]
+        tabla[posiciones[elegidas]] = huellas[elegidas]
+        resto = np.ones(len(huellas), dtype=bool)
+        resto[elegidas] = False
+        huellas = huellas[resto]
+        posiciones = (posiciones[resto] + np.uint64(1)) & mascara
+
+
+def _capacidad(n: int) -> int:
+    return max(CAPACIDAD_MINIMA, 1 << int(np.ceil(np.log2(max(n, 1) / CARGA_MAXIMA))))
+
+
+def _tabla_con(huellas: np.ndarray) -> np.ndarray:
+    tabla = np.zeros(_capacidad(len(huellas)), dtype=np.uint64)
+    _insertar(tabla, huellas)
+    return tabla
+
+
+def _particiones() -> Dict[str, list]:
+    """Periodo → [mtime_ns, filas] de cada partición guardada (filas desde el pie del Parquet)."""
+    anteriores = _estado["particiones"] or {}
+    particiones = {}
+    for periodo in historico.listar_periodos():
+        ruta = os.path.join(historico.DATASET_DIR, f"Periodo={periodo}", historico.ARCHIVO_PARTICION)
+        mtime = os.stat(ruta).st_mtime_ns
+        previa = anteriores.get(periodo)
+        filas = previa[1] if previa and previa[0] == mtime else pq.read_metadata(ruta).num_rows
+        particiones[periodo] = [mtime, filas]
+    return particiones
+
+
+def _guardar() -> None:
+    # Escritura atómica (tabla y luego meta): si se corta entre medio, la meta no calza y se reconstruye.
+    directorio = os.path.dirname(HUELLAS_PATH)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    sufijo = f".{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(HUELLAS_PATH + sufijo, "wb") as f:
+        np.save(f, np.asarray(_estado["tabla"]))
+    os.replace(HUELLAS_PATH + sufijo, HUELLAS_PATH)
+    meta = {"control": _control(), "n": _estado["n"], "capacidad": len(_estado["tabla"]), "particiones": _estado["particiones"]}
+    with open(_meta_path() + sufijo, "w", encoding="utf-8") as f:
+        json.dump(meta, f, separators=(",", ":"))
+    os.replace(_meta_path() + sufijo, _meta_path())
+
+
+@cronometrado()
+def reconstruir() -> int:
+    """Recalcula el índice desde todas las particiones del histórico. Retorna cuántas huellas tiene."""
+    with _lock:
+        return _reconstruir()
+
+
+def _reconstruir() -> int:
+    df = historico.cargar_historico(columnas=["Fecha", "Descripción", "Monto"])
+    huellas = np.unique(calcular_huellas(df))
+    contar("huellas_reconstruidas", len(huellas))
+    _estado.update(tabla=_tabla_con(huellas), n=len(huellas), particiones=None)
+    _estado["particiones"] = _particiones()
+    _guardar()
+    ESTADISTICAS["reconstrucciones"] += 1
+    return len(huellas)
+
+
+def _abrir() -> None:
+    """Abre el índice del disco (memmap) o lo reconstruye si falta, está corrupto o no calza."""
+    try:
+        with open(_meta_path(), encoding="utf-8") as f:
+            meta = json.load(f)
+        tabla = np.load(HUELLAS_PATH, mmap_mode="r")
+        valido = meta["control"] == _control() and meta["capacidad"] == len(tabla) and tabla.dtype == np.uint64
+    except (OSError, ValueError, KeyError):
+        valido = False
+    if not valido:
+        _reconstruir()
+        return
+    _estado.update(tabla=tabla, n=meta["n"], particiones=meta["particiones"])
+
+
+def _vigente() -> None:
+    """Deja el índice abierto y al día con las particiones guardadas (lo reconstruye si no calza)."""
+    if _estado["tabla"] is None:
+        _abrir()
+    actuales = _particiones()
+    if actuales != _estado["particiones"]:
+        if {p: f for p, (_, f) in actuales.items()} != {p: f for p, (_, f) in _estado["particiones"].items()}:
+            _reconstruir()  # cartolas borradas, agregadas o reescritas por fuera de fusionar
+            return
+        _estado["particiones"] = actuales  # solo cambió el mtime (p. ej. reclasificación)
+        _guardar()
+
+
+def contiene(df: pd.DataFrame) -> np.ndarray:
+    """Máscara: True para los movimientos que ya están en el histórico."""
+    with _lock:
+        _vigente()
+        return _contiene(_estado["tabla"], calcular_huellas(df))
+
+
+@cronometrado()
+def fusionar(df: pd.DataFrame, periodo: str) -> int:
+    """
+    Agrega a la partición del periodo (creándola si no existe) solo los movimientos de df que no
+    están en el histórico, en ninguna cartola. Retorna cuántos se insertaron.
+    """
+    with historico.escritura, _lock:  # otro proceso puede estar fusionando en el mismo histórico
+        _vigente()
+        huellas = calcular_huellas(df)
+        nuevas = ~_contiene(_estado["tabla"], huellas)
+        insertados = int(nuevas.sum())
+        ESTADISTICAS["duplicados"] += len(df) - insertados
+        if not insertados:
+            return 0
+
+        filas = df[nuevas]
+        if historico.existe_periodo(periodo):
+            guardadas = historico.cargar_historico(columnas=["Fecha", "Descripción", "Monto", "Categoría"], periodos=[periodo])
+            filas = pd.concat([guardadas.astype({"Categoría": str}), filas.astype({"Categoría": str})], ignore_index=True)
+            filas = filas.sort_values("Fecha", kind="stable")
+        historico.guardar_periodo(filas, periodo)
+
+        tabla = _estado["tabla"]
+        n = _estado["n"] + insertados
+        if n > len(tabla) * CARGA_MAXIMA:
+            tabla = _tabla_con(np.concatenate([tabla[tabla != 0], huellas[nuevas]]))
+        else:
+            if isinstance(tabla, np.memmap):
+                tabla = np.array(tabla)  # copia escribible del memmap (solo lectura)
+            _insertar(tabla, huellas[nuevas])
+        _estado.update(tabla=tabla, n=n)
+        _estado["particiones"] = _particiones()
+        _guardar()
+        ESTADISTICAS["insertados"] += insertados
+        return insertados
+
+
+def recargar() -> None:
+    """Olvida el índice en memoria (se vuelve a abrir desde HUELLAS_PATH)."""
+    with _lock:
+        _estado.update(tabla=None, n=0, particiones=None)
+
+
+def resumen() -> Dict[str, int]:
+    with _lock:
+        _vigente()
+        return {
+            "huellas": int(_estado["n"]),
+            "capacidad": len(_estado["tabla"]),
+            "bytes": int(np.asarray(_estado["tabla"]).nbytes),
+            **ESTADISTICAS,
+        }
@@ -0,0 +1,192 @@
+# utils/ingesta.py
+"""
+Carga masiva (sin UI) de cartolas PDF al histórico.
+
+Uso:
+    python -m utils.ingesta carpeta_con_pdfs/ [--password-env CARTOLA_PDF_PASSWORD] [--workers N]
+    python -m utils.ingesta "pdfs/80_*_*.pdf" --password-file clave.txt
+"""
+import argparse
+import getpass
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from utils import comercios, historico, huellas
+from utils.agregados import sincronizar_agregados
+from utils.cache_cartola import hash_pdf
+from utils.cartola import PARSER_VERSION, extraer_movimientos_vectorizado, normalizar_movimientos, periodo_desde_nombre_pdf
+from utils.pdf_tabla import extraer_movimientos_tabla, modo_pdf
+from utils.pdf_texto import extraer_texto_pdf
+
+# PDFs ya ingeridos: SHA-256 del contenido → {"periodo", "parser"}. Un PDF se vuelve a procesar
+# solo si su cartola ya no está guardada o si cambió la versión del parser.
+REGISTRO_PATH = os.path.join(historico.HIST_DIR, "ingeridos.json")
+
+
+def listar_pdfs(entradas: Iterable[str]) -> List[str]:
+    """Expande carpetas y globs a una lista ordenada y sin duplicados de PDFs."""
+    rutas = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            rutas.extend(glob.glob(os.path.join(entrada, "*.pdf")))
+        else:
+            rutas.extend(glob.glob(entrada))
+    return sorted(set(rutas))
+
+
+def procesar_pdf(ruta: str, password: str, periodo: str) -> Tuple[str, str, pd.DataFrame]:
+    """Worker: extracción → parseo/clasificación → normalización. Retorna (ruta, periodo, df)."""
+    df = extraer_movimientos_tabla(ruta, password) if modo_pdf() == "tabla" else None
+    if df is None:  # modo texto, o la cartola no tiene columnas alineadas
+        texto = extraer_texto_pdf(ruta, password, workers=1)  # el paralelismo es entre archivos
+        df = extraer_movimientos_vectorizado(texto)
+    df = normalizar_movimientos(df)
+    df["Periodo"] = periodo
+    return ruta, periodo, df
+
+
+def _leer_registro() -> Dict[str, Dict[str, str]]:
+    try:
+        with open(REGISTRO_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _registrar(huella: str, periodo: str) -> None:
+    """Anota el PDF como ingerido (releyendo el registro bajo el lock: otra ingesta puede haber escrito)."""
+    with historico.escritura:
+        registro = _leer_registro()
+        registro[huella] = {"periodo": periodo, "parser": PARSER_VERSION}
+        os.makedirs(os.path.dirname(REGISTRO_PATH) or ".", exist_ok=True)
+        tmp = f"{REGISTRO_PATH}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(registro, f, separators=(",", ":"))
+        os.replace(tmp, REGISTRO_PATH)
+
+
+def _pendientes(rutas: Iterable[str], resumen: Dict[str, int]) -> Iterator[Tuple[str, str, str]]:
+    """
+    (ruta, periodo, hash) de los PDFs por procesar. Se omiten los sin fecha en el nombre, los
+    repetidos en el lote y los ya ingeridos (registro), sin abrirlos: solo se hashea el archivo.
+    """
+    registro = _leer_registro()
+    vistos = set()
+    for ruta in rutas:
+        periodo = periodo_desde_nombre_pdf(os.path.basename(ruta))
+        if not periodo:
+            print(f"⚠️  {ruta}: no se pudo extraer la fecha del nombre (…_YYYYMMDD.pdf)")
+            resumen["errores"] += 1
+            continue
+        with open(ruta, "rb") as f:
+            huella = hash_pdf(f.read())
+        previo = registro.get(huella)
+        if huella in vistos or (
+            previo and previo["parser"] == PARSER_VERSION and historico.existe_periodo(previo["periodo"])
+        ):
+            resumen["omitidos"] += 1
+            continue
+        vistos.add(huella)
+        yield ruta, periodo, huella
+
+
+def ingerir(rutas: List[str], password: str, workers: Optional[int] = None, en_vuelo: Optional[int] = None) -> Dict[str, float]:
+    """
+    Procesa los PDFs en paralelo con una ventana acotada de trabajos en vuelo
+    (así la memoria no crece con el tamaño del lote) y fusiona cada cartola al terminar:
+    solo se guardan los movimientos que no estaban. Los PDFs ya ingeridos (mismo contenido,
+    ver REGISTRO_PATH) se omiten sin abrirlos.
+    Retorna el resumen con throughput.
+    """
+    workers = workers or os.cpu_count() or 1
+    en_vuelo = en_vuelo or 2 * workers
+    resumen = {"archivos": 0, "filas": 0, "duplicados": 0, "omitidos": 0, "errores": 0}
+    t0 = time.perf_counter()
+
+    pendientes = _pendientes(rutas, resumen)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futuros: Dict = {}  # futuro → hash del PDF
+        agotado = False
+        while futuros or not agotado:
+            while not agotado and len(futuros) < en_vuelo:
+                siguiente = next(pendientes, None)
+                if siguiente is None:
+                    agotado = True
+                else:
+                    ruta, periodo, huella = siguiente
+                    futuros[pool.submit(procesar_pdf, ruta, password, periodo)] = huella
+            if not futuros:
+                break
+
+            listos, _ = wait(futuros, return_when=FIRST_COMPLETED)
+            for futuro in listos:
+                huella = futuros.pop(futuro)
+                try:
+                    ruta, periodo, df = futuro.result()
+                except Exception as e:
+                    print(f"❌ Error procesando un PDF: {e}")
+                    resumen["errores"] += 1
+                    continue
+                # los índices de comercios y de huellas se aplican aquí (proceso principal), no en los
+                # workers, bajo el lock de escritura: la app puede estar guardando en el mismo histórico
+                with historico.escritura:
+                    insertados = huellas.fusionar(comercios.clasificar_movimientos(df), periodo)
+                    comercios.guardar()
+                _registrar(huella, periodo)
+                resumen["archivos"] += 1
+                resumen["filas"] += insertados
+                resumen["duplicados"] += len(df) - insertados
+                print(f"✅ {os.path.basename(ruta)} → cartola {periodo} ({insertados} movimientos nuevos, {len(df) - insertados} repetidos)")
+
+    with historico.escritura:
+        sincronizar_agregados()
+    segundos = time.perf_counter() - t0
+    resumen["segundos"] = segundos
+    resumen["archivos_por_s"] = resumen["archivos"] / segundos if segundos else 0.0
+    resumen["filas_por_s"] = resumen["filas"] / segundos if segundos else 0.0
+    return resumen
+
+
+def _leer_password(args: argparse.Namespace) -> str:
+    if args.password_file:
+        with open(args.password_file, encoding="utf-8") as f:
+            return f.read().strip()
+    password = os.getenv(args.password_env, "")
+    if not password and sys.stdin.isatty():
+        password = getpass.getpass("Clave de los PDF: ")
+    if not password:
+        raise SystemExit(f"Falta la clave: usa --password-file o define {args.password_env}.")
+    return password
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Carga masiva de cartolas PDF al histórico.")
+    parser.add_argument("entradas", nargs="+", help="Carpetas o globs de PDFs (…_YYYYMMDD.pdf)")
+    parser.add_argument("--password-env", default="CARTOLA_PDF_PASSWORD", help="Variable de entorno con la clave")
+    parser.add_argument("--password-file", help="Archivo cuya primera línea es la clave")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos en paralelo (default: CPUs)")
+    parser.add_argument("--en-vuelo", type=int, default=None, help="Máx. PDFs en proceso a la vez (default: 2×workers)")
+    args = parser.parse_args(argv)
+
+    rutas = listar_pdfs(args.entradas)
+    if not rutas:
+        raise SystemExit("No se encontraron PDFs.")
+    resumen = ingerir(rutas, _leer_password(args), workers=args.workers, en_vuelo=args.en_vuelo)
+    print(
+        f"\n📦 {resumen['archivos']} cartola(s), {resumen['filas']:,} movimientos en {resumen['segundos']:.1f}s "
+        f"({resumen['archivos_por_s']:.2f} archivos/s, {resumen['filas_por_s']:,.0f} filas/s); "
+        f"{resumen['duplicados']:,} repetidos descartados, {resumen['omitidos']} PDF(s) ya ingerido(s) omitido(s), {resumen['errores']} con error."
+    )
+
+
+if __name__ == "__main__":
+    main()
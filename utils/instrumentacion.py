@@ -0,0 +1,292 @@
+# utils/instrumentacion.py
+"""
+Instrumentación liviana del pipeline: cronómetros por etapa, contadores y memoria.
+
+- medir("etapa") (context manager) y @cronometrado("etapa") (decorador) registran la duración,
+  la memoria residente al terminar y el pico del proceso (ru_maxrss).
+- contar("nombre", n) suma contadores (filas parseadas, particiones leídas, llamadas a APIs...).
+- Los registros van a la traza actual (una por rerun, ver iniciar_traza) y a ACUMULADO (proceso).
+  Cada traza lleva la sesión que la abrió: trazas_guardadas(sesion) entrega solo las suyas.
+- traza_fragmento() abre una traza propia para los reruns parciales de st.fragment(run_every=...),
+  que no vuelven a pasar por el iniciar_traza del script.
+
+La instrumentación está activa en un contexto si tiene una traza abierta: iniciar_traza(activa=...)
+la abre o no (None → default del proceso: CARTOLA_INSTRUMENTACION=1 o activar(True)). El estado
+vive en la misma ContextVar que la traza, así cada sesión de Streamlit (un hilo por rerun) mide
+o no según su propio toggle, sin afectar a las demás; fuera de una traza no se mide.
+Desactivada, medir() retorna un context manager nulo compartido y @cronometrado llama a la
+función directamente tras revisar la ContextVar: el costo es de decenas de nanosegundos.
+CARTOLA_TRAZA_JSONL=ruta agrega cada traza terminada a un JSONL para análisis offline.
+"""
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from typing import Callable, Dict, Iterable, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MAX_TRAZAS_GUARDADAS = 50
+
+# Acumulado del proceso: etapa → llamadas / ms totales, y contadores.
+ACUMULADO: Dict[str, Counter] = {"llamadas": Counter(), "ms": Counter(), "contadores": Counter()}
+
+_activa = False  # default del proceso para iniciar_traza (ver activar)
+_traza: contextvars.ContextVar[Optional[Dict]] = contextvars.ContextVar("traza", default=None)
+_profundidad: contextvars.ContextVar[int] = contextvars.ContextVar("profundidad", default=0)
+_trazas: "deque[Dict]" = deque(maxlen=MAX_TRAZAS_GUARDADAS)
+_lock = threading.Lock()
+_NULO = contextlib.nullcontext()
+_PAGINA_KB = os.sysconf("SC_PAGE_SIZE") / 1024 if hasattr(os, "sysconf") else 4.0
+
+
+def activar(valor: Optional[bool] = None) -> bool:
+    """Default del proceso para las trazas nuevas (None → CARTOLA_INSTRUMENTACION). Retorna el estado."""
+    global _activa
+    if valor is None:
+        valor = os.getenv("CARTOLA_INSTRUMENTACION", "0").lower() in ("1", "true", "si", "sí")
+    _activa = bool(valor)
+    return _activa
+
+
+def activa() -> bool:
+    """True si el contexto actual tiene una traza abierta (se está midiendo)."""
+    return _traza.get() is not None
+
+
+# --- Memoria ---
+def memoria_mb() -> Optional[float]:
+    """Memoria residente actual (Linux: /proc/self/statm); None si no se puede leer."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGINA_KB / 1024
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def pico_memoria_mb() -> Optional[float]:
+    """Pico de memoria residente del proceso (high-water mark)."""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024  # macOS: bytes; Linux: KB
+
+
+# --- Trazas ---
+def iniciar_traza(nombre: str = "rerun", activa: Optional[bool] = None, sesion: Optional[str] = None) -> Optional[Dict]:
+    """
+    Abre una traza nueva para el contexto actual (un rerun, una ingesta) y activa la medición en él.
+    activa=False (o None con el default del proceso desactivado) la desactiva: retorna None.
+    sesion identifica a quién pertenece (las trazas guardadas son del proceso, no de la sesión).
+    """
+    if not (_activa if activa is None else activa):
+        _traza.set(None)
+        return None
+    traza = {
+        "id": uuid.uuid4().hex[:8],
+        "nombre": nombre,
+        "sesion": sesion,
+        "inicio": time.time(),
+        "t0": time.perf_counter(),
+        "registros": [],
+        "contadores": Counter(),
+        "pico_inicial_mb": pico_memoria_mb(),
+    }
+    _traza.set(traza)
+    with _lock:
+        _trazas.append(traza)
+    return traza
+
+
+def traza_actual() -> Optional[Dict]:
+    return _traza.get()
+
+
+@contextlib.contextmanager
+def traza_fragmento(nombre: str, activa: Optional[bool] = None, sesion: Optional[str] = None):
+    """
+    Para el cuerpo de un st.fragment: dentro de un rerun completo (traza abierta) mide en esa traza;
+    en un rerun parcial del fragmento abre una propia y la cierra al salir (también si hace st.rerun()).
+    """
+    if _traza.get() is not None:
+        yield _traza.get()
+        return
+    traza = iniciar_traza(nombre, activa, sesion)
+    try:
+        yield traza
+    finally:
+        terminar_traza()
+
+
+def terminar_traza() -> Optional[Dict]:
+    """
+    Cierra la traza actual (duración total) y, si CARTOLA_TRAZA_JSONL está definida, la agrega al archivo.
+    El contexto queda sin traza: lo que se mida después no cae en una ya cerrada.
+    """
+    traza = _traza.get()
+    if traza is None:
+        return None
+    _traza.set(None)
+    traza["duracion_ms"] = (time.perf_counter() - traza["t0"]) * 1000
+    traza["pico_mb"] = pico_memoria_mb()
+    ruta = os.getenv("CARTOLA_TRAZA_JSONL")
+    if ruta:
+        guardar_jsonl(ruta, [traza])
+    return traza
+
+
+def _registrar(etapa: str, inicio: float, ms: float, profundidad: int, error: Optional[str]) -> None:
+    registro = {
+        "etapa": etapa,
+        "desde_ms": None,
+        "ms": ms,
+        "profundidad": profundidad,
+        "hilo": threading.current_thread().name,
+        "memoria_mb": memoria_mb(),
+        "pico_mb": pico_memoria_mb(),
+        "error": error,
+    }
+    with _lock:
+        ACUMULADO["llamadas"][etapa] += 1
+        ACUMULADO["ms"][etapa] += ms
+    traza = _traza.get()
+    if traza is not None:  # el bloque pudo cerrar la traza (iniciar_traza adentro)
+        registro["desde_ms"] = (inicio - traza["t0"]) * 1000
+        with _lock:
+            traza["registros"].append(registro)
+
+
+@contextlib.contextmanager
+def _medicion(etapa: str):
+    profundidad = _profundidad.get()
+    token = _profundidad.set(profundidad + 1)
+    error = None
+    t0 = time.perf_counter()
+    try:
+        yield
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        ms = (time.perf_counter() - t0) * 1000
+        _profundidad.reset(token)
+        _registrar(etapa, t0, ms, profundidad, error)
+
+
+def medir(etapa: str):
+    """Context manager que cronometra el bloque como `etapa` (nulo si está desactivada)."""
+    if _traza.get() is None:
+        return _NULO
+    return _medicion(etapa)
+
+
+def cronometrado(etapa: Optional[str] = None) -> Callable:
+    """Decorador: cronometra cada llamada como `etapa` (default: módulo.función)."""
+    def decorar(fn: Callable) -> Callable:
+        nombre = etapa or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def envoltura(*args, **kwargs):
+            if _traza.get() is None:
+                return fn(*args, **kwargs)
+            with _medicion(nombre):
+                return fn(*args, **kwargs)
+        return envoltura
+    return decorar
+
+
+def contar(nombre: str, n: int = 1) -> None:
+    """Suma n al contador `nombre` de la traza actual y del proceso (no-op si está desactivada)."""
+    traza = _traza.get()
+    if traza is None:
+        return
+    with _lock:
+        ACUMULADO["contadores"][nombre] += n
+        traza["contadores"][nombre] += n
+
+
+# --- Resúmenes y exportación ---
+def resumen_etapas(traza: Optional[Dict]) -> List[Dict]:
+    """Por etapa: llamadas, ms totales y máximos, % del total de la traza y pico de memoria; ordenado por ms."""
+    if not traza:
+        return []
+    with _lock:
+        registros = list(traza["registros"])
+    total_ms = traza.get("duracion_ms") or (time.perf_counter() - traza["t0"]) * 1000
+    etapas: Dict[str, Dict] = {}
+    for r in registros:
+        e = etapas.setdefault(r["etapa"], {"etapa": r["etapa"], "llamadas": 0, "ms": 0.0, "max_ms": 0.0,
+                                             "pct": 0.0, "profundidad": r["profundidad"], "pico_mb": None})
+        e["llamadas"] += 1
+        e["ms"] += r["ms"]
+        e["max_ms"] = max(e["max_ms"], r["ms"])
+        e["profundidad"] = min(e["profundidad"], r["profundidad"])
+        if r["pico_mb"] is not None:
+            e["pico_mb"] = max(e["pico_mb"] or 0.0, r["pico_mb"])
+    for e in etapas.values():
+        e["pct"] = 100 * e["ms"] / total_ms if total_ms else 0.0
+    return sorted(etapas.values(), key=lambda e: e["ms"], reverse=True)
+
+
+def _serializable(traza: Dict) -> Dict:
+    with _lock:
+        return {
+            "id": traza["id"],
+            "nombre": traza["nombre"],
+            "sesion": traza["sesion"],
+            "inicio": traza["inicio"],
+            "duracion_ms": traza.get("duracion_ms"),
+            "pico_inicial_mb": traza["pico_inicial_mb"],
+            "pico_mb": traza.get("pico_mb"),
+            "contadores": dict(traza["contadores"]),
+            "registros": list(traza["registros"]),
+        }
+
+
+def trazas_guardadas(sesion: Optional[str] = None) -> List[Dict]:
+    """Trazas en memoria del proceso; con sesion, solo las de esa sesión."""
+    with _lock:
+        return [t for t in _trazas if sesion is None or t["sesion"] == sesion]
+
+
+def trazas_jsonl(trazas: Optional[Iterable[Dict]] = None) -> str:
+    """Una línea JSON por registro (con id/nombre de su traza) y una por traza con su total y contadores."""
+    lineas = []
+    for traza in trazas if trazas is not None else trazas_guardadas():
+        t = _serializable(traza)
+        for r in t.pop("registros"):
+            lineas.append(json.dumps({"tipo": "etapa", "traza": t["id"], "nombre_traza": t["nombre"], **r}, ensure_ascii=False))
+        lineas.append(json.dumps({"tipo": "traza", **t}, ensure_ascii=False))
+    return "\n".join(lineas) + ("\n" if lineas else "")
+
+
+def guardar_jsonl(ruta: str, trazas: Optional[Iterable[Dict]] = None) -> None:
+    """Agrega las trazas (default: las guardadas en memoria) al archivo JSONL."""
+    contenido = trazas_jsonl(trazas)
+    if not contenido:
+        return
+    carpeta = os.path.dirname(ruta)
+    if carpeta:
+        os.makedirs(carpeta, exist_ok=True)
+    with open(ruta, "a", encoding="utf-8") as f:
+        f.write(contenido)
+
+
+def reiniciar() -> None:
+    """Borra trazas y acumulados (para benchmarks)."""
+    with _lock:
+        _trazas.clear()
+        for c in ACUMULADO.values():
+            c.clear()
+
+
+activar()
@@ -0,0 +1,77 @@
+# utils/movimientos.py
+"""
+Tabla compacta de movimientos para la vista histórica.
+
+Por fila: Fecha datetime64 (8 bytes), Monto int64 en pesos (8), Clave_periodo int32 YYYYMM (4),
+y Descripción/Categoría categóricas (códigos de 1-2 bytes + un diccionario de comercios compartido).
+El texto formateado ("$ 1.234") se genera solo para las filas que se muestran.
+"""
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils import historico
+from utils.instrumentacion import cronometrado
+from utils.periodos import asignar_periodo
+
+COLUMNAS_TABLA = ["Fecha", "Descripción", "Monto", "Categoría", "Clave_periodo"]
+
+
+def _contiene(serie: pd.Series, patron: str) -> np.ndarray:
+    """str.contains (sin distinguir mayúsculas) evaluado una vez por categoría, no por fila."""
+    categorias = serie.cat.categories
+    aciertos = np.append(np.asarray(categorias.str.contains(patron, case=False, regex=False), dtype=bool), False)
+    return aciertos[serie.cat.codes.to_numpy()]  # código -1 (nulo) → último elemento (False)
+
+
+@cronometrado()
+def compactar(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convierte movimientos (con cualquier dtype de origen) a la tabla compacta,
+    aplicando los filtros globales de la vista: sin fecha y "Revisar" quedan fuera.
+    """
+    fechas = pd.to_datetime(df["Fecha"], errors="coerce")
+    descripcion = df["Descripción"].astype("category")
+    mascara = fechas.notna().to_numpy() & ~_contiene(descripcion, "Revisar")
+
+    fechas = fechas[mascara].astype("datetime64[ns]")
+    out = pd.DataFrame({
+        "Fecha": fechas.to_numpy(),
+        "Descripción": descripcion[mascara].cat.remove_unused_categories().array,
+        "Monto": pd.to_numeric(df["Monto"][mascara]).round().astype("int64").to_numpy(),
+        "Categoría": df["Categoría"][mascara].astype("category").cat.remove_unused_categories().array,
+        "Clave_periodo": asignar_periodo(fechas),
+    })
+    return out
+
+
+def cargar_movimientos(periodos: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """Histórico como tabla compacta (Descripción se codifica por diccionario ya en Arrow)."""
+    df = historico.cargar_historico(columnas=["Fecha", "Descripción", "Monto", "Categoría"], periodos=periodos, diccionario=True)
+    return compactar(df)
+
+
+def formatear_montos(montos) -> pd.Series:
+    """'$ 1.234.567' (separador de miles chileno) para las filas entregadas."""
+    valores = np.asarray(montos, dtype=np.int64)
+    return pd.Series(
+        [f"$ {v:,}".replace(",", ".") for v in valores.tolist()],
+        index=montos.index if isinstance(montos, pd.Series) else None,
+        dtype=object,
+    )
+
+
+def para_mostrar(df: pd.DataFrame) -> pd.DataFrame:
+    """Columnas de la tabla visible, con el monto formateado solo para las filas entregadas."""
+    return pd.DataFrame({
+        "Fecha": df["Fecha"],
+        "Descripción": df["Descripción"],
+        "Monto_formateado": formatear_montos(df["Monto"]),
+        "Categoría": df["Categoría"],
+    })
+
+
+def bytes_por_fila(df: pd.DataFrame) -> float:
+    """Memoria real (deep) por fila, incluido el índice y los diccionarios de las categóricas."""
+    return df.memory_usage(deep=True).sum() / max(len(df), 1)
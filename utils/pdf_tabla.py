@@ -0,0 +1,337 @@
+# utils/pdf_tabla.py
+"""
+Modo tabla: movimientos directamente desde las coordenadas de los caracteres del PDF, sin
+reconstruir el texto de cada página (extract_text) ni volver a escanearlo con regex.
+
+- Una plantilla por diseño de cartola (tamaño de página + fuentes) guarda los límites de las
+  columnas (lugar | fecha | descripción | monto) y el techo de la tabla en la primera página
+  y en las siguientes. Se detecta con las filas que calzan con "fecha … $ monto" y se reutiliza
+  en las páginas siguientes y en las próximas cartolas (memoria + cache/plantillas_pdf.json).
+- Con plantilla, cada página se interpreta con un dispositivo mínimo de pdfminer que descarta
+  lo que está sobre la tabla y solo anota (x, fin, y, texto) por carácter: se evitan los
+  objetos por carácter de pdfplumber, que son la mayor parte del costo de extract_text.
+- Las filas salen tipadas con la semántica de extraer_movimientos_vectorizado: monto del primer
+  "$", nota de crédito en negativo, fecha repetida o descripción vacía → "Revisar".
+
+Se activa con CARTOLA_PDF_MODO=tabla (el default es el modo texto). Si la cartola no tiene
+columnas alineadas, extraer_movimientos_tabla retorna None y el llamador usa el modo texto
+(extraer_texto_pdf + extraer_movimientos_vectorizado).
+"""
+import io
+import json
+import os
+import re
+import threading
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pdfplumber
+from pdfminer.pdfdevice import PDFTextDevice
+from pdfminer.pdffont import PDFUnicodeNotDefined
+from pdfminer.pdfinterp import PDFPageInterpreter
+from pdfminer.pdftypes import resolve1
+
+from utils.cartola import COLUMNAS_MOVIMIENTOS
+from utils.clasificador import classify_series
+from utils.instrumentacion import contar, cronometrado, medir
+from utils.pdf_texto import FuentePDF, _leer_bytes
+
+# Defaults; se pueden sobreescribir por entorno/.env (CARTOLA_PDF_MODO se lee en cada llamada).
+# El modo tabla es opcional (CARTOLA_PDF_MODO=tabla): depende de internos de pdfminer
+# (PDFTextDevice, firma de render_char) y solo se ha validado con cartolas sintéticas.
+PDF_MODO = "texto"  # "texto" o "tabla" (con respaldo en modo texto si no hay columnas)
+PLANTILLAS_PATH = os.path.join("cache", "plantillas_pdf.json")
+PLANTILLAS_VERSION = 1  # súbela si cambia la forma de detectar o guardar plantillas
+
+MIN_FILAS_PLANTILLA = 3   # filas de movimiento necesarias para fijar las columnas
+TOLERANCIA_COLUMNA = 2.0  # pt: dispersión máxima del inicio de la fecha entre filas
+X_TOLERANCIA = 3.0        # pt: separación que cuenta como espacio (default de pdfplumber)
+Y_TOLERANCIA = 3.0        # pt: líneas base más cercanas son la misma fila (default de pdfplumber)
+
+# Contadores del proceso (bench_pdf_tabla los reporta).
+ESTADISTICAS: Dict[str, int] = {"plantillas_detectadas": 0, "paginas_recortadas": 0, "paginas_completas": 0, "respaldo_texto": 0}
+
+_RE_FILA = re.compile(r"(\d{2}/\d{2}/\d{4}).*?(\$)[\s-]*[\d.]+")
+_RE_FECHA = re.compile(r"\d{2}/\d{2}/\d{4}")
+_RE_MONTO = re.compile(r"\$[\s-]*([\d.]+)")
+_CARACTERES_CONTROL = frozenset("0123456789/")
+
+Caracter = Tuple[float, float, float, str]  # x, fin, y (línea base), texto
+
+_plantillas: Optional[Dict[str, Dict]] = None
+_lock = threading.Lock()
+
+
+def modo_pdf() -> str:
+    return os.getenv("CARTOLA_PDF_MODO", PDF_MODO)
+
+
+def _es_control(x: float, texto: str, limites: List[float]) -> bool:
+    """Dígito o "/" en la columna de fecha: sobre el techo, su cantidad delata una fila corrida."""
+    return texto in _CARACTERES_CONTROL and limites[0] <= x < limites[1]
+
+
+class _Caracteres(PDFTextDevice):
+    """Dispositivo de pdfminer que solo anota los caracteres horizontales bajo el techo."""
+
+    def __init__(self, rsrcmgr, techo: float = float("inf"), limites: Optional[List[float]] = None):
+        super().__init__(rsrcmgr)
+        self.techo = techo
+        self.limites = limites
+        self.caracteres: List[Caracter] = []
+        self.control = 0  # caracteres de control descartados sobre el techo
+
+    def render_char(self, matrix, font, fontsize, scaling, rise, cid, ncs, graphicstate) -> float:
+        a, b, c, d, e, f = matrix
+        adv = font.char_width(cid) * fontsize * scaling
+        if b or c or a <= 0:  # texto rotado (marcas de agua, timbres)
+            return adv
+        try:
+            texto = font.to_unichr(cid)
+        except PDFUnicodeNotDefined:
+            return adv
+        y = f + d * rise
+        if y > self.techo:
+            if self.limites and _es_control(e, texto, self.limites):
+                self.control += 1
+        else:
+            self.caracteres.append((e, e + a * adv, y, texto))
+        return adv
+
+
+def _interpretar(pdf, pagina, techo: float = float("inf"), limites: Optional[List[float]] = None) -> _Caracteres:
+    dispositivo = _Caracteres(pdf.rsrcmgr, techo, limites)
+    PDFPageInterpreter(pdf.rsrcmgr, dispositivo).process_page(pagina.page_obj)
+    return dispositivo
+
+
+def _filas(caracteres: List[Caracter]) -> List[List[Caracter]]:
+    """Agrupa por línea base (de arriba hacia abajo); cada fila queda ordenada por x."""
+    filas: List[List[Caracter]] = []
+    y_fila = None
+    for caracter in sorted(caracteres, key=lambda c: -c[2]):
+        if y_fila is None or y_fila - caracter[2] > Y_TOLERANCIA:
+            filas.append([])
+            y_fila = caracter[2]
+        filas[-1].append(caracter)
+    for fila in filas:
+        fila.sort()
+    return filas
+
+
+def _linea(fila: List[Caracter]) -> Tuple[str, List[int]]:
+    """Texto de la fila (un espacio entre palabras) y, por cada carácter del texto, su índice en la fila."""
+    partes, indices = [], []
+    fin = None
+    for i, (x, x_fin, _, texto) in enumerate(fila):
+        if texto.isspace():
+            fin = None if fin is None else max(fin, x_fin)
+            if partes and partes[-1] != " ":
+                partes.append(" ")
+                indices.append(i)
+            continue
+        if fin is not None and x - fin > X_TOLERANCIA and partes and partes[-1] != " ":
+            partes.append(" ")
+            indices.append(i)
+        partes.append(texto)
+        indices.append(i)
+        fin = x_fin
+    return "".join(partes), indices
+
+
+def _texto(caracteres: List[Caracter]) -> str:
+    return _linea(caracteres)[0].strip()
+
+
+def _detectar(caracteres: List[Caracter], limites: Optional[List[float]]) -> Optional[Dict]:
+    """
+    Columnas (si limites es None) y techo de la tabla a partir de las filas de movimiento de una
+    página completa. Retorna {"limites", "techo", "control"} o None si la página no es una tabla.
+    """
+    muestras = []  # (x fecha, fin fecha, x "$", y)
+    for fila in _filas(caracteres):
+        texto, indices = _linea(fila)
+        m = _RE_FILA.search(texto)
+        if m:
+            muestras.append((
+                fila[indices[m.start(1)]][0], fila[indices[m.end(1) - 1]][1], fila[indices[m.start(2)]][0], fila[0][2],
+            ))
+    if limites is None:
+        if len(muestras) < MIN_FILAS_PLANTILLA:
+            return None
+        inicios = [m[0] for m in muestras]
+        fin_fecha, x_monto = max(m[1] for m in muestras), min(m[2] for m in muestras)
+        if max(inicios) - min(inicios) > TOLERANCIA_COLUMNA or x_monto <= fin_fecha:
+            return None  # fechas sin alinear: no es una tabla
+        limites = [min(inicios) - TOLERANCIA_COLUMNA, fin_fecha - TOLERANCIA_COLUMNA, x_monto - TOLERANCIA_COLUMNA]
+    else:  # columnas ya conocidas: solo cuentan las filas con la fecha en su columna
+        muestras = [m for m in muestras if limites[0] <= m[0] < limites[1]]
+        if not muestras:
+            return None
+
+    techo = max(m[3] for m in muestras) + Y_TOLERANCIA
+    control = sum(1 for x, _, y, texto in caracteres if y > techo and _es_control(x, texto, limites))
+    return {"limites": limites, "techo": techo, "control": control}
+
+
+def _movimientos(caracteres: List[Caracter], limites: List[float]) -> Tuple[List[Tuple[str, str, float]], int]:
+    """
+    (fecha, descripción, monto) de cada fila con fecha en su columna y "$ monto" en la suya, y
+    cuántas filas parecen movimiento ("fecha … $ monto") sin calzar con las columnas.
+    """
+    movimientos, descalzadas = [], 0
+    for fila in _filas(caracteres):
+        columnas: List[List[Caracter]] = [[], [], [], []]
+        for caracter in fila:
+            columnas[bisect_right(limites, caracter[0])].append(caracter)
+        fecha = _RE_FECHA.search(_texto(columnas[1]))
+        monto = _RE_MONTO.search(_texto(columnas[3])) if fecha else None
+        if not monto:
+            descalzadas += bool(_RE_FILA.search(_linea(fila)[0]))
+            continue
+        fecha = fecha.group(0)
+        valor = float(monto.group(1).replace(".", ""))
+        if "NOTA DE CREDITO" in _linea(fila)[0].upper():
+            valor = -valor
+        # como linea.split(fecha): si la misma fecha se repite en la descripción, se corta ahí
+        descripcion = _texto(columnas[2]).split(fecha)[0].strip()
+        if not descripcion or descripcion.upper() == "NONE":
+            descripcion = "Revisar"
+        movimientos.append((fecha, descripcion, valor))
+    return movimientos, descalzadas
+
+
+def _clave_plantilla(pagina) -> str:
+    """Diseño de la cartola: tamaño de página + fuentes (sin el prefijo de subconjunto "ABCDEF+")."""
+    recursos = resolve1(pagina.page_obj.resources) or {}
+    fuentes = resolve1(recursos.get("Font")) or {}
+    nombres = set()
+    for fuente in fuentes.values():
+        nombre = resolve1((resolve1(fuente) or {}).get("BaseFont", ""))
+        nombres.add(str(getattr(nombre, "name", nombre)).split("+")[-1])
+    return f"{round(pagina.width)}x{round(pagina.height)}:{','.join(sorted(nombres))}"
+
+
+def _cargar_plantillas() -> Dict[str, Dict]:
+    global _plantillas
+    with _lock:
+        if _plantillas is None:
+            _plantillas = {}
+            try:
+                with open(PLANTILLAS_PATH, encoding="utf-8") as f:
+                    datos = json.load(f)
+                if datos.get("version") == PLANTILLAS_VERSION:
+                    _plantillas = datos["plantillas"]
+            except (OSError, ValueError, KeyError):
+                pass  # sin archivo o ilegible: se vuelven a detectar
+        return _plantillas
+
+
+def _registrar(clave: str, plantilla: Dict) -> None:
+    # Escritura atómica: otro proceso (ingesta en paralelo) nunca ve un archivo a medias.
+    with _lock:
+        _plantillas[clave] = plantilla
+        directorio = os.path.dirname(PLANTILLAS_PATH)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        tmp = f"{PLANTILLAS_PATH}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": PLANTILLAS_VERSION, "plantillas": _plantillas}, f, separators=(",", ":"))
+        os.replace(tmp, PLANTILLAS_PATH)
+
+
+def recargar() -> None:
+    """Olvida las plantillas en memoria (se vuelven a leer de PLANTILLAS_PATH)."""
+    global _plantillas
+    with _lock:
+        _plantillas = None
+
+
+def _nueva(plantilla: Optional[Dict], detectada: Dict, tipo: str) -> Dict:
+    """Plantilla con el techo y control de `tipo`; si cambian las columnas, los otros techos no sirven."""
+    previa = plantilla if plantilla and plantilla["limites"] == detectada["limites"] else {"techo": {}, "control": {}}
+    return {
+        "limites": detectada["limites"],
+        "techo": {**previa["techo"], tipo: detectada["techo"]},
+        "control": {**previa["control"], tipo: detectada["control"]},
+    }
+
+
+def _movimientos_pagina(pdf, pagina, tipo: str, clave: str, plantilla: Optional[Dict]) -> Tuple[Optional[List], Optional[Dict]]:
+    """
+    Movimientos de una página ("primera" o "resto") y la plantilla vigente; (None, None) si la
+    página no calza con ninguna tabla (el llamador pasa al modo texto).
+    Con techo conocido para el tipo de página se interpreta solo la tabla; si no, o si algo no
+    calza, la página completa, y se aprende (o se vuelve a detectar) la plantilla.
+    """
+    if plantilla and tipo in plantilla["techo"]:
+        dispositivo = _interpretar(pdf, pagina, plantilla["techo"][tipo], plantilla["limites"])
+        # control distinto: cambió lo que hay sobre la tabla (una fila pudo quedar fuera del techo)
+        if dispositivo.control == plantilla["control"][tipo]:
+            movimientos, descalzadas = _movimientos(dispositivo.caracteres, plantilla["limites"])
+            if not descalzadas:
+                ESTADISTICAS["paginas_recortadas"] += 1
+                return movimientos, plantilla
+
+    ESTADISTICAS["paginas_completas"] += 1
+    caracteres = _interpretar(pdf, pagina).caracteres
+    if plantilla:
+        movimientos, descalzadas = _movimientos(caracteres, plantilla["limites"])
+        if not descalzadas:
+            detectada = _detectar(caracteres, plantilla["limites"])
+            if detectada is None:
+                return movimientos, plantilla  # página sin movimientos (p. ej. condiciones del contrato)
+            plantilla = _nueva(plantilla, detectada, tipo)
+            _registrar(clave, plantilla)
+            return movimientos, plantilla
+
+    # sin plantilla, o la guardada no calza con esta cartola: columnas desde cero
+    detectada = _detectar(caracteres, None)
+    if detectada is None:
+        return None, None
+    movimientos, descalzadas = _movimientos(caracteres, detectada["limites"])
+    if descalzadas:
+        return None, None
+    ESTADISTICAS["plantillas_detectadas"] += 1
+    plantilla = _nueva(plantilla, detectada, tipo)
+    _registrar(clave, plantilla)
+    return movimientos, plantilla
+
+
+@cronometrado()
+def extraer_movimientos_tabla(fuente: FuentePDF, password: str) -> Optional[pd.DataFrame]:
+    """
+    Movimientos del PDF (mismas columnas que extraer_movimientos_vectorizado) leyendo solo la
+    región de la tabla de cada página. None si la primera página no tiene columnas alineadas.
+    """
+    datos = _leer_bytes(fuente)
+    with medir("pdf.abrir_descifrar"):
+        pdf = pdfplumber.open(io.BytesIO(datos), password=password)
+    filas: List[Tuple[str, str, float]] = []
+    with pdf, medir("pdf.tabla"):
+        paginas = pdf.pages
+        contar("paginas_pdf", len(paginas))
+        if not paginas:
+            return None
+        clave = _clave_plantilla(paginas[0])
+        plantilla = _cargar_plantillas().get(clave)
+        for i, pagina in enumerate(paginas):
+            movimientos, plantilla = _movimientos_pagina(pdf, pagina, "primera" if i == 0 else "resto", clave, plantilla)
+            if movimientos is None:
+                ESTADISTICAS["respaldo_texto"] += 1
+                return None
+            filas.extend(movimientos)
+
+    if not filas:
+        return pd.DataFrame(columns=COLUMNAS_MOVIMIENTOS)
+    fechas, descripciones, montos = zip(*filas)
+    df = pd.DataFrame({
+        "Fecha": np.array(fechas, dtype=object),
+        "Descripción": np.array(descripciones, dtype=object),
+        "Monto": np.array(montos, dtype=float),
+    })
+    df["Categoría"] = classify_series(df["Descripción"]).to_numpy()
+    contar("movimientos_parseados", len(df))
+    return df
@@ -0,0 +1,90 @@
+# utils/pdf_texto.py
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, List, Optional, Union
+
+import pdfplumber
+
+from utils.instrumentacion import contar, cronometrado, medir
+
+# Defaults; se pueden sobreescribir por entorno/.env (se leen en cada llamada, tras load_dotenv).
+PDF_WORKERS = 0  # 0 = un proceso por CPU
+PDF_MIN_PAGINAS_PARALELO = 12  # bajo este número de páginas no compensa levantar procesos
+
+FuentePDF = Union[bytes, str, os.PathLike, BinaryIO]
+
+
+def _leer_bytes(fuente: FuentePDF) -> bytes:
+    """Normaliza la fuente (bytes, ruta o archivo subido) a bytes."""
+    if isinstance(fuente, (bytes, bytearray)):
+        return bytes(fuente)
+    if isinstance(fuente, (str, os.PathLike)):
+        with open(fuente, "rb") as f:
+            return f.read()
+    if hasattr(fuente, "getvalue"):  # st.file_uploader / BytesIO
+        return fuente.getvalue()
+    fuente.seek(0)
+    return fuente.read()
+
+
+def _textos_paginas(pdf, inicio: int, fin: int) -> List[str]:
+    # Una sola llamada a extract_text() por página; None -> ""
+    return [(p.extract_text() or "") for p in pdf.pages[inicio:fin]]
+
+
+def _extraer_rango(datos: bytes, password: str, inicio: int, fin: int) -> List[str]:
+    """Worker: reabre el PDF (descifrándolo) y extrae las páginas [inicio, fin)."""
+    with pdfplumber.open(io.BytesIO(datos), password=password) as pdf:
+        return _textos_paginas(pdf, inicio, fin)
+
+
+def _rangos(n_paginas: int, n_partes: int) -> List[range]:
+    """Divide n_paginas en n_partes rangos contiguos y de tamaño parejo."""
+    base, resto = divmod(n_paginas, n_partes)
+    rangos, inicio = [], 0
+    for i in range(n_partes):
+        fin = inicio + base + (1 if i < resto else 0)
+        if fin > inicio:
+            rangos.append(range(inicio, fin))
+        inicio = fin
+    return rangos
+
+
+@cronometrado()
+def extraer_texto_pdf(
+    fuente: FuentePDF,
+    password: str,
+    workers: Optional[int] = None,
+    min_paginas_paralelo: Optional[int] = None,
+) -> str:
+    """
+    Extrae el texto de un PDF (cifrado) página a página y lo une con saltos de línea,
+    omitiendo páginas sin texto (mismo resultado que el join original).
+    - workers: procesos a usar (None -> CARTOLA_PDF_WORKERS o PDF_WORKERS; 0 -> os.cpu_count()).
+    - min_paginas_paralelo: bajo este número de páginas se extrae en serie
+      (None -> CARTOLA_PDF_MIN_PAGINAS_PARALELO o PDF_MIN_PAGINAS_PARALELO).
+    Las páginas se reparten en rangos contiguos y se reensamblan en orden.
+    """
+    datos = _leer_bytes(fuente)
+    if workers is None:
+        workers = int(os.getenv("CARTOLA_PDF_WORKERS", PDF_WORKERS))
+    workers = workers or os.cpu_count() or 1
+    if min_paginas_paralelo is None:
+        min_paginas_paralelo = int(os.getenv("CARTOLA_PDF_MIN_PAGINAS_PARALELO", PDF_MIN_PAGINAS_PARALELO))
+
+    with medir("pdf.abrir_descifrar"):
+        pdf = pdfplumber.open(io.BytesIO(datos), password=password)
+    with pdf:
+        n_paginas = len(pdf.pages)
+        contar("paginas_pdf", n_paginas)
+        if workers <= 1 or n_paginas < min_paginas_paralelo:
+            with medir("pdf.extract_text"):
+                textos = _textos_paginas(pdf, 0, n_paginas)
+            return "\n".join(t for t in textos if t)
+
+    rangos = _rangos(n_paginas, min(workers, n_paginas))
+    with medir("pdf.extract_text"), ProcessPoolExecutor(max_workers=len(rangos)) as pool:
+        futuros = [pool.submit(_extraer_rango, datos, password, r.start, r.stop) for r in rangos]
+        textos = [t for futuro in futuros for t in futuro.result()]
+    return "\n".join(t for t in textos if t)
@@ -0,0 +1,78 @@
+# utils/periodos.py
+import os
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+# Día de corte de la facturación (cartola "25 a 25"). Se puede cambiar por entorno/.env
+# o pasar por cuenta (un día por fila) a asignar_periodo.
+DIA_CORTE = int(os.getenv("CARTOLA_DIA_CORTE", "25"))
+
+# Clave de periodo: entero YYYYMM (int32) del mes en que cierra la cartola.
+PERIODO_NULO = -1  # filas sin fecha (NaT)
+
+DiaCorte = Union[int, np.ndarray, pd.Series]
+
+
+def _como_datetime64(fechas) -> np.ndarray:
+    if isinstance(fechas, pd.Series):
+        fechas = fechas.to_numpy()
+    fechas = np.asarray(fechas)
+    if not np.issubdtype(fechas.dtype, np.datetime64):
+        fechas = pd.to_datetime(fechas).to_numpy()
+    return fechas
+
+
+def asignar_periodo(fechas, dia_corte: DiaCorte = DIA_CORTE) -> np.ndarray:
+    """
+    Asigna a cada fecha la clave YYYYMM (int32) de la cartola que la contiene.
+    Un periodo con corte D abarca desde el día D+1 del mes anterior hasta el día D del mes:
+    una fecha con día <= corte queda en su mes, con día > corte pasa al mes siguiente.
+    Si el mes no tiene el día de corte (p.ej. 31 en febrero), el corte es el último día del mes.
+    - dia_corte: un entero, o un arreglo alineado con fechas (un corte por cuenta/fila).
+    Todo se calcula con aritmética datetime64 de NumPy (sin llamadas Python por fila).
+    """
+    fechas = _como_datetime64(fechas)
+    nulas = np.isnat(fechas)
+
+    dias = fechas.astype("datetime64[D]")
+    meses = fechas.astype("datetime64[M]")
+    inicio_mes = meses.astype("datetime64[D]")
+    dia_del_mes = (dias - inicio_mes).astype(np.int64) + 1
+    dias_del_mes = ((meses + 1).astype("datetime64[D]") - inicio_mes).astype(np.int64)
+
+    corte = np.minimum(np.asarray(dia_corte, dtype=np.int64), dias_del_mes)
+    mes_periodo = meses.astype(np.int64) + (dia_del_mes > corte)  # meses desde 1970-01
+
+    clave = (mes_periodo // 12 + 1970) * 100 + mes_periodo % 12 + 1
+    return np.where(nulas, PERIODO_NULO, clave).astype(np.int32)
+
+
+def etiquetar_periodos(claves, dia_corte: int = DIA_CORTE) -> pd.Categorical:
+    """
+    Convierte claves YYYYMM en etiquetas 'YYYY-MM-DD' (fecha de corte), como categórica.
+    El formateo se hace una sola vez por periodo distinto, no por fila.
+    """
+    codigos, unicas = pd.factorize(np.asarray(claves), sort=True)
+    validas = unicas != PERIODO_NULO
+    etiquetas = []
+    for clave in unicas[validas]:
+        anio, mes = divmod(int(clave), 100)
+        ultimo_dia = pd.Period(year=anio, month=mes, freq="M").days_in_month
+        etiquetas.append(f"{anio:04d}-{mes:02d}-{min(dia_corte, ultimo_dia):02d}")
+
+    mapa = np.full(len(unicas), -1, dtype=np.int64)  # PERIODO_NULO -> NaN
+    mapa[validas] = np.arange(len(etiquetas))
+    return pd.Categorical.from_codes(mapa[codigos], categories=etiquetas)
+
+
+def clave_desde_etiqueta(etiqueta: str) -> int:
+    """Inversa de etiquetar_periodos: 'YYYY-MM-DD' → clave YYYYMM."""
+    return int(etiqueta[:4]) * 100 + int(etiqueta[5:7])
+
+
+def obtener_periodo_facturacion_custom(fecha, dia_corte: int = DIA_CORTE) -> str:
+    """Devuelve la fecha de corte del periodo que contiene la fecha dada, formateada YYYY-MM-DD."""
+    clave = asignar_periodo([pd.Timestamp(fecha)], dia_corte)
+    return str(etiquetar_periodos(clave, dia_corte)[0])
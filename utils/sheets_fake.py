@@ -0,0 +1,244 @@
+# utils/sheets_fake.py
+"""
+Worksheet/Spreadsheet falsos (en memoria) con la misma interfaz que usa sheets_io,
+para probar sincronizaciones y contar llamadas a la API sin conexión.
+Cada método que en gspread es una llamada HTTP suma 1 en `llamadas[nombre]`.
+"""
+import json
+import re
+import time
+from collections import Counter
+from typing import Any, Iterable, List, Optional, Sequence
+
+import gspread
+import requests
+from gspread.utils import a1_range_to_grid_range
+
+
+_RE_NUMERO = re.compile(r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$")
+
+
+def _texto(valor: Any, value_input_option: Optional[str] = None) -> str:
+    """
+    Lo que get_all_values() devolverá para el valor escrito (siempre un string).
+    Con USER_ENTERED, como la UI de Sheets: los textos numéricos pasan a número (y se leen con
+    formato: sin ceros a la izquierda, notación científica desde 1e15) y los que empiezan con
+    "=" pasan a fórmula. RAW guarda el texto tal cual.
+    """
+    if valor is None:
+        return ""
+    if value_input_option == "USER_ENTERED" and isinstance(valor, str):
+        if valor.startswith("="):
+            return "#ERROR!"
+        if _RE_NUMERO.match(valor):
+            numero = float(valor)
+            return f"{numero:.5E}" if abs(numero) >= 1e15 else f"{numero:.15g}"
+    return str(valor)
+
+
+def error_api(codigo: int = 429, mensaje: str = "Quota exceeded") -> gspread.exceptions.APIError:
+    """APIError de gspread como la que devuelve la API (p.ej. 429 por cuota)."""
+    respuesta = requests.Response()
+    respuesta.status_code = codigo
+    estado = "RESOURCE_EXHAUSTED" if codigo == 429 else "UNAVAILABLE"
+    respuesta._content = json.dumps({"error": {"code": codigo, "message": mensaje, "status": estado}}).encode()
+    return gspread.exceptions.APIError(respuesta)
+
+
+class FakeWorksheet:
+    latencia_s = 0.0  # espera por llamada (simula la red en benchmarks)
+
+    def __init__(self, title: str = "cartola", rows: int = 100, cols: int = 26, llamadas: Optional[Counter] = None, sheet_id: int = 0):
+        self.title = title
+        self.id = sheet_id
+        # Tamaño de la grilla en el servidor; row_count/col_count son la copia del handle, que como
+        # en gspread solo se actualiza al abrir la hoja (FakeSpreadsheet.worksheet) y con resize.
+        self.grilla = (rows, cols)
+        self.row_count = rows
+        self.col_count = cols
+        self.llamadas = llamadas if llamadas is not None else Counter()
+        self.celdas_escritas = 0
+        self.celdas_leidas = 0
+        # Fallas inyectadas: {"append_rows": 2} → las próximas 2 llamadas fallan con 429
+        self.fallas: Counter = Counter()
+        # {"append_rows": 1} → la próxima llamada se aplica, pero responde 503 (como un timeout del frontend)
+        self.fallas_tras_aplicar: Counter = Counter()
+        self._celdas: List[List[str]] = []
+
+    # --- helpers internos (no cuentan como llamadas) ---
+    def _escribir(self, fila: int, col: int, valores: Iterable[Sequence[Any]], value_input_option: Optional[str] = None) -> None:
+        """Escribe un bloque a partir de (fila, col), 1-indexed. Falla fuera de la grilla, como la API."""
+        valores = [list(v) for v in valores]
+        ultima_fila = fila + len(valores) - 1
+        ultima_col = col + max((len(v) for v in valores), default=0) - 1
+        if ultima_fila > self.grilla[0] or ultima_col > self.grilla[1]:
+            raise gspread.exceptions.GSpreadException(
+                f"Rango excede la grilla ({ultima_fila}x{ultima_col} > {self.grilla[0]}x{self.grilla[1]})"
+            )
+        for i, fila_valores in enumerate(valores):
+            r = fila - 1 + i
+            while len(self._celdas) <= r:
+                self._celdas.append([])
+            celdas = self._celdas[r]
+            for j, v in enumerate(fila_valores):
+                c = col - 1 + j
+                while len(celdas) <= c:
+                    celdas.append("")
+                celdas[c] = _texto(v, value_input_option)
+                self.celdas_escritas += 1
+
+    def _filas_con_datos(self) -> List[List[str]]:
+        filas = [list(f) for f in self._celdas]
+        while filas and not any(filas[-1]):
+            filas.pop()
+        return filas
+
+    def _inicio(self, rango: str):
+        grid = a1_range_to_grid_range(rango.split("!")[-1])
+        return grid.get("startRowIndex", 0) + 1, grid.get("startColumnIndex", 0) + 1
+
+    def cargar(self, filas: Iterable[Sequence[Any]]) -> None:
+        """Precarga contenido sin contar llamadas (para preparar escenarios)."""
+        filas = [list(f) for f in filas]
+        self.grilla = (max(self.grilla[0], len(filas)), max(self.grilla[1], max((len(f) for f in filas), default=0)))
+        self.row_count, self.col_count = self.grilla
+        self._celdas = []
+        self._escribir(1, 1, filas)
+        self.celdas_escritas = 0
+
+    def _llamada(self, nombre: str) -> None:
+        self.llamadas[nombre] += 1
+        if self.latencia_s:
+            time.sleep(self.latencia_s)
+        if self.fallas[nombre] > 0:
+            self.fallas[nombre] -= 1
+            raise error_api(429)
+
+    def _responder(self, nombre: str) -> None:
+        if self.fallas_tras_aplicar[nombre] > 0:
+            self.fallas_tras_aplicar[nombre] -= 1
+            raise error_api(503, "The service is currently unavailable.")
+
+    # --- API compatible con gspread.Worksheet ---
+    def get_all_values(self) -> List[List[str]]:
+        self._llamada("get_all_values")
+        # Como la API: se recortan filas/columnas vacías al final
+        filas = self._filas_con_datos()
+        ancho = max((max((j + 1 for j, v in enumerate(f) if v), default=0) for f in filas), default=0)
+        self.celdas_leidas += ancho * len(filas)
+        return [(f + [""] * ancho)[:ancho] for f in filas]
+
+    def row_values(self, row: int, **kwargs) -> List[str]:
+        self._llamada("row_values")
+        fila = list(self._celdas[row - 1]) if row <= len(self._celdas) else []
+        while fila and not fila[-1]:
+            fila.pop()
+        self.celdas_leidas += len(fila)
+        return fila
+
+    def update(self, values=None, range_name=None, value_input_option=None, **kwargs):
+        self._llamada("update")
+        if isinstance(values, str):  # orden antiguo: update(rango, valores)
+            values, range_name = range_name, values
+        fila, col = self._inicio(range_name or "A1")
+        self._escribir(fila, col, values, value_input_option)
+        return {"updatedRows": len(values)}
+
+    def batch_update(self, data, value_input_option=None, **kwargs):
+        self._llamada("batch_update")
+        for bloque in data:
+            fila, col = self._inicio(bloque["range"])
+            self._escribir(fila, col, bloque["values"], value_input_option)
+        return {"totalUpdatedRanges": len(data)}
+
+    def append_rows(self, values, value_input_option=None, insert_data_option=None, table_range=None, **kwargs):
+        self._llamada("append_rows")
+        values = [list(v) for v in values]
+        ultima = len(self._filas_con_datos())
+        # append de la API sí agranda la hoja, pero el handle de gspread no se entera (row_count queda igual)
+        self.grilla = (max(self.grilla[0], ultima + len(values)), max(self.grilla[1], max((len(v) for v in values), default=0)))
+        self._escribir(ultima + 1, 1, values, value_input_option)
+        self._responder("append_rows")
+        return {"updates": {"updatedRows": len(values)}}
+
+    def update_cells(self, cell_list, value_input_option=None):
+        self._llamada("update_cells")
+        for celda in cell_list:
+            self._escribir(celda.row, celda.col, [[celda.value]], value_input_option)
+
+    def clear(self):
+        self._llamada("clear")
+        self._celdas = []
+
+    def resize(self, rows: Optional[int] = None, cols: Optional[int] = None):
+        self._llamada("resize")
+        if rows is not None:
+            self.row_count = rows
+            self._celdas = self._celdas[:rows]
+        if cols is not None:
+            self.col_count = cols
+            self._celdas = [f[:cols] for f in self._celdas]
+        self.grilla = (rows if rows is not None else self.grilla[0], cols if cols is not None else self.grilla[1])
+
+    def add_rows(self, rows: int):
+        self.resize(rows=self.row_count + rows)  # como gspread: relativo al row_count del handle
+
+    def _refrescar(self) -> None:
+        """Lo que trae un handle nuevo: el tamaño actual de la grilla."""
+        self.row_count, self.col_count = self.grilla
+
+    @property
+    def total_llamadas(self) -> int:
+        return sum(self.llamadas.values())
+
+
+class FakeSpreadsheet:
+    def __init__(self, spreadsheet_id: str = "fake-sheet"):
+        self.id = spreadsheet_id
+        self.url = f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}"
+        self.llamadas: Counter = Counter()
+        self._hojas = {}
+
+    def worksheet(self, title: str) -> FakeWorksheet:
+        self.llamadas["worksheet"] += 1
+        if title not in self._hojas:
+            raise gspread.WorksheetNotFound(title)
+        self._hojas[title]._refrescar()
+        return self._hojas[title]
+
+    def add_worksheet(self, title: str, rows: int = 100, cols: int = 26, index=None) -> FakeWorksheet:
+        self.llamadas["add_worksheet"] += 1
+        ws = FakeWorksheet(title, rows, cols, llamadas=self.llamadas, sheet_id=len(self._hojas))
+        self._hojas[title] = ws
+        return ws
+
+
+class _CredencialesFalsas:
+    def __init__(self):
+        self.valid = True
+        self.refrescos = 0
+
+    def refresh(self, request) -> None:
+        self.refrescos += 1
+        self.valid = True
+
+
+class _HttpFalso:
+    def __init__(self):
+        self.auth = _CredencialesFalsas()
+
+
+class FakeClient:
+    """gspread.Client falso: open_by_key cuenta una llamada y devuelve siempre el mismo FakeSpreadsheet por ID."""
+
+    def __init__(self, llamadas: Optional[Counter] = None):
+        self.llamadas = llamadas if llamadas is not None else Counter()
+        self.http_client = _HttpFalso()
+        self._libros = {}
+
+    def open_by_key(self, key: str) -> FakeSpreadsheet:
+        self.llamadas["open_by_key"] += 1
+        if key not in self._libros:
+            self._libros[key] = FakeSpreadsheet(key)
+            self._libros[key].llamadas = self.llamadas
+        return self._libros[key]
@@ -1,16 +1,26 @@
 # utils/sheets_io.py
+import hashlib
+import random
+import time
 import streamlit as st
 import gspread
-from gspread_dataframe import set_with_dataframe
+from gspread.utils import rowcol_to_a1
+from google.auth.transport.requests import Request as GoogleAuthRequest
 import pandas as pd
-from typing import Optional, Literal
+from typing import Dict, Iterable, List, Optional, Literal, Sequence, Tuple
 
-# Lee (opcionalmente) el Spreadsheet ID desde Secrets.
+from utils import clientes_google
+from utils.instrumentacion import contar, cronometrado
+
+# Lee (opcionalmente) el Spreadsheet ID desde Secrets, al usarlo (no al importar el módulo).
 # Puedes sobreescribirlo pasando 'spreadsheet_id' como argumento en las funciones.
-SHEET_SPREADSHEET_ID = st.secrets.get("GOOGLE_SHEETS_SPREADSHEET_ID", "").strip()
+def __getattr__(nombre: str):
+    if nombre == "SHEET_SPREADSHEET_ID":
+        return clientes_google.secreto("GOOGLE_SHEETS_SPREADSHEET_ID")
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
 
 
-def _get_client() -> gspread.Client:
+def _crear_cliente() -> gspread.Client:
     """
     Autentica usando la Service Account guardada en st.secrets[gcp_service_account].
     Asegúrate de habilitar Google Sheets API y Google Drive API en el proyecto de la SA,
@@ -24,26 +34,46 @@ def _get_client() -> gspread.Client:
     return gspread.service_account_from_dict(sa_dict)
 
 
+def _refrescar_token(client: gspread.Client) -> bool:
+    """Renueva el access token solo si expiró (o aún no se emitió). Retorna True si lo renovó."""
+    credenciales = client.http_client.auth
+    if credenciales.valid:
+        return False
+    credenciales.refresh(GoogleAuthRequest())
+    return True
+
+
+def _get_client() -> gspread.Client:
+    """Cliente gspread compartido (clientes_google): se autentica una vez por TTL_CLIENTE."""
+    return clientes_google.obtener(
+        "gspread", "service_account", _crear_cliente, clientes_google.TTL_CLIENTE, refrescar=_refrescar_token
+    )
+
+
 def _open_spreadsheet(client: gspread.Client, spreadsheet_id: Optional[str]) -> gspread.Spreadsheet:
     """
-    Abre el Spreadsheet por ID (no crea archivos nuevos).
+    Abre el Spreadsheet por ID (no crea archivos nuevos). Queda en caché por TTL_METADATOS.
     - spreadsheet_id: si None, usa SHEET_SPREADSHEET_ID (Secrets).
     """
-    target_id = spreadsheet_id or SHEET_SPREADSHEET_ID
+    target_id = spreadsheet_id or clientes_google.secreto("GOOGLE_SHEETS_SPREADSHEET_ID")
     if not target_id:
         raise RuntimeError(
             "No se proporcionó Spreadsheet ID. Define GOOGLE_SHEETS_SPREADSHEET_ID en Secrets "
             "o pásalo como argumento a la función."
         )
-    try:
-        return client.open_by_key(target_id)
-    except Exception as e:
-        raise RuntimeError(
-            "No pude abrir el Spreadsheet. Verifica:\n"
-            "1) El ID es correcto.\n"
-            "2) Compartiste el Sheet con la Service Account (Editor).\n"
-            f"Detalle: {e}"
-        )
+
+    def _abrir() -> gspread.Spreadsheet:
+        try:
+            return client.open_by_key(target_id)
+        except Exception as e:
+            raise RuntimeError(
+                "No pude abrir el Spreadsheet. Verifica:\n"
+                "1) El ID es correcto.\n"
+                "2) Compartiste el Sheet con la Service Account (Editor).\n"
+                f"Detalle: {e}"
+            )
+
+    return clientes_google.obtener("spreadsheet", target_id, _abrir)
 
 
 def _get_or_create_worksheet(
@@ -53,14 +83,49 @@ def _get_or_create_worksheet(
     """
     Devuelve la worksheet (pestaña). Si no existe, la CREAMOS dentro del mismo Spreadsheet.
     Ojo: Crear hojas (pestañas) sí está permitido con Service Accounts.
+    El handle queda en caché por TTL_METADATOS (ver _invalidar_hoja).
     """
-    try:
-        return sh.worksheet(worksheet_title)
-    except gspread.WorksheetNotFound:
-        # Dimensiones iniciales; se ajustan automáticamente al escribir DataFrame.
-        return sh.add_worksheet(title=worksheet_title, rows=100, cols=26)
+    def _abrir() -> gspread.Worksheet:
+        try:
+            return sh.worksheet(worksheet_title)
+        except gspread.WorksheetNotFound:
+            # Dimensiones iniciales; se ajustan automáticamente al escribir DataFrame.
+            return sh.add_worksheet(title=worksheet_title, rows=100, cols=26)
+
+    return clientes_google.obtener("worksheet", (sh.id, worksheet_title), _abrir)
+
 
+def _invalidar_hoja(sh: gspread.Spreadsheet, worksheet_title: str) -> None:
+    """Olvida los handles cacheados (p.ej. si la pestaña se borró o renombró desde la UI de Sheets)."""
+    clientes_google.invalidar("worksheet", (sh.id, worksheet_title))
+    clientes_google.invalidar("spreadsheet", sh.id)
 
+
+# Todas las escrituras (completa, append y delta) van en RAW: los textos se guardan tal cual. Con
+# USER_ENTERED, Sheets convertiría un _id/_hash hexadecimal en número (o notación científica) y
+# una descripción que empieza con "=" en fórmula. Montos e índices se envían como números.
+VALUE_INPUT_OPTION = "RAW"
+
+
+def _df_a_valores(df: pd.DataFrame) -> List[List]:
+    """
+    Convierte el DataFrame a lista de filas para la API, en forma vectorizada:
+    fechas a texto ISO (sin hora si todas son a medianoche) y nulos a "".
+    """
+    out = df.copy()
+    for col in out.columns:
+        serie = out[col]
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            formato = "%Y-%m-%d" if (serie.dropna() == serie.dropna().dt.normalize()).all() else "%Y-%m-%d %H:%M:%S"
+            out[col] = serie.dt.strftime(formato)
+        elif isinstance(serie.dtype, pd.CategoricalDtype):
+            out[col] = serie.astype(object)
+    valores = out.to_numpy(dtype=object)
+    valores[pd.isna(valores)] = ""
+    return valores.tolist()
+
+
+@cronometrado()
 def update_sheet_with_dataframe(
     df: pd.DataFrame,
     spreadsheet_id: Optional[str] = None,
@@ -80,13 +145,16 @@ def update_sheet_with_dataframe(
     sh = _open_spreadsheet(client, spreadsheet_id)
     ws = _get_or_create_worksheet(sh, worksheet_title)
 
-    # Limpia hoja y escribe DataFrame
-    ws.clear()
-    set_with_dataframe(ws, df, include_index=include_index, include_column_header=True)
+    try:
+        overwrite_worksheet(ws, df.reset_index() if include_index else df)
+    except gspread.exceptions.APIError:
+        _invalidar_hoja(sh, worksheet_title)
+        raise
 
     return sh.url
 
 
+@cronometrado()
 def write_dataframe(
     df: pd.DataFrame,
     mode: Literal["overwrite", "append"] = "overwrite",
@@ -110,28 +178,233 @@ def write_dataframe(
     sh = _open_spreadsheet(client, spreadsheet_id)
     ws = _get_or_create_worksheet(sh, worksheet_title)
 
-    if mode == "overwrite":
-        ws.clear()
-        set_with_dataframe(ws, df, include_index=include_index, include_column_header=True)
-        return sh.url
+    try:
+        if mode == "overwrite":
+            overwrite_worksheet(ws, df.reset_index() if include_index else df)
+        else:
+            # Append: usamos el append nativo de la API (ella encuentra la siguiente fila libre)
+            append_worksheet(ws, df.reset_index() if include_index else df)
+    except gspread.exceptions.APIError:
+        _invalidar_hoja(sh, worksheet_title)
+        raise
+    return sh.url
+
 
-    # Append: calculamos la siguiente fila libre y pegamos valores sin encabezados
-    # Para consistencia, nos aseguramos de que df sea DataFrame "puro"
-    df_to_write = df.copy()
-    if include_index:
-        df_to_write.reset_index(inplace=True)
+@cronometrado()
+def overwrite_worksheet(ws, df: pd.DataFrame) -> int:
+    """
+    Limpia la worksheet y escribe encabezados + filas en un solo update (agranda la grilla si
+    no alcanza). Retorna el número de filas escritas (sin contar encabezados).
+    """
+    filas = [[str(c) for c in df.columns]] + _df_a_valores(df)
+    ws.clear()
+    if len(filas) > ws.row_count or len(df.columns) > ws.col_count:
+        ws.resize(rows=max(len(filas), ws.row_count), cols=max(len(df.columns), ws.col_count))
+    ws.update(values=filas, range_name="A1", value_input_option=VALUE_INPUT_OPTION)
+    return len(filas) - 1
 
-    # Encuentra la siguiente fila vacía (Google Sheets es 1-indexed)
-    last_row = len(ws.get_all_values())
-    start_row = last_row + 1 if last_row > 0 else 1
 
-    # Si la hoja está vacía, primero escribimos encabezados
-    if last_row == 0:
-        set_with_dataframe(ws, df_to_write, include_index=False, include_column_header=True)
+# --- Append por lotes ---
+APPEND_MAX_CELDAS = 40_000          # celdas por request de append (payload acotado)
+REINTENTOS_MAX = 5
+REINTENTO_ESPERA_INICIAL = 1.0      # segundos; se duplica en cada intento (+ jitter)
+_CODIGOS_REINTENTABLES = {429, 503}  # cuota excedida / servicio no disponible
+# Un 429 se rechaza antes de aplicar el request; un 503 puede llegar después de que se aplicó.
+# Reenviar una lectura da igual, pero reenviar un append duplicaría las filas.
+_CODIGOS_NO_APLICADOS = {429}
+
+
+def _con_reintentos(fn, *args, reintentables=_CODIGOS_REINTENTABLES, **kwargs):
+    """
+    Ejecuta una llamada a la API reintentando con backoff exponencial ante los códigos reintentables
+    (default: cuota y 503; para llamadas no idempotentes, _CODIGOS_NO_APLICADOS).
+    """
+    espera = REINTENTO_ESPERA_INICIAL
+    for intento in range(REINTENTOS_MAX):
+        contar("sheets_llamadas")
+        try:
+            return fn(*args, **kwargs)
+        except gspread.exceptions.APIError as e:
+            codigo = getattr(getattr(e, "response", None), "status_code", None)
+            if codigo not in reintentables or intento == REINTENTOS_MAX - 1:
+                raise
+            contar("sheets_reintentos")
+            time.sleep(espera + random.uniform(0, espera / 2))
+            espera *= 2
+
+
+@cronometrado()
+def append_worksheet(ws, df: pd.DataFrame, max_celdas: int = APPEND_MAX_CELDAS) -> int:
+    """
+    Agrega el DataFrame al final de la worksheet sin descargarla:
+    - lee solo la fila 1 para saber si hay encabezados (si está vacía, los incluye),
+    - convierte valores en forma vectorizada (_df_a_valores),
+    - envía append_rows en lotes de a lo más max_celdas celdas, reintentando solo ante cuota (429):
+      un 503 pudo haber agregado el lote, así que se propaga en vez de arriesgar filas duplicadas.
+    Retorna el número de filas agregadas (sin contar encabezados).
+    """
+    filas = _df_a_valores(df)
+    if not _con_reintentos(ws.row_values, 1):
+        filas = [[str(c) for c in df.columns]] + filas
+        n_encabezados = 1
     else:
-        # Solo valores (sin header)
-        values = [list(map(lambda x: "" if pd.isna(x) else x, row)) for _, row in df_to_write.iterrows()]
-        if values:
-            ws.update(f"A{start_row}", values)
+        n_encabezados = 0
 
-    return sh.url
+    filas_por_lote = max(1, max_celdas // max(1, len(df.columns)))
+    for inicio in range(0, len(filas), filas_por_lote):
+        _con_reintentos(
+            ws.append_rows,
+            filas[inicio:inicio + filas_por_lote],
+            value_input_option=VALUE_INPUT_OPTION,
+            insert_data_option="INSERT_ROWS",
+            table_range="A1",
+            reintentables=_CODIGOS_NO_APLICADOS,
+        )
+    return len(filas) - n_encabezados
+
+
+# --- Sincronización por diferencias (delta) ---
+COLUMNA_ID = "_id"      # clave estable del movimiento: hash(fecha, descripción, monto) + ordinal
+COLUMNA_HASH = "_hash"  # hash del contenido de la fila, para detectar actualizaciones
+COLUMNAS_CLAVE = ("Fecha", "Descripción", "Monto")
+
+
+def _hash_texto(partes: Iterable) -> str:
+    return hashlib.sha1("\x1f".join(map(str, partes)).encode("utf-8")).hexdigest()[:16]
+
+
+def claves_movimientos(df: pd.DataFrame, columnas_clave: Sequence[str] = COLUMNAS_CLAVE) -> List[str]:
+    """
+    Clave estable por movimiento: hash de (fecha, descripción, monto) + ordinal entre
+    movimientos idénticos, para que dos compras iguales el mismo día no colisionen.
+    """
+    base = pd.DataFrame(_df_a_valores(df[list(columnas_clave)]), columns=list(columnas_clave), index=df.index)
+    ordinal = base.groupby(list(columnas_clave), sort=False).cumcount()
+    return [_hash_texto((*fila, n)) for fila, n in zip(base.itertuples(index=False, name=None), ordinal)]
+
+
+def _agrupar_contiguas(filas: Dict[int, List]) -> List[Tuple[int, List[List]]]:
+    """{fila: valores} → [(fila_inicial, [valores...])] uniendo filas consecutivas en un solo rango."""
+    bloques: List[Tuple[int, List[List]]] = []
+    for fila in sorted(filas):
+        if bloques and bloques[-1][0] + len(bloques[-1][1]) == fila:
+            bloques[-1][1].append(filas[fila])
+        else:
+            bloques.append((fila, [filas[fila]]))
+    return bloques
+
+
+@cronometrado()
+def sync_worksheet(ws, df: pd.DataFrame, columnas_clave: Sequence[str] = COLUMNAS_CLAVE) -> Dict[str, int]:
+    """
+    Sincroniza la worksheet con el DataFrame enviando solo las diferencias:
+    1 lectura (get_all_values) + 1 escritura (batch_update), más un resize si la hoja
+    debe crecer (y un clear si hay que reescribirla). Las filas borradas se rellenan con inserciones o con filas movidas desde
+    el final, y la cola sobrante se limpia, así la hoja queda compacta.
+    Si los encabezados no coinciden (o la hoja está vacía) se reescribe completa.
+    Retorna: {"insertadas", "actualizadas", "borradas", "movidas", "rangos"}.
+    """
+    encabezados = [str(c) for c in df.columns] + [COLUMNA_ID, COLUMNA_HASH]
+    valores = _df_a_valores(df)
+    ids = claves_movimientos(df, columnas_clave)
+    filas_df = {i: v + [i_d, _hash_texto(v)] for i, (v, i_d) in enumerate(zip(valores, ids))}
+    por_id = {fila[-2]: fila for fila in filas_df.values()}
+
+    actuales = ws.get_all_values()
+    ancho = len(encabezados)
+    if not actuales or actuales[0][:ancho] != encabezados:
+        # Reescritura completa (primera sincronización o cambio de columnas)
+        if actuales:
+            ws.clear()
+        destino = {1: encabezados}
+        destino.update({i + 2: fila for i, fila in enumerate(filas_df.values())})
+        ultima_actual = 0
+        resumen = {"insertadas": len(filas_df), "actualizadas": 0, "borradas": max(len(actuales) - 1, 0), "movidas": 0}
+    else:
+        col_id, col_hash = ancho - 2, ancho - 1
+        existentes = {}  # id -> (fila, hash)
+        huecos = []
+        for n, fila in enumerate(actuales[1:], start=2):
+            fila = fila + [""] * (ancho - len(fila))
+            if fila[col_id] and fila[col_id] in por_id and fila[col_id] not in existentes:
+                existentes[fila[col_id]] = (n, fila[col_hash])
+            else:
+                huecos.append(n)  # borrada, duplicada o vacía
+
+        destino: Dict[int, List] = {}
+        for i_d, (n, h) in existentes.items():
+            if por_id[i_d][-1] != h:
+                destino[n] = por_id[i_d]
+        resumen = {"insertadas": 0, "actualizadas": len(destino), "borradas": len(huecos), "movidas": 0}
+
+        nuevas = [fila for i_d, fila in por_id.items() if i_d not in existentes]
+        resumen["insertadas"] = len(nuevas)
+        ultima_actual = len(actuales)
+        total_final = 1 + len(existentes) + len(nuevas)
+
+        # 1) Las inserciones ocupan primero los huecos; las que sobran van al final
+        libres = sorted(huecos)
+        siguiente = ultima_actual + 1
+        for fila in nuevas:
+            if libres and libres[0] <= total_final:
+                destino[libres.pop(0)] = fila
+            else:
+                destino[siguiente] = fila
+                siguiente += 1
+
+        # 2) Huecos que quedan dentro del rango final: se rellenan moviendo filas desde el final
+        libres = [n for n in libres if n <= total_final]
+        for i_d, (n, _) in sorted(existentes.items(), key=lambda x: -x[1][0]):
+            if not libres or n <= total_final:
+                break
+            destino[libres.pop(0)] = por_id[i_d]
+            resumen["movidas"] += 1
+
+    # 3) Limpiar la cola que quedó sobrante
+    ultima_final = 1 + len(filas_df)
+    for n in range(ultima_final + 1, ultima_actual + 1):
+        destino[n] = [""] * ancho
+
+    resumen["rangos"] = 0
+    if not destino:
+        return resumen
+
+    # El handle viene de la caché (clientes_google) y gspread no actualiza row_count/col_count tras
+    # un append_rows: la grilla puede ser más grande. Lo recién leído es una cota inferior fresca.
+    filas_grilla = max(ws.row_count, len(actuales))
+    columnas_grilla = max(ws.col_count, max((len(f) for f in actuales), default=0))
+    filas_necesarias = max(destino)
+    if filas_necesarias > filas_grilla or ancho > columnas_grilla:
+        ws.resize(rows=max(filas_necesarias, filas_grilla), cols=max(ancho, columnas_grilla))
+
+    data = []
+    for fila_inicial, bloque in _agrupar_contiguas(destino):
+        rango = f"A{fila_inicial}:{rowcol_to_a1(fila_inicial + len(bloque) - 1, ancho)}"
+        data.append({"range": rango, "values": bloque})
+    ws.batch_update(data, value_input_option=VALUE_INPUT_OPTION)
+    resumen["rangos"] = len(data)
+    return resumen
+
+
+@cronometrado()
+def sync_sheet_with_dataframe(
+    df: pd.DataFrame,
+    spreadsheet_id: Optional[str] = None,
+    worksheet_title: str = "cartola",
+) -> Tuple[str, Dict[str, int]]:
+    """
+    Como update_sheet_with_dataframe, pero enviando solo inserciones/actualizaciones/borrados
+    (ver sync_worksheet). Agrega las columnas _id y _hash al final de la hoja.
+    Retorna: (URL del Spreadsheet, resumen de cambios).
+    """
+    if df is None or df.empty:
+        raise ValueError("El DataFrame está vacío; nada que escribir en Google Sheets.")
+
+    client = _get_client()
+    sh = _open_spreadsheet(client, spreadsheet_id)
+    ws = _get_or_create_worksheet(sh, worksheet_title)
+    try:
+        return sh.url, sync_worksheet(ws, df)
+    except gspread.exceptions.APIError:
+        _invalidar_hoja(sh, worksheet_title)
+        raise